@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Dataflow analyses of every function, in the format of Bril's reference
+    examples/df.py:
+
+    bril2json < prog.bril | python3 df.py {defined,live,cprop}
+"""
+
+import argparse
+import sys
+
+from pyir.analysis import cfg, dataflow
+from pyir.interface import bril
+
+PROBLEMS = {
+    "defined": dataflow.DefinedVariables,
+    "live": dataflow.LiveVariables,
+    "cprop": dataflow.ConstantPropagation,
+}
+
+
+def print_dataflow(func, mode: str):
+    graph = cfg.ControlFlowGraph(func)
+    result = dataflow.solve(PROBLEMS[mode](graph))
+    problem = result.get_problem()
+    for index, name in enumerate(graph.get_names()):
+        print(f"{name}:")
+        print(f"  in:  {problem.format(result.get_in(index))}")
+        print(f"  out: {problem.format(result.get_out(index))}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=sorted(PROBLEMS))
+    args = parser.parse_args()
+
+    module = bril.BrilInterface().read(sys.stdin.buffer)
+    for func in module.iter_functions():
+        print_dataflow(func, args.mode)
+
+
+if __name__ == '__main__':
+    main()
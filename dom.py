@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Dominance information of every function, in the format of Bril's
+    reference examples/dom.py:
+
+    bril2json < prog.bril | python3 dom.py {dom,tree,front}
+"""
+
+import argparse
+import json
+import sys
+
+from pyir.analysis import cfg, dominance
+from pyir.interface import bril
+
+
+def dominance_info(func, mode: str) -> dict:
+    """Block name -> sorted names of its dominators (dom), immediately
+        dominated blocks (tree) or dominance frontier (front)
+    """
+    cfg.add_entry_block(func)
+    tree = dominance.DominatorTree(cfg.ControlFlowGraph(func))
+    names = tree.get_cfg().get_names()
+    info = {}
+    for index, name in enumerate(names):
+        if mode == "dom":
+            related = tree.get_dominators(index)
+        elif mode == "tree":
+            related = tree.get_children(index)
+        else:
+            related = tree.get_frontier(index)
+        info[name] = sorted(names[i] for i in related)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["dom", "tree", "front"])
+    args = parser.parse_args()
+
+    module = bril.BrilInterface().read(sys.stdin.buffer)
+    for func in module.iter_functions():
+        print(json.dumps(dominance_info(func, args.mode),
+                         indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
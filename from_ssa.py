@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Bril JSON (or text) with phis on stdin to Bril JSON without them:
+
+    bril2json < prog.bril | python3 to_ssa.py | python3 from_ssa.py
+"""
+
+import sys
+
+from pyir.interface import bril
+from pyir.ssa import destruction
+
+
+def main():
+    interface = bril.BrilInterface()
+    module = interface.read(sys.stdin.buffer)
+    destruction.SSADestruction().transform(module)
+    interface.write_json(module, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
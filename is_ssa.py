@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Print yes if no function of the Bril program on stdin assigns a name
+    twice, no otherwise:
+
+    bril2json < prog.bril | python3 is_ssa.py
+"""
+
+import sys
+
+from pyir.interface import bril
+from pyir.ssa import construction
+
+
+def main():
+    module = bril.BrilInterface().read(sys.stdin.buffer)
+    ssa = all(construction.is_ssa(func) for func in module.iter_functions())
+    print("yes" if ssa else "no")
+
+
+if __name__ == '__main__':
+    main()
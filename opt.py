@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import logging
 import os
 import sys
 
-from pyir import ir_pass
-from pyir.interface import bril
+from pyir import cache, driver, instrumentation, memo, trace, typecheck
+from pyir.interface import binary, bril
 
 logger = logging.getLogger("opt.py")
 logging.basicConfig(level=logging.INFO)
@@ -19,51 +18,272 @@ PASS_MAP = {
     "lvn-raw": "pyir.redundancy.lvn.LocalValueNumberingRaw",
     "lvn": "pyir.redundancy.lvn.LocalValueNumbering",
     "lvn-fold": "pyir.redundancy.lvn.LocalValueNumberingConstantFold",
+    "gvn-raw": "pyir.redundancy.gvn.GlobalValueNumberingRaw",
+    "gvn": "pyir.redundancy.gvn.GlobalValueNumbering",
+    "gvn-fold": "pyir.redundancy.gvn.GlobalValueNumberingConstantFold",
+    "sccp": "pyir.redundancy.sccp.SparseConditionalConstantPropagation",
+    "to-ssa": "pyir.ssa.construction.SSAConstruction",
+    "to-ssa-minimal": "pyir.ssa.construction.MinimalSSAConstruction",
+    "from-ssa": "pyir.ssa.destruction.SSADestruction",
 }
 
 
 def list_all_passes():
     logger.info("All passes")
+    for pass_name, pass_path in PASS_MAP.items():
+        logger.info(f"  {pass_name}: {pass_path}")
     logger.info("--- End of the list of passes")
 
-def optimize(module, passes):
-    pass_manager = ir_pass.PassManager()
+def resolve_passes(passes):
+    pass_paths = []
     for pass_name in passes:
         if pass_name not in PASS_MAP:
             logger.error(f"Cannot find pass {pass_name}")
             quit()
-        pass_module_name = PASS_MAP[pass_name]
-        module_name, class_name = pass_module_name.rsplit(".", 1)
-        package = __import__(module_name, fromlist=[class_name])
-        PassClass = getattr(package, class_name)
-        pass_manager.add_pass(PassClass())
+        pass_paths.append(PASS_MAP[pass_name])
+    return pass_paths
 
-    pass_manager.transform(module)
+def optimize(module, passes, function_jobs=1, function_cache=None,
+             block_memo=None):
+    pass_manager = driver.build_pass_manager(
+        resolve_passes(passes),
+        function_jobs,
+        function_cache,
+        block_memo
+    )
+    try:
+        pass_manager.transform(module)
+    finally:
+        pass_manager.shutdown()
     return module
 
 
+EXTENSIONS = {"json": ".json", "text": ".bril", "binary": binary.EXTENSION}
+
+
+def output_path(output_dir, name, extension=".json"):
+    """name is the input's path relative to its batch root, so inputs of
+        the same base name in different directories stay apart
+    """
+    stem = os.path.splitext(name)[0]
+    return os.path.join(output_dir, f"{stem}{extension}")
+
+def output_paths(output_dir, names, extension):
+    paths = [output_path(output_dir, name, extension) for name in names]
+    seen = set()
+    for path in paths:
+        if path in seen:
+            logger.error(f"two inputs would both be written to {path}")
+            quit()
+        seen.add(path)
+    return paths
+
+def run_batch(args, passes, function_cache, block_memo):
+    named_sources = driver.collect_named_inputs(args.batch, sys.stdin)
+    sources = [source for source, _ in named_sources]
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    batch_driver = driver.make_batch_driver(
+        resolve_passes(passes),
+        jobs,
+        args.function_jobs,
+        function_cache,
+        block_memo,
+        args.emit
+    )
+
+    if args.output_dir is not None:
+        # checked before anything is written
+        paths = output_paths(args.output_dir,
+                             [name for _, name in named_sources],
+                             EXTENSIONS[args.emit])
+        os.makedirs(args.output_dir, exist_ok=True)
+        stream = None
+    elif args.jsonl == "-":
+        stream = sys.stdout
+    else:
+        stream = open(args.jsonl, "w")
+
+    collector = instrumentation.get_active()
+    num_failed = 0
+    for index, result in enumerate(batch_driver.run(sources)):
+        if collector is not None and result.stats is not None:
+            collector.merge(result.stats)
+        if result.succeeded():
+            logger.info(f"{result.source}: {result.elapsed:.4f}s")
+        else:
+            num_failed += 1
+            logger.error(f"{result.source}: {result.error}")
+
+        if stream is not None:
+            result.write_record(stream)
+        elif result.succeeded():
+            path = paths[index]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            mode = "wb" if args.emit == "binary" else "w"
+            with open(path, mode) as f:
+                f.write(result.output)
+
+    if stream is not None and stream is not sys.stdout:
+        stream.close()
+
+    logger.info(f"{len(sources) - num_failed}/{len(sources)} modules optimized")
+    return num_failed == 0
+
+
+def report_instrumentation(args, collector):
+    if args.time_passes or args.stats:
+        collector.report(
+            sys.stderr,
+            timing=args.time_passes,
+            statistics=args.stats
+        )
+    if args.stats_json is not None:
+        collector.dump(args.stats_json)
+
+
+def report_cache(function_cache, totals_before):
+    """Counts of this run, worker processes included"""
+    if not function_cache.is_enabled():
+        # the warning says why
+        return
+    totals = function_cache.get_totals()
+    run = {name: totals[name] - totals_before[name]
+           for name in cache.STAT_NAMES}
+    logger.info(
+        f"cache: {run['hits']} hits, {run['misses']} misses, "
+        f"{run['evictions']} evictions; {totals['entries']} entries, "
+        f"{totals['bytes']} bytes in {function_cache.get_directory()}"
+    )
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("-l", "--list", action="store_true")
-    parser.add_argument("-c", "--source", type=str)
+    parser.add_argument("-c", "--source", type=str,
+                        help="a Bril file, or a module in the binary "
+                             "format")
     parser.add_argument("-p", "--passes", nargs="+")
+    parser.add_argument("-b", "--batch", nargs="+", metavar="INPUT",
+                        help="Bril files, directories of *.bril files, "
+                             "or '-' to read paths from stdin")
+    parser.add_argument("-o", "--output-dir", type=str,
+                        help="batch mode: write one file per input, at "
+                             "its path under the input directory, with "
+                             "the extension of --emit ("
+                             f"{', '.join(EXTENSIONS.values())})")
+    parser.add_argument("--jsonl", type=str, default="-",
+                        help="batch mode: JSON-lines output file "
+                             "(default: stdout)")
+    parser.add_argument("--emit", choices=driver.OUTPUT_FORMATS,
+                        default="json",
+                        help="output Bril JSON, Bril text, or the binary "
+                             "format that -c and -b read back (batch "
+                             "mode: text and binary need -o)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="batch mode: worker processes "
+                             "(0: one per CPU)")
+    parser.add_argument("--function-jobs", type=int, default=1,
+                        help="run function-local passes on this many "
+                             "worker processes, one function at a time")
+    parser.add_argument("--unchecked", action="store_true",
+                        help="skip the runtime type checks "
+                             f"(same as {typecheck.ENV_VAR}=0)")
+    parser.add_argument("--time-passes", action="store_true",
+                        help="report wall/CPU time per pass and per "
+                             "function on stderr")
+    parser.add_argument("--stats", action="store_true",
+                        help="report pass counters and peak memory "
+                             "on stderr")
+    parser.add_argument("--stats-json", type=str, metavar="FILE",
+                        help="write the timing and statistics report "
+                             "to FILE as JSON")
+    parser.add_argument("--trace", action="append", default=[],
+                        metavar="CHANNEL[=FILE]",
+                        help="write a debug trace channel to FILE "
+                             "(default: stderr); channels: "
+                             f"{', '.join(trace.CHANNELS)}")
+    parser.add_argument("--cache-dir", type=str, metavar="DIR",
+                        help="reuse optimized functions across runs, "
+                             "stored in DIR")
+    parser.add_argument("--cache-size", type=int, default=256,
+                        metavar="MB",
+                        help="cache size cap; the least recently used "
+                             "functions go first (default: 256)")
+    parser.add_argument("--block-memo", type=int, default=0,
+                        metavar="N",
+                        help="replay local passes on blocks of a shape "
+                             "seen before, remembering the N most "
+                             "recently used shapes (default: 0, off)")
 
     args = parser.parse_args()
+    if args.unchecked:
+        # the environment carries the mode over to worker processes
+        os.environ[typecheck.ENV_VAR] = "0"
+        typecheck.set_checked(False)
+
     if args.list:
         list_all_passes()
         quit()
 
-    if not os.path.exists(args.source):
+    try:
+        trace.configure(dict(trace.parse_spec(spec) for spec in args.trace))
+    except ValueError as e:
+        logger.error(str(e))
+        quit()
+
+    collector = None
+    if args.time_passes or args.stats or args.stats_json is not None:
+        collector = instrumentation.enable()
+
+    function_cache = None
+    if args.cache_dir is not None:
+        function_cache = cache.OptimizationCache(
+            args.cache_dir, args.cache_size * 1024 * 1024)
+        cache_totals = function_cache.get_totals()
+
+    block_memo = None
+    if args.block_memo > 0:
+        block_memo = memo.BlockMemo(args.block_memo)
+
+    passes = [] if args.passes is None else args.passes
+    if args.batch is not None:
+        if args.emit != "json" and args.output_dir is None:
+            logger.error(f"--emit {args.emit} needs --output-dir in "
+                         "batch mode")
+            quit()
+        if args.jobs != 1 and args.function_jobs > 1:
+            logger.error("--jobs and --function-jobs are exclusive in "
+                         "batch mode")
+            quit()
+        succeeded = run_batch(args, passes, function_cache, block_memo)
+        if collector is not None:
+            report_instrumentation(args, collector)
+        if function_cache is not None:
+            report_cache(function_cache, cache_totals)
+        if not succeeded:
+            sys.exit(1)
+        return
+
+    if args.source is None or not os.path.exists(args.source):
         logger.error(f"{args.source} does not exists")
         quit()
 
     # compile & optimize
     interface = bril.BrilInterface()
-    module = interface.parse(args.source)
-    passes = [] if args.passes is None else args.passes
-    optimize(module, passes)
-    module_json = interface.dump_json(module)
-    json.dump(module_json, sys.stdout)
+    binary_interface = binary.BinaryInterface()
+    module = driver.load_module(args.source, interface, binary_interface)
+    optimize(module, passes, args.function_jobs, function_cache, block_memo)
+    if args.emit == "binary":
+        sys.stdout.buffer.write(binary_interface.dump(module))
+        sys.stdout.flush()
+    elif args.emit == "text":
+        interface.write_text(module, sys.stdout)
+    else:
+        interface.write_json(module, sys.stdout)
+    if collector is not None:
+        report_instrumentation(args, collector)
+    if function_cache is not None:
+        report_cache(function_cache, cache_totals)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import manager
+from pyir.program import ir_builder, ir_type, program, use
+
+
+class ControlFlowGraph:
+    """The CFG of a function over dense block indices: block i is the
+        i-th basic block, 0 is the entry. Edges come from the jmp/br ending
+        a block, or fall through to the next block; ret ends the function.
+        Successors and predecessors are tuples of indices.
+    """
+
+    def __init__(self, func):
+        self._blocks = tuple(func.iter_basic_blocks())
+        self._block_index = {
+            block: index for index, block in enumerate(self._blocks)
+        }
+        self._label_index = {}
+        for index, block in enumerate(self._blocks):
+            if block.get_label() is not None:
+                self._label_index[block.get_label()] = index
+        self._names = self._name_blocks()
+
+        num_blocks = len(self._blocks)
+        self._successors = [
+            self._find_successors(index) for index in range(num_blocks)
+        ]
+        predecessors = [[] for _ in range(num_blocks)]
+        for index, successors in enumerate(self._successors):
+            for successor in successors:
+                predecessors[successor].append(index)
+        self._predecessors = [tuple(preds) for preds in predecessors]
+        self._reverse_postorder = None
+        self._reachable = None
+
+    def get_num_blocks(self) -> int:
+        return len(self._blocks)
+
+    def get_blocks(self) -> tuple:
+        return self._blocks
+
+    def get_block(self, index: int):
+        return self._blocks[index]
+
+    def get_index(self, block) -> int:
+        return self._block_index[block]
+
+    def get_index_of_label(self, label: str) -> int:
+        return self._label_index[label]
+
+    def get_name(self, index: int) -> str:
+        """The label, or b1, b2, ... for unlabeled blocks like Bril's
+            reference tools
+        """
+        return self._names[index]
+
+    def get_names(self) -> list:
+        return self._names
+
+    def get_successors(self, index: int) -> tuple:
+        return self._successors[index]
+
+    def get_predecessors(self, index: int) -> tuple:
+        return self._predecessors[index]
+
+    def get_reverse_postorder(self) -> tuple:
+        """Blocks reachable from the entry, in reverse postorder"""
+        if self._reverse_postorder is None:
+            self._reverse_postorder = tuple(reversed(self._postorder()))
+            self._reachable = frozenset(self._reverse_postorder)
+        return self._reverse_postorder
+
+    def is_reachable(self, index: int) -> bool:
+        self.get_reverse_postorder()
+        return index in self._reachable
+
+    def _name_blocks(self) -> list:
+        names = []
+        fresh = 1
+        for block in self._blocks:
+            label = block.get_label()
+            if label is None:
+                while f"b{fresh}" in self._label_index:
+                    fresh += 1
+                label = f"b{fresh}"
+                fresh += 1
+            names.append(label)
+        return names
+
+    def _find_successors(self, index) -> tuple:
+        instrs = self._blocks[index].get_instructions()
+        if instrs:
+            last = instrs[-1]
+            if last.get_operator().get_name() in program.TERMINATORS:
+                targets = []
+                for label_id in range(last.get_num_labels()):
+                    label = last.get_label(label_id).get_value()
+                    if label not in self._label_index:
+                        raise ValueError(f"jump to unknown label .{label}")
+                    targets.append(self._label_index[label])
+                # br c .a .a is a single edge
+                return tuple(dict.fromkeys(targets))
+
+        if index + 1 < len(self._blocks):
+            return (index + 1,)
+        return ()
+
+    def _postorder(self) -> list:
+        if not self._blocks:
+            return []
+        order = []
+        visited = [False] * len(self._blocks)
+        visited[0] = True
+        # (block, position of the next successor to visit)
+        stack = [(0, 0)]
+        while stack:
+            index, position = stack[-1]
+            successors = self._successors[index]
+            if position < len(successors):
+                stack[-1] = (index, position + 1)
+                successor = successors[position]
+                if not visited[successor]:
+                    visited[successor] = True
+                    stack.append((successor, 0))
+            else:
+                stack.pop()
+                order.append(index)
+        return order
+
+
+class ControlFlowGraphAnalysis(manager.Analysis):
+    def run(self, func, analysis_manager):
+        return ControlFlowGraph(func)
+
+
+def add_entry_block(func) -> bool:
+    """Put a fresh empty block (entry1, entry2, ...) in front of func when
+        its first block has predecessors, like Bril's reference tools, so
+        that the entry is never a loop header. Returns True if one was
+        added; cached analyses of func are then stale
+    """
+    graph = ControlFlowGraph(func)
+    if graph.get_num_blocks() == 0 or not graph.get_predecessors(0):
+        return False
+    names = set(graph.get_names())
+    suffix = 1
+    while f"entry{suffix}" in names:
+        suffix += 1
+    first = graph.get_block(0)
+    func.insert_first_child(
+        program.BasicBlock(f"entry{suffix}", first.is_columnar()))
+    return True
+
+
+def add_terminators(func) -> bool:
+    """Label every block with its CFG name and end it with a terminator:
+        a jmp to the next block instead of falling through, ret after the
+        last one. The edges do not change. Returns True if func changed
+    """
+    graph = ControlFlowGraph(func)
+    names = graph.get_names()
+    builder = ir_builder.IRBuilder()
+    changed = False
+    for index, block in enumerate(graph.get_blocks()):
+        if block.get_label() is None:
+            block.set_label(names[index])
+            changed = True
+        instrs = block.get_instructions()
+        if instrs and instrs[-1].get_operator().get_name() in \
+                program.TERMINATORS:
+            continue
+        if index + 1 < len(names):
+            terminator = builder.build(
+                use.get_operator("jmp"), None, [],
+                [use.Identifier(names[index + 1],
+                                ir_type.get_type("basic-block"))])
+        else:
+            terminator = builder.build(use.get_operator("ret"), None, [], [])
+        block.add_instruction(terminator)
+        changed = True
+    return changed
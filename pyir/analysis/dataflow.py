@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+
+import heapq
+
+from pyir.analysis import cfg, manager
+from pyir.program import use
+
+
+class DataflowProblem:
+    """A dataflow problem over the blocks of a ControlFlowGraph. The
+        solver meets the values flowing into a block (from predecessors
+        when FORWARD, from successors otherwise) and applies transfer()
+        until nothing changes. Values may be anything comparable with ==
+    """
+    FORWARD = True
+
+    def __init__(self, graph: cfg.ControlFlowGraph):
+        self._cfg = graph
+
+    def get_cfg(self) -> cfg.ControlFlowGraph:
+        return self._cfg
+
+    def initial(self):
+        """The value of every block before the first visit"""
+        raise NotImplementedError
+
+    def meet(self, values: list):
+        """Combine the values flowing in; values may be empty"""
+        raise NotImplementedError
+
+    def transfer(self, index: int, value):
+        """The value leaving block index given the value entering it"""
+        raise NotImplementedError
+
+    def format(self, value) -> str:
+        return str(value)
+
+
+class BitsetProblem(DataflowProblem):
+    """Sets of variables as Python ints, bit i for the i-th variable;
+        subclasses give every block a gen and a kill set, the transfer
+        function is gen | (value & ~kill) and the meet is the union
+    """
+    def __init__(self, graph: cfg.ControlFlowGraph):
+        super().__init__(graph)
+        # name -> bit position, in first-seen order
+        self._variable_index = {}
+        self._variables = []
+        self._gen = []
+        self._kill = []
+        for block in graph.get_blocks():
+            gen, kill = self.local_sets(block)
+            self._gen.append(gen)
+            self._kill.append(kill)
+
+    def local_sets(self, block) -> tuple:
+        raise NotImplementedError
+
+    def get_bit(self, name: str) -> int:
+        bit = self._variable_index.get(name)
+        if bit is None:
+            bit = self._variable_index[name] = 1 << len(self._variables)
+            self._variables.append(name)
+        return bit
+
+    def get_names(self, bits: int) -> list:
+        names = []
+        position = 0
+        while bits:
+            if bits & 1:
+                names.append(self._variables[position])
+            bits >>= 1
+            position += 1
+        return names
+
+    def initial(self):
+        return 0
+
+    def meet(self, values: list):
+        result = 0
+        for value in values:
+            result |= value
+        return result
+
+    def transfer(self, index: int, value):
+        return self._gen[index] | (value & ~self._kill[index])
+
+    def format(self, value) -> str:
+        names = self.get_names(value)
+        if not names:
+            return "∅"
+        return ", ".join(sorted(names))
+
+
+class DefinedVariables(BitsetProblem):
+    """Variables possibly defined on some path reaching a point"""
+    FORWARD = True
+
+    def local_sets(self, block) -> tuple:
+        gen = 0
+        for instr in block.iter_instructions():
+            destination = instr.get_destination()
+            if destination is not None:
+                gen |= self.get_bit(destination.get_value())
+        return gen, 0
+
+
+class LiveVariables(BitsetProblem):
+    """Variables read later on some path before being written"""
+    FORWARD = False
+
+    def local_sets(self, block) -> tuple:
+        # gen: read before any write in the block, kill: written
+        gen = 0
+        kill = 0
+        get_bit = self.get_bit
+        identifier = use.Identifier
+        for instr in block.iter_instructions():
+            for operand_id in range(instr.get_num_operands()):
+                operand = instr.get_operand(operand_id)
+                if isinstance(operand, identifier):
+                    bit = get_bit(operand.get_value())
+                    if not kill & bit:
+                        gen |= bit
+            destination = instr.get_destination()
+            if destination is not None:
+                kill |= get_bit(destination.get_value())
+        return gen, kill
+
+
+class ConstantPropagation(DataflowProblem):
+    """Name -> constant value, or UNKNOWN when paths disagree or the
+        value is computed; names on no path reaching a point are absent
+    """
+    FORWARD = True
+    UNKNOWN = "?"
+    CONST_OPERATOR = use.get_operator("const")
+
+    def __init__(self, graph: cfg.ControlFlowGraph):
+        super().__init__(graph)
+        # per block: the last value written to each name
+        self._writes = [self._local_writes(block)
+                        for block in graph.get_blocks()]
+
+    def _local_writes(self, block) -> dict:
+        writes = {}
+        for instr in block.iter_instructions():
+            destination = instr.get_destination()
+            if destination is None:
+                continue
+            if instr.get_operator() is self.CONST_OPERATOR:
+                value = instr.get_operand(0).get_value()
+            else:
+                value = self.UNKNOWN
+            writes[destination.get_value()] = value
+        return writes
+
+    def initial(self):
+        return {}
+
+    def meet(self, values: list):
+        result = {}
+        for value in values:
+            for name, constant in value.items():
+                if name not in result:
+                    result[name] = constant
+                elif result[name] != constant or \
+                        type(result[name]) is not type(constant):
+                    result[name] = self.UNKNOWN
+        return result
+
+    def transfer(self, index: int, value):
+        writes = self._writes[index]
+        if not writes:
+            return value
+        result = dict(value)
+        result.update(writes)
+        return result
+
+    def format(self, value) -> str:
+        if not value:
+            return "∅"
+        return ", ".join(f"{name}: {value[name]}" for name in sorted(value))
+
+
+class DataflowResult:
+    """The values at the entry (get_in) and exit (get_out) of every block
+    """
+    def __init__(self, problem: DataflowProblem, ins: list, outs: list,
+                 num_visits: int):
+        self._problem = problem
+        self._ins = ins
+        self._outs = outs
+        self.num_visits = num_visits
+
+    def get_problem(self) -> DataflowProblem:
+        return self._problem
+
+    def get_in(self, index: int):
+        return self._ins[index]
+
+    def get_out(self, index: int):
+        return self._outs[index]
+
+
+def solve(problem: DataflowProblem) -> DataflowResult:
+    """Worklist solver. Blocks are visited by priority, reverse postorder
+        for forward problems and postorder for backward ones, so that
+        acyclic regions settle in a single sweep; unreachable blocks come
+        last
+    """
+    graph = problem.get_cfg()
+    num_blocks = graph.get_num_blocks()
+    order = list(graph.get_reverse_postorder())
+    if not problem.FORWARD:
+        order.reverse()
+    reachable = set(order)
+    order.extend(i for i in range(num_blocks) if i not in reachable)
+
+    priority = [0] * num_blocks
+    for position, index in enumerate(order):
+        priority[index] = position
+
+    if problem.FORWARD:
+        sources, targets = graph.get_predecessors, graph.get_successors
+    else:
+        sources, targets = graph.get_successors, graph.get_predecessors
+
+    # before: the meet of the sources, after: the transferred value
+    before = [problem.initial() for _ in range(num_blocks)]
+    after = [problem.initial() for _ in range(num_blocks)]
+
+    # a heap of positions in the order; every block is visited once
+    worklist = list(range(num_blocks))
+    queued = [True] * num_blocks
+    num_visits = 0
+    while worklist:
+        index = order[heapq.heappop(worklist)]
+        queued[index] = False
+        num_visits += 1
+        value_in = problem.meet([after[s] for s in sources(index)])
+        before[index] = value_in
+        value_out = problem.transfer(index, value_in)
+        if value_out == after[index]:
+            continue
+        after[index] = value_out
+        for target in targets(index):
+            if not queued[target]:
+                queued[target] = True
+                heapq.heappush(worklist, priority[target])
+
+    if problem.FORWARD:
+        return DataflowResult(problem, before, after, num_visits)
+    return DataflowResult(problem, after, before, num_visits)
+
+
+class LiveVariablesAnalysis(manager.Analysis):
+    REQUIRES = (cfg.ControlFlowGraphAnalysis,)
+
+    def run(self, func, analysis_manager):
+        graph = analysis_manager.get(cfg.ControlFlowGraphAnalysis, func)
+        return solve(LiveVariables(graph))
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import manager
+
+
+class DefUseAnalysis(manager.Analysis):
+    """The function's def-use chains (program.def_use.DefUseChains)"""
+    # the chains follow every change of the function on their own
+    SELF_MAINTAINED = True
+
+    def run(self, func, analysis_manager):
+        return func.get_def_use()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import cfg, manager
+
+
+class DominatorTree:
+    """Dominators of the reachable blocks of a ControlFlowGraph, by the
+        iterative algorithm of Cooper, Harvey and Kennedy ("A Simple, Fast
+        Dominance Algorithm"): immediate dominators are refined in reverse
+        postorder, intersecting along the partial tree, until stable.
+        Blocks are the CFG's integer indices; unreachable blocks have no
+        dominator and dominate nothing.
+    """
+    UNDEFINED = -1
+
+    def __init__(self, graph: cfg.ControlFlowGraph):
+        self._cfg = graph
+        num_blocks = graph.get_num_blocks()
+        self._idom = [self.UNDEFINED] * num_blocks
+        self._frontiers = None
+        if num_blocks == 0:
+            self._children = []
+            self._preorder = ()
+            return
+        self._compute_idoms()
+        self._children = [[] for _ in range(num_blocks)]
+        for index in graph.get_reverse_postorder()[1:]:
+            self._children[self._idom[index]].append(index)
+        for children in self._children:
+            children.sort()
+        self._number_tree()
+
+    def get_cfg(self) -> cfg.ControlFlowGraph:
+        return self._cfg
+
+    def get_immediate_dominator(self, index: int):
+        """None for the entry and for unreachable blocks"""
+        idom = self._idom[index]
+        if idom == self.UNDEFINED or index == 0:
+            return None
+        return idom
+
+    def get_children(self, index: int) -> list:
+        """Blocks immediately dominated by index, in index order"""
+        return self._children[index]
+
+    def get_preorder(self) -> tuple:
+        """Reachable blocks, parents before children"""
+        return self._preorder
+
+    def dominates(self, dominator: int, index: int) -> bool:
+        if self._idom[dominator] == self.UNDEFINED or \
+                self._idom[index] == self.UNDEFINED:
+            return False
+        # an interval of the tree's depth-first numbering holds a subtree
+        return self._enter[dominator] <= self._enter[index] and \
+            self._leave[index] <= self._leave[dominator]
+
+    def strictly_dominates(self, dominator: int, index: int) -> bool:
+        return dominator != index and self.dominates(dominator, index)
+
+    def get_dominators(self, index: int) -> list:
+        """index and every block dominating it, from index up to the entry
+        """
+        if self._idom[index] == self.UNDEFINED:
+            return []
+        dominators = [index]
+        while index != 0:
+            index = self._idom[index]
+            dominators.append(index)
+        return dominators
+
+    def get_frontier(self, index: int) -> set:
+        if self._frontiers is None:
+            self._frontiers = self._compute_frontiers()
+        return self._frontiers[index]
+
+    def _compute_idoms(self):
+        graph = self._cfg
+        order = graph.get_reverse_postorder()
+        # position of the blocks in reverse postorder
+        position = [self.UNDEFINED] * graph.get_num_blocks()
+        for i, index in enumerate(order):
+            position[index] = i
+        predecessors = [
+            [p for p in graph.get_predecessors(index)
+             if position[p] != self.UNDEFINED]
+            for index in range(graph.get_num_blocks())
+        ]
+
+        idom = self._idom
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for index in order[1:]:
+                new_idom = self.UNDEFINED
+                for predecessor in predecessors[index]:
+                    if idom[predecessor] == self.UNDEFINED:
+                        continue
+                    if new_idom == self.UNDEFINED:
+                        new_idom = predecessor
+                        continue
+                    # intersect: climb the deeper finger first
+                    finger = predecessor
+                    while finger != new_idom:
+                        while position[finger] > position[new_idom]:
+                            finger = idom[finger]
+                        while position[new_idom] > position[finger]:
+                            new_idom = idom[new_idom]
+                if idom[index] != new_idom:
+                    idom[index] = new_idom
+                    changed = True
+
+    def _number_tree(self):
+        num_blocks = self._cfg.get_num_blocks()
+        self._enter = [0] * num_blocks
+        self._leave = [0] * num_blocks
+        preorder = []
+        clock = 0
+        stack = [(0, False)]
+        while stack:
+            index, leaving = stack.pop()
+            clock += 1
+            if leaving:
+                self._leave[index] = clock
+                continue
+            self._enter[index] = clock
+            preorder.append(index)
+            stack.append((index, True))
+            for child in reversed(self._children[index]):
+                stack.append((child, False))
+        self._preorder = tuple(preorder)
+
+    def _compute_frontiers(self) -> list:
+        graph = self._cfg
+        idom = self._idom
+        frontiers = [set() for _ in range(graph.get_num_blocks())]
+        for index in graph.get_reverse_postorder():
+            predecessors = [
+                p for p in graph.get_predecessors(index)
+                if idom[p] != self.UNDEFINED
+            ]
+            # the entry is a join with the implicit edge from outside
+            if len(predecessors) < (1 if index == 0 else 2):
+                continue
+            # the entry's own dominator lies above it
+            stop = self.UNDEFINED if index == 0 else idom[index]
+            for runner in predecessors:
+                while runner != stop:
+                    frontiers[runner].add(index)
+                    runner = self.UNDEFINED if runner == 0 else idom[runner]
+        return frontiers
+
+
+class DominatorTreeAnalysis(manager.Analysis):
+    REQUIRES = (cfg.ControlFlowGraphAnalysis,)
+
+    def run(self, func, analysis_manager):
+        return DominatorTree(
+            analysis_manager.get(cfg.ControlFlowGraphAnalysis, func))
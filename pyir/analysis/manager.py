@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+from pyir import component, instrumentation
+
+
+class Analysis(object):
+    """A fact computed over one function, e.g. its CFG. Results are
+        cached by the AnalysisManager until a pass changes the function
+        without preserving them
+    """
+    # analyses the result is built from: invalidating one of them
+    #  invalidates this one too
+    REQUIRES = ()
+    # the result keeps itself up to date and is never invalidated
+    SELF_MAINTAINED = False
+
+    def run(self, func, analysis_manager):
+        """Compute the result; other analyses are read through
+            analysis_manager.get()
+        """
+        raise NotImplementedError
+
+
+class AnalysisManager(component.PYIRComponent):
+    def __init__(self):
+        super().__init__()
+        # Function -> {analysis class: result}
+        self._results = {}
+
+    def get(self, analysis_class, func):
+        results = self._results.setdefault(func, {})
+        if analysis_class in results:
+            instrumentation.count("analysis cache hits")
+            return results[analysis_class]
+
+        instrumentation.count("analyses computed")
+        result = analysis_class().run(func, self)
+        results[analysis_class] = result
+        return result
+
+    def is_cached(self, analysis_class, func) -> bool:
+        return analysis_class in self._results.get(func, ())
+
+    def invalidate(self, func, preserved=()):
+        """func changed: drop every result neither preserved nor
+            self-maintained, and whatever was built from a dropped one
+        """
+        results = self._results.get(func)
+        if not results:
+            return
+
+        invalid = set()
+        for analysis_class in results:
+            if analysis_class.SELF_MAINTAINED:
+                continue
+            if analysis_class not in preserved:
+                invalid.add(analysis_class)
+
+        grown = True
+        while grown:
+            grown = False
+            for analysis_class in results:
+                if analysis_class in invalid or \
+                        analysis_class.SELF_MAINTAINED:
+                    continue
+                if any(dep in invalid for dep in analysis_class.REQUIRES):
+                    invalid.add(analysis_class)
+                    grown = True
+
+        for analysis_class in invalid:
+            del results[analysis_class]
+
+    def clear(self):
+        self._results.clear()
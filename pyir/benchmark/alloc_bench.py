@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Allocations of parsing and value numbering, traced with tracemalloc:
+    the memory blocks still alive afterwards (per instruction and per
+    pyir source file) and the peak of the traced memory
+
+    python3 -m pyir.benchmark.alloc_bench [bril files...]
+"""
+
+import gc
+import glob
+import os
+import sys
+import tracemalloc
+
+from pyir.benchmark import bril_gen
+from pyir.driver import build_pass_manager
+from pyir.interface import bril
+
+PASSES = ["pyir.redundancy.lvn.LocalValueNumbering"]
+
+
+def trace(texts):
+    interface = bril.BrilInterface()
+    pass_manager = build_pass_manager(PASSES)
+
+    tracemalloc.start(1)
+    modules = [interface.parse_text(text) for text in texts]
+    for module in modules:
+        pass_manager.transform(module)
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_instrs = sum(bril_gen.count_instructions(m) for m in modules)
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(True, os.path.join(package_dir, "*"))
+    ])
+    return num_instrs, peak, snapshot.statistics("filename")
+
+
+def report(label, texts):
+    num_instrs, peak, stats = trace(texts)
+    num_blocks = sum(stat.count for stat in stats)
+    print(f"== {label}: {num_instrs} instrs, "
+          f"{num_blocks / num_instrs:.1f} live blocks/instr, "
+          f"peak {peak / 1024:.0f} KiB")
+    for stat in stats[:6]:
+        file_name = os.path.relpath(stat.traceback[0].filename)
+        print(f"   {file_name:>45}: {stat.count:7d} blocks "
+              f"{stat.size / 1024:8.0f} KiB")
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob("bril_test/lvn/*.bril"))
+    texts = []
+    for path in paths:
+        with open(path) as f:
+            texts.append(f.read())
+    if texts:
+        report(f"{len(texts)} files", texts)
+    report("synthetic", [bril_gen.generate_bril(
+        blocks_per_function=100, instrs_per_block=100)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""The binary module format against Bril JSON: size, dump time (module
+    to bytes) and load time (file to module), plus the time to open a
+    binary file and decode a single function of it
+
+    python3 -m pyir.benchmark.binary_bench [num_instructions...]
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import binary, bril
+
+
+def best_of(function, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    typecheck.set_checked(False)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    interface = bril.BrilInterface()
+    binary_interface = binary.BinaryInterface()
+    for num_instrs in sizes:
+        text = bril_gen.generate_bril(
+            num_functions=max(1, num_instrs // 1000),
+            blocks_per_function=10,
+            instrs_per_block=100,
+            num_variables=64
+        )
+        module = interface.parse_text(text)
+
+        json_dump, json_data = best_of(
+            lambda: json.dumps(interface.dump_json(module)).encode())
+        binary_dump, binary_data = best_of(
+            lambda: binary_interface.dump(module))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "module.json")
+            binary_path = os.path.join(tmp_dir, "module.pyir")
+            with open(json_path, "wb") as f:
+                f.write(json_data)
+            with open(binary_path, "wb") as f:
+                f.write(binary_data)
+
+            def load_json():
+                with open(json_path, "rb") as f:
+                    return interface.parse_json(f.read())
+
+            def load_one_function():
+                with binary_interface.open(binary_path) as reader:
+                    return reader.read_function(
+                        reader.get_function_names()[-1])
+
+            json_load, _ = best_of(load_json)
+            binary_load, _ = best_of(
+                lambda: binary_interface.load(binary_path))
+            lazy_load, _ = best_of(load_one_function)
+
+        num_instrs = bril_gen.count_instructions(module)
+        num_functions = len(module.get_functions())
+        print(f"{num_instrs} instrs in {num_functions} functions")
+        print(f"  size: json {len(json_data):>10,} B, "
+              f"binary {len(binary_data):>10,} B "
+              f"({len(json_data) / len(binary_data):.1f}x smaller)")
+        print(f"  dump: json {json_dump:9.4f}s, binary {binary_dump:9.4f}s "
+              f"({json_dump / binary_dump:.1f}x)")
+        print(f"  load: json {json_load:9.4f}s, binary {binary_load:9.4f}s "
+              f"({json_load / binary_load:.1f}x), "
+              f"one function {lazy_load:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+import random
+
+
+def generate_bril(
+    num_functions=1,
+    blocks_per_function=1,
+    instrs_per_block=100,
+    num_variables=16,
+    seed=0
+):
+    """Generate a synthetic but well-formed Bril program in text form.
+        Every block ends with a jmp/br to a later block so the CFG is
+        acyclic, and roughly half of the arithmetic is redundant so the
+        redundancy passes have something to remove
+    """
+    rng = random.Random(seed)
+    BINARY_OPS = ["add", "sub", "mul"]
+    lines = []
+    for func_i in range(num_functions):
+        name = "main" if func_i == 0 else f"f{func_i}"
+        lines.append(f"@{name} {{")
+        for var_i in range(num_variables):
+            lines.append(f"  v{var_i}: int = const {rng.randint(0, 9)};")
+        for block_i in range(blocks_per_function):
+            lines.append(f".b{block_i}:")
+            for instr_i in range(instrs_per_block):
+                dest = f"v{rng.randrange(num_variables)}"
+                lhs = f"v{rng.randrange(num_variables)}"
+                rhs = f"v{rng.randrange(num_variables // 2)}"
+                choice = rng.random()
+                if choice < 0.1:
+                    lines.append(f"  {dest}: int = const {rng.randint(0, 9)};")
+                elif choice < 0.2:
+                    lines.append(f"  {dest}: int = id {lhs};")
+                elif choice < 0.25:
+                    lines.append(f"  print {lhs};")
+                else:
+                    op = rng.choice(BINARY_OPS)
+                    lines.append(f"  {dest}: int = {op} {lhs} {rhs};")
+            if block_i + 1 == blocks_per_function:
+                continue
+            if rng.random() < 0.5 and block_i + 2 < blocks_per_function:
+                lines.append(f"  c{block_i}: bool = lt v0 v1;")
+                lines.append(
+                    f"  br c{block_i} .b{block_i + 1} .b{block_i + 2};")
+            else:
+                lines.append(f"  jmp .b{block_i + 1};")
+        lines.append("  print v0;")
+        lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def count_instructions(module):
+    count = 0
+    for func in module.get_functions():
+        count += len(func.get_instructions())
+    return count
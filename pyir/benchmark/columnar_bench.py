@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Object graph against columnar instruction storage: module size,
+    the "collect all used identifiers" scan of TDCE, and a full tdce run
+
+    python3 -m pyir.benchmark.columnar_bench [num_instructions]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+from pyir.redundancy import tdce
+
+
+def parse(text, columnar_storage):
+    interface = bril.BrilInterface(columnar_storage)
+    gc.collect()
+    tracemalloc.start()
+    module = interface.parse_text(text)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return module, size
+
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    typecheck.set_checked(False)
+    num_instrs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = bril_gen.generate_bril(
+        blocks_per_function=max(1, num_instrs // 100),
+        instrs_per_block=100
+    )
+
+    for columnar_storage in (False, True):
+        label = "columnar" if columnar_storage else "objects"
+        module, size = parse(text, columnar_storage)
+        count = bril_gen.count_instructions(module)
+        func = module.get_functions()[0]
+        scan = best_of(5, func.get_used_names)
+        dce = best_of(1, lambda: tdce.TrivialDeadCodeElimination()
+                      .transform(module))
+        print(f"{label:>9}: {size / count:6.1f} bytes/instr, "
+              f"used-identifier scan {scan * 1000:8.2f} ms, "
+              f"tdce {dce:6.3f}s ({count} instrs)")
+
+
+if __name__ == "__main__":
+    main()
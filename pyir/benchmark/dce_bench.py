@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Dead code elimination on a chain of N dead definitions
+    (v1 = id v0; v2 = id v1; ...): the whole-function fixpoint of
+    tdce-one and dkp against the worklist-driven tdce
+
+    python3 -m pyir.benchmark.dce_bench [chain lengths...]
+"""
+
+import sys
+import time
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+from pyir.redundancy import tdce
+
+
+def dead_chain(length):
+    lines = ["@main {", "  v0: int = const 1;"]
+    for i in range(1, length):
+        lines.append(f"  v{i}: int = id v{i - 1};")
+    lines.append("  print v0;")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def fixpoint(module):
+    passes = [
+        tdce.InusedIdentifierElimination(),
+        tdce.InusedDefinitionElimination(),
+    ]
+    while True:
+        program_changed = False
+        for compiler_pass in passes:
+            program_changed |= compiler_pass.transform(module)
+        if not program_changed:
+            break
+
+
+def worklist(module):
+    tdce.TrivialDeadCodeElimination().transform(module)
+
+
+def measure(text, run):
+    module = bril.BrilInterface().parse_text(text)
+    start = time.perf_counter()
+    run(module)
+    elapsed = time.perf_counter() - start
+    return elapsed, bril_gen.count_instructions(module)
+
+
+def main():
+    typecheck.set_checked(False)
+    lengths = [int(arg) for arg in sys.argv[1:]] or [250, 500, 1000, 2000]
+    for length in lengths:
+        text = dead_chain(length)
+        slow, slow_left = measure(text, fixpoint)
+        fast, fast_left = measure(text, worklist)
+        if slow_left != fast_left:
+            raise AssertionError("fixpoint and worklist disagree")
+        print(f"chain {length:>6}: fixpoint {slow:8.3f}s, "
+              f"worklist {fast:8.4f}s ({slow / fast:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Dominators of a random CFG of N blocks with loops: the iterative
+    Cooper-Harvey-Kennedy algorithm of DominatorTree against the textbook
+    fixpoint over dominator sets, dom(b) = {b} | intersection of dom(p)
+    for the predecessors p. The naive sets take O(N^2) memory, so it only
+    runs up to a few thousand blocks
+
+    python3 -m pyir.benchmark.dom_bench [block counts...]
+"""
+
+import random
+import sys
+import time
+
+from pyir import typecheck
+from pyir.analysis import cfg, dominance
+from pyir.interface import bril
+
+NAIVE_LIMIT = 4000
+
+
+def random_cfg(num_blocks, seed=0):
+    """Mostly forward branches, one in eight jumping back"""
+    rng = random.Random(seed)
+    lines = ["@main {", "  c: bool = const true;"]
+    for block_i in range(num_blocks):
+        lines.append(f".b{block_i}:")
+        lines.append(f"  x{block_i}: int = const {block_i};")
+        if block_i + 1 == num_blocks:
+            break
+        choice = rng.random()
+        if choice < 0.125:
+            target = rng.randrange(block_i + 1)
+            lines.append(f"  br c .b{block_i + 1} .b{target};")
+        elif choice < 0.6:
+            target = rng.randrange(block_i + 1, min(num_blocks, block_i + 20))
+            lines.append(f"  br c .b{block_i + 1} .b{target};")
+        elif choice < 0.8:
+            target = rng.randrange(block_i + 1, min(num_blocks, block_i + 20))
+            lines.append(f"  jmp .b{target};")
+        # else: fall through
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def naive_dominators(graph):
+    order = graph.get_reverse_postorder()
+    every_block = set(order)
+    dominators = {index: every_block for index in order}
+    dominators[0] = {0}
+    changed = True
+    while changed:
+        changed = False
+        for index in order[1:]:
+            new = None
+            for predecessor in graph.get_predecessors(index):
+                if predecessor not in dominators:
+                    continue
+                if new is None:
+                    new = set(dominators[predecessor])
+                else:
+                    new &= dominators[predecessor]
+            new.add(index)
+            if new != dominators[index]:
+                dominators[index] = new
+                changed = True
+    return dominators
+
+
+def main():
+    typecheck.set_checked(False)
+    sizes = [int(arg) for arg in sys.argv[1:]] or \
+        [500, 1000, 4000, 20000, 50000]
+    for size in sizes:
+        module = bril.BrilInterface().parse_text(random_cfg(size))
+        graph = cfg.ControlFlowGraph(module.get_functions()[0])
+        graph.get_reverse_postorder()
+
+        start = time.perf_counter()
+        tree = dominance.DominatorTree(graph)
+        for index in graph.get_reverse_postorder():
+            tree.get_frontier(index)
+        fast = time.perf_counter() - start
+
+        line = f"{size:>6} blocks: chk+frontiers {fast:8.4f}s"
+        if size <= NAIVE_LIMIT:
+            start = time.perf_counter()
+            expected = naive_dominators(graph)
+            slow = time.perf_counter() - start
+            for index, dominators in expected.items():
+                if set(tree.get_dominators(index)) != dominators:
+                    raise AssertionError(f"dominators of block {index}")
+            line += f", naive sets {slow:8.4f}s ({slow / fast:6.1f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Dynamic instruction counts of the bril_test programs after local and
+    dominator-based value numbering or sparse conditional constant
+    propagation, each followed by tdce. The programs run on a small
+    interpreter of the IR; a pipeline whose output differs from the
+    unoptimized program's is reported as a mismatch. The ssa columns go
+    through to-ssa and from-ssa, which add copies of their own
+
+    python3 -m pyir.benchmark.gvn_bench [files or directories...]
+"""
+
+import sys
+
+from pyir import driver, ir_pass, typecheck
+from pyir.analysis import cfg
+from pyir.interface import bril
+from pyir.program import use
+from pyir.redundancy import gvn, lvn, sccp, tdce
+from pyir.redundancy.numbering import extension
+from pyir.ssa import construction, destruction
+
+MAX_STEPS = 1000000
+
+PIPELINES = {
+    "none": [],
+    "lvn": [lvn.LocalValueNumbering, tdce.TrivialDeadCodeElimination],
+    "gvn": [gvn.GlobalValueNumbering, tdce.TrivialDeadCodeElimination],
+    "lvn-fold": [lvn.LocalValueNumberingConstantFold,
+                 tdce.TrivialDeadCodeElimination],
+    "gvn-fold": [gvn.GlobalValueNumberingConstantFold,
+                 tdce.TrivialDeadCodeElimination],
+    "ssa": [construction.SSAConstruction, destruction.SSADestruction,
+            tdce.TrivialDeadCodeElimination],
+    "ssa+gvn": [construction.SSAConstruction, gvn.GlobalValueNumbering,
+                destruction.SSADestruction,
+                tdce.TrivialDeadCodeElimination],
+    "ssa+sccp": [construction.SSAConstruction,
+                 sccp.SparseConditionalConstantPropagation,
+                 destruction.SSADestruction,
+                 tdce.TrivialDeadCodeElimination],
+}
+
+
+class ExecutionError(Exception):
+    pass
+
+
+def format_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def execute(func, args: list):
+    """Run func, returns (printed lines, number of executed instructions)
+    """
+    graph = cfg.ControlFlowGraph(func)
+    names = graph.get_names()
+    env = {arg.get_value(): value
+           for arg, value in zip(func.get_arguments(), args)}
+    output = []
+    steps = 0
+    index = 0
+    previous = None
+
+    def read(operand):
+        if isinstance(operand, use.Identifier):
+            if operand.get_value() not in env:
+                raise ExecutionError(f"undefined {operand.get_value()}")
+            return env[operand.get_value()]
+        return operand.get_value()
+
+    while index is not None and graph.get_num_blocks() > 0:
+        block = graph.get_block(index)
+        successors = graph.get_successors(index)
+        next_index = successors[0] if successors else None
+        # phis read the values from before any of them is written
+        phi_values = {}
+        for instr in block.iter_instructions():
+            steps += 1
+            if steps > MAX_STEPS:
+                raise ExecutionError("too many steps")
+            operator = instr.get_operator()
+            name = operator.get_name()
+            destination = instr.get_destination()
+            if name == "phi":
+                for i in range(instr.get_num_labels()):
+                    if instr.get_label(i).get_value() == previous:
+                        phi_values[destination.get_value()] = \
+                            env.get(instr.get_operand(i).get_value())
+                continue
+            env.update(phi_values)
+            phi_values = {}
+
+            operands = [read(instr.get_operand(i))
+                        for i in range(instr.get_num_operands())]
+            if name == "const" or name == "id":
+                env[destination.get_value()] = operands[0]
+            elif name == "print":
+                output.append(" ".join(map(format_value, operands)))
+            elif name == "jmp" or name == "br":
+                label_id = 0 if name == "jmp" or operands[0] else 1
+                next_index = graph.get_index_of_label(
+                    instr.get_label(label_id).get_value())
+            elif name == "ret":
+                next_index = None
+            elif operator in extension.ConstantFoldExtension.EQUATIONS:
+                try:
+                    env[destination.get_value()] = \
+                        extension.ConstantFoldExtension.EQUATIONS[operator](
+                            tuple(operands))
+                except ZeroDivisionError:
+                    raise ExecutionError("division by zero")
+            else:
+                raise ExecutionError(f"cannot run {name}")
+        env.update(phi_values)
+        previous = names[index]
+        index = next_index
+    return output, steps
+
+
+def program_args(path) -> list:
+    """The values of the # ARGS: line; the lvn and tdce tests put pass
+        names there, which run the program without arguments
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.startswith("# ARGS:"):
+                continue
+            args = []
+            for token in line[len("# ARGS:"):].split():
+                if token in ("true", "false"):
+                    args.append(token == "true")
+                elif token.lstrip("-").isdigit():
+                    args.append(int(token))
+                else:
+                    return []
+            return args
+    return []
+
+
+def has_phis(path) -> bool:
+    module = bril.BrilInterface().parse(path)
+    return any(instr.get_operator().get_name() == "phi"
+               for func in module.get_functions()
+               for instr in func.iter_instructions())
+
+
+def run_pipeline(path, passes):
+    module = bril.BrilInterface().parse(path)
+    pass_manager = ir_pass.PassManager()
+    for pass_class in passes:
+        pass_manager.add_pass(pass_class())
+    pass_manager.transform(module)
+    main = [func for func in module.get_functions()
+            if func.get_value() == "main"][0]
+    return execute(main, program_args(path))
+
+
+def main():
+    typecheck.set_checked(False)
+    sources = driver.collect_inputs(sys.argv[1:] or ["bril_test"])
+    columns = list(PIPELINES)
+    totals = dict.fromkeys(columns, 0)
+    print(f"{'program':<36}" + "".join(f"{c:>9}" for c in columns))
+    num_programs = 0
+    for path in sources:
+        try:
+            if has_phis(path):
+                # to-ssa renames existing phis like any other instruction
+                raise ExecutionError("already in SSA form")
+            expected, _ = run_pipeline(path, [])
+        except Exception as e:
+            print(f"{path:<36} skipped: {e}")
+            continue
+        counts = {}
+        for column, passes in PIPELINES.items():
+            try:
+                output, steps = run_pipeline(path, passes)
+            except Exception as e:
+                print(f"{path}: {column} fails: {e!r}")
+                output, steps = None, 0
+            counts[column] = steps
+            if output is not None and output != expected:
+                print(f"{path}: {column} changes the output")
+        num_programs += 1
+        for column in columns:
+            totals[column] += counts[column]
+        name = path if len(path) <= 36 else "..." + path[-33:]
+        print(f"{name:<36}" + "".join(f"{counts[c]:>9}" for c in columns))
+    print(f"{f'total ({num_programs} programs)':<36}" +
+          "".join(f"{totals[c]:>9}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Cost of reading the children of the IR without mutating it: repeated
+    get_instructions() snapshots and lazy iteration, timed and traced
+
+    python3 -m pyir.benchmark.iteration_bench [num_instructions]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+
+REPEAT = 20
+
+
+def walk_snapshots(module):
+    count = 0
+    for func in module.get_functions():
+        for _ in range(REPEAT):
+            for block in func.get_basic_blocks():
+                count += len(block.get_instructions())
+            count += len(func.get_instructions())
+    return count
+
+
+def walk_lazily(module):
+    count = 0
+    for func in module.iter_functions():
+        for _ in range(REPEAT):
+            for instr in func.iter_instructions():
+                count += 1
+    return count
+
+
+def measure(label, walk, module):
+    # the first walk fills the caches
+    walk(module)
+    start = time.perf_counter()
+    walk(module)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    walk(module)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>10}: {elapsed * 1000:8.2f} ms, "
+          f"peak allocation {peak / 1024:8.1f} KiB")
+
+
+def main():
+    typecheck.set_checked(False)
+    num_instrs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    module = bril.BrilInterface().parse_text(bril_gen.generate_bril(
+        blocks_per_function=max(1, num_instrs // 100),
+        instrs_per_block=100
+    ))
+    print(f"{REPEAT} reads of {bril_gen.count_instructions(module)} instrs")
+    measure("snapshots", walk_snapshots, module)
+    measure("lazy", walk_lazily, module)
+
+
+if __name__ == "__main__":
+    main()
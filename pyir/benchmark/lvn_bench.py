@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Local value numbering on one large straight-line block: the cost per
+    instruction of numbering alone (LocalNumberingTable.add_entry, which
+    hashes a NumberingValue per instruction) and of the whole lvn pass.
+    The table lookups are also replayed with the textual repr of the
+    values as keys, the way NumberingValue used to be hashed
+
+    python3 -m pyir.benchmark.lvn_bench [block sizes...]
+"""
+
+import gc
+import sys
+import time
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+from pyir.redundancy import lvn
+from pyir.redundancy.numbering import encoding, extension, table
+
+
+def straight_line_block(num_instrs):
+    text = bril_gen.generate_bril(
+        blocks_per_function=1,
+        instrs_per_block=num_instrs,
+        num_variables=64
+    )
+    module = bril.BrilInterface().parse_text(text)
+    func = module.get_functions()[0]
+    return module, func.get_basic_blocks()[-1]
+
+
+def number_block(block):
+    lvn_table = table.LocalNumberingTable(block)
+    lvn_table.add_extensions(
+        extension.CommutativityExtension(),
+        extension.CopyPropagationExtension(),
+    )
+    for instr in block.iter_instructions():
+        lvn_table.add_entry(instr)
+    return lvn_table
+
+
+def replay_lookups(values, make_key):
+    """Insert every value, then look every value up again"""
+    gc.disable()
+    start = time.perf_counter()
+    value_to_entry = {}
+    for value in values:
+        value_to_entry.setdefault(make_key(value), value)
+    for value in values:
+        value_to_entry[make_key(value)]
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    return elapsed
+
+
+def fresh_values(lvn_table):
+    # values whose cached key is not computed yet
+    return [
+        encoding.NumberingValue(
+            entry.value.get_operator(),
+            [entry.value.get_operand(i)
+             for i in range(entry.value.get_num_operands())]
+        )
+        for entry in lvn_table._entries
+    ]
+
+
+def main():
+    typecheck.set_checked(False)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        _, block = straight_line_block(size)
+        num_instrs = len(block.get_instructions())
+        gc.collect()
+        start = time.perf_counter()
+        lvn_table = number_block(block)
+        numbering = time.perf_counter() - start
+
+        structural = replay_lookups(fresh_values(lvn_table), lambda v: v)
+        textual = replay_lookups(fresh_values(lvn_table), repr)
+
+        module, block = straight_line_block(size)
+        gc.collect()
+        start = time.perf_counter()
+        lvn.LocalValueNumbering().local_optimize(block)
+        whole_pass = time.perf_counter() - start
+
+        per_instr = lambda seconds: seconds / num_instrs * 1e6
+        print(f"{num_instrs:>7} instrs: "
+              f"numbering {per_instr(numbering):6.2f} us/instr, "
+              f"lvn pass {per_instr(whole_pass):6.2f} us/instr, "
+              f"table lookups {per_instr(structural):5.2f} us/instr "
+              f"(repr keys {per_instr(textual):5.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""lvn-fold and dkp with and without a BlockMemo, on a module whose
+    functions are renamed copies of a few generated ones, the way
+    inlined or macro-expanded code repeats. Reports the time per
+    instruction, the memo hit rate, and checks that both outputs match
+
+    python3 -m pyir.benchmark.memo_bench [copies per function...]
+"""
+
+import gc
+import json
+import re
+import sys
+import time
+
+from pyir import memo, typecheck
+from pyir.benchmark import bril_gen
+from pyir.driver import build_pass_manager
+from pyir.interface import bril
+
+PASSES = [
+    "pyir.redundancy.lvn.LocalValueNumberingConstantFold",
+    "pyir.redundancy.tdce.InusedDefinitionElimination",
+]
+NUM_TEMPLATES = 4
+
+
+def repeated_module(copies):
+    """NUM_TEMPLATES functions, copies times each, with the variables of
+        every copy renamed; the shapes of their blocks repeat
+    """
+    lines = []
+    for template_i in range(NUM_TEMPLATES):
+        text = bril_gen.generate_bril(
+            blocks_per_function=8,
+            instrs_per_block=20,
+            num_variables=12,
+            seed=template_i
+        )
+        for copy_i in range(copies):
+            prefix = f"t{template_i}c{copy_i}_"
+            lines.append(re.sub(
+                r"\b([vc]\d+)",
+                lambda m: prefix + m.group(1),
+                text.replace("@main", f"@{prefix}f")
+            ))
+    return "".join(lines)
+
+
+def run(text, block_memo):
+    interface = bril.BrilInterface()
+    module = interface.parse_text(text)
+    pass_manager = build_pass_manager(PASSES, block_memo=block_memo)
+    gc.collect()
+    start = time.perf_counter()
+    pass_manager.transform(module)
+    elapsed = time.perf_counter() - start
+    num_instrs = bril_gen.count_instructions(interface.parse_text(text))
+    return num_instrs, elapsed, json.dumps(interface.dump_json(module))
+
+
+def main():
+    typecheck.set_checked(False)
+    copy_counts = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    for copies in copy_counts:
+        text = repeated_module(copies)
+        num_instrs, plain, expected = run(text, None)
+        block_memo = memo.BlockMemo()
+        _, memoized, output = run(text, block_memo)
+        stats = block_memo.get_stats()
+        lookups = stats["hits"] + stats["misses"]
+        per_instr = lambda seconds: seconds / num_instrs * 1e6
+        print(f"{copies:>4} copies, {num_instrs:>6} instrs: "
+              f"plain {per_instr(plain):6.2f} us/instr, "
+              f"memo {per_instr(memoized):6.2f} us/instr "
+              f"({plain / memoized:4.1f}x, "
+              f"{stats['hits'] / max(lookups, 1):4.0%} hits)"
+              + ("" if output == expected else "  OUTPUT DIFFERS"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Resident size of the IR: bytes per instruction held by a parsed module,
+    measured with tracemalloc (type checks are off, as in production)
+
+    python3 -m pyir.benchmark.memory_bench [num_instructions...]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+
+
+def measure(num_instrs):
+    text = bril_gen.generate_bril(
+        blocks_per_function=max(1, num_instrs // 100),
+        instrs_per_block=100
+    )
+    interface = bril.BrilInterface()
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    module = interface.parse_text(text)
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = bril_gen.count_instructions(module)
+    print(f"{count:>9} instrs: {(after - before) / count:7.1f} bytes/instr, "
+          f"module {(after - before) / 2**20:8.1f} MiB, "
+          f"peak {(peak - before) / 2**20:8.1f} MiB")
+
+
+def main():
+    typecheck.set_checked(False)
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10**4, 10**5]
+    for num_instrs in sizes:
+        measure(num_instrs)
+
+
+if __name__ == "__main__":
+    main()
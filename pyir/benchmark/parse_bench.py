@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Parse throughput: the in-process Bril parser against bril2json
+
+    python3 -m pyir.benchmark.parse_bench [num_instructions]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+
+
+def bench(label, parse, path, repeat=3):
+    best = None
+    module = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        module = parse(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    num_instrs = bril_gen.count_instructions(module)
+    print(f"{label:>12}: {num_instrs} instrs in {best:.4f}s "
+          f"({num_instrs / best:,.0f} instrs/sec)")
+
+
+def main():
+    num_instrs = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = bril_gen.generate_bril(
+        blocks_per_function=max(1, num_instrs // 100),
+        instrs_per_block=100
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.bril")
+        with open(path, "w") as f:
+            f.write(text)
+
+        interface = bril.BrilInterface()
+        bench("native", interface.parse, path)
+        if shutil.which("bril2json") is None:
+            print(f"{'bril2json':>12}: not installed, skipped")
+        else:
+            bench("bril2json", interface.parse_with_bril2json, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Cost of the runtime type checks: parse + lvn + tdce on a large module,
+    once with typeguard enabled and once in unchecked mode
+
+    python3 -m pyir.benchmark.typecheck_bench [num_instructions]
+"""
+
+import sys
+import time
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.driver import build_pass_manager
+from pyir.interface import bril
+
+PASSES = [
+    "pyir.redundancy.lvn.LocalValueNumbering",
+    "pyir.redundancy.tdce.TrivialDeadCodeElimination",
+]
+
+
+def run(text):
+    interface = bril.BrilInterface()
+    start = time.perf_counter()
+    module = interface.parse_text(text)
+    parsed = time.perf_counter()
+    build_pass_manager(PASSES).transform(module)
+    optimized = time.perf_counter()
+    interface.dump_json(module)
+    dumped = time.perf_counter()
+    return parsed - start, optimized - parsed, dumped - optimized
+
+
+def main():
+    num_instrs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    text = bril_gen.generate_bril(
+        blocks_per_function=max(1, num_instrs // 100),
+        instrs_per_block=100
+    )
+
+    timings = {}
+    for checked in (True, False):
+        typecheck.set_checked(checked)
+        timings[checked] = run(text)
+        mode = "checked" if checked else "unchecked"
+        parse, optimize, dump = timings[checked]
+        print(f"{mode:>10}: parse {parse:.3f}s, optimize {optimize:.3f}s, "
+              f"dump {dump:.3f}s, total {parse + optimize + dump:.3f}s")
+
+    speedup = sum(timings[True]) / sum(timings[False])
+    print(f"{'speedup':>10}: {speedup:.2f}x on {num_instrs} instructions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Writing a large module as Bril JSON: json.dump of the dict built by
+    dump_json, the way opt.py used to, against the streaming write_json,
+    and write_text. Reports the memory allocated on top of the module
+    (tracemalloc peak) and the throughput into a buffered file, and
+    checks that both JSON outputs are the same bytes
+
+    python3 -m pyir.benchmark.writer_bench [num_instructions]
+"""
+
+import gc
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from pyir import typecheck
+from pyir.benchmark import bril_gen
+from pyir.interface import bril
+
+
+def peak_memory(write, path) -> int:
+    """Bytes allocated at the peak of write, over what was live before"""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    with open(path, "w") as f:
+        write(f)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def elapsed(write, path) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    with open(path, "w") as f:
+        write(f)
+    return time.perf_counter() - start
+
+
+def digest(path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def main():
+    typecheck.set_checked(False)
+    num_instrs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    interface = bril.BrilInterface()
+    text = bril_gen.generate_bril(
+        num_functions=max(1, num_instrs // 10000),
+        blocks_per_function=100,
+        instrs_per_block=100,
+        num_variables=64
+    )
+    module = interface.parse_text(text)
+    del text
+    num_instrs = bril_gen.count_instructions(module)
+
+    writers = {
+        "json.dump(dump_json)":
+            lambda f: json.dump(interface.dump_json(module), f),
+        "write_json": lambda f: interface.write_json(module, f),
+        "write_text": lambda f: interface.write_text(module, f),
+    }
+    print(f"{num_instrs} instructions")
+    digests = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, write in writers.items():
+            path = os.path.join(tmp_dir, "out")
+            seconds = elapsed(write, path)
+            size = os.path.getsize(path)
+            digests[label] = digest(path)
+            peak = peak_memory(write, path)
+            print(f"{label:>22}: {seconds:7.2f}s, "
+                  f"{num_instrs / seconds:>9,.0f} instrs/s, "
+                  f"{size / seconds / 2 ** 20:6.1f} MiB/s, "
+                  f"peak +{peak / 2 ** 20:8.1f} MiB")
+    if digests["json.dump(dump_json)"] != digests["write_json"]:
+        print("write_json DIFFERS from json.dump(dump_json)")
+
+
+if __name__ == "__main__":
+    main()
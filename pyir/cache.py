@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""A persistent cache of optimized functions
+
+    The key of a function is the SHA-256 of its canonical Bril JSON (name
+    left out: a function-local pipeline does not read it), the pass
+    pipeline and the pyir version. The entries live in one SQLite
+    database under the cache directory, which worker processes share: a
+    process only reads until the end of a module, then writes its new
+    entries, LRU timestamps and counters in one transaction, so that
+    writers wait on each other briefly and readers never do.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+
+import pyir
+from pyir import component, instrumentation, typecheck
+from pyir.interface import bril
+from pyir.program import program
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    function BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_by_use ON entries (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STAT_NAMES = ("hits", "misses", "stores", "evictions")
+
+
+class OptimizationCache(component.PYIRComponent):
+    """Optimized functions on disk, at most max_bytes of them; the least
+        recently used go first. Install it with PassManager.set_cache()
+    """
+    # bump when the key or the stored format changes
+    FORMAT_VERSION = 1
+    DATABASE_NAME = "functions.sqlite"
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    # seconds a writer waits for another one
+    LOCK_TIMEOUT = 60.0
+
+    @typecheck.typechecked
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__()
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be non-negative, got {max_bytes}")
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._interface = bril.BrilInterface()
+        # a connection per process, opened on first use
+        self._connection = None
+        self._pid = None
+        # set once the cache proved unusable, for the rest of the run
+        self._disabled = False
+        # counts of this process, also flushed to the database
+        self._stats = dict.fromkeys(STAT_NAMES, 0)
+        self._unflushed = dict.fromkeys(STAT_NAMES, 0)
+
+    def __getstate__(self):
+        # worker processes open their own connection
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
+
+    def get_directory(self) -> str:
+        return self._directory
+
+    def is_enabled(self) -> bool:
+        """False once the database could not be opened, read or written:
+            the run goes on without the cache
+        """
+        return not self._disabled
+
+    def get_key(self, func: program.Function, pipeline: list) -> str:
+        """The key of func optimized by the named passes"""
+        function_json = self._interface.dump_function(func)
+        del function_json["name"]
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "format": self.FORMAT_VERSION,
+            "pyir": pyir.__version__,
+            "pipeline": pipeline,
+            "function": function_json,
+        }, sort_keys=True, separators=(",", ":")).encode())
+        return digest.hexdigest()
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """The Bril JSON of the optimized function, without its name"""
+        connection = self._connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT function FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            # an unusable cache costs time, never the result
+            self._disable(f"cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def transform(self, pass_manager, module: program.Module) -> bool:
+        """Splice the cached functions into module and run the passes of
+            pass_manager, which must all be function-local, on the others
+        """
+        if self._connect() is None:
+            return pass_manager.transform_uncached(module)
+        pipeline = [f"{type(p).__module__}.{type(p).__qualname__}"
+                    for p in pass_manager.get_passes()]
+        functions = module.get_functions()
+        # per function: the loaded cached function, or the key of a miss
+        results = []
+        hits = []
+        # key -> missed function; a later copy of it counts as a hit
+        misses = {}
+        for func in functions:
+            key = self.get_key(func, pipeline)
+            if key in misses:
+                hits.append(key)
+                results.append(key)
+                continue
+            function_json = self.lookup(key)
+            if function_json is None:
+                misses[key] = func
+                results.append(key)
+                continue
+            function_json["name"] = func.get_value()
+            hits.append(key)
+            results.append(self._interface.load_function(function_json))
+
+        # the missed functions go through the passes on their own
+        for func in functions:
+            func.remove_from_parent()
+        if misses:
+            for func in misses.values():
+                module.add_function(func)
+            pass_manager.transform_uncached(module)
+            # an executor puts new function objects in place, in order
+            optimized = module.get_functions()
+            for func in optimized:
+                func.remove_from_parent()
+            misses = dict(zip(misses, optimized))
+
+        entries = {}
+        for key, func in misses.items():
+            function_json = self._interface.dump_function(func)
+            del function_json["name"]
+            entries[key] = json.dumps(
+                function_json, separators=(",", ":")).encode()
+        for result, original in zip(results, functions):
+            if not isinstance(result, str):
+                module.add_function(result)
+            elif misses[result] is not None:
+                module.add_function(misses[result])
+                misses[result] = None
+            else:
+                function_json = json.loads(entries[result])
+                function_json["name"] = original.get_value()
+                module.add_function(
+                    self._interface.load_function(function_json))
+
+        self._count("hits", len(hits))
+        self._count("misses", len(misses))
+        self._update(entries.items(), hits)
+        return True
+
+    def get_stats(self) -> dict:
+        """Counters of this process"""
+        return dict(self._stats)
+
+    def get_totals(self) -> dict:
+        """Counters of every process since the cache was created, with
+            the number and size of the entries
+        """
+        totals = dict.fromkeys(STAT_NAMES, 0)
+        totals["entries"] = totals["bytes"] = 0
+        connection = self._connect()
+        if connection is None:
+            return totals
+        try:
+            totals.update(connection.execute("SELECT name, value FROM stats"))
+            entries, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._disable(f"cache totals failed: {e}")
+            return totals
+        totals["entries"] = entries
+        totals["bytes"] = size
+        return totals
+
+    def clear(self):
+        connection = self._connect()
+        if connection is None:
+            return
+        with _WriteTransaction(connection):
+            connection.execute("DELETE FROM entries")
+            connection.execute("DELETE FROM stats")
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def _count(self, name, amount):
+        self._stats[name] += amount
+        self._unflushed[name] += amount
+        collector = instrumentation.get_active()
+        if collector is not None and amount:
+            collector.add_count(f"cache {name}", amount, "OptimizationCache")
+
+    def _update(self, entries, hits):
+        connection = self._connect()
+        if connection is None:
+            return
+        now = time.time()
+        try:
+            with _WriteTransaction(connection):
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    [(key, data, len(data), now) for key, data in entries])
+                connection.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in hits])
+                self._count("stores", len(entries))
+                self._count("evictions", self._evict(connection))
+                connection.executemany(
+                    "INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) "
+                    "DO UPDATE SET value = value + excluded.value",
+                    [item for item in self._unflushed.items() if item[1]])
+        except (sqlite3.Error, OSError) as e:
+            self._disable(f"cache update failed: {e}")
+            return
+        self._unflushed = dict.fromkeys(STAT_NAMES, 0)
+
+    def _evict(self, connection) -> int:
+        """Drop the least recently used entries over the size cap"""
+        size = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if size <= self._max_bytes:
+            return 0
+        evicted = []
+        rows = connection.execute(
+            "SELECT key, size FROM entries ORDER BY last_used")
+        for key, entry_size in rows:
+            if size <= self._max_bytes:
+                break
+            evicted.append((key,))
+            size -= entry_size
+        connection.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        return len(evicted)
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """The connection of this process, None once the cache is off"""
+        if self._disabled:
+            return None
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        connection = None
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            connection = sqlite3.connect(
+                os.path.join(self._directory, self.DATABASE_NAME),
+                timeout=self.LOCK_TIMEOUT,
+                isolation_level=None
+            )
+            # readers go on while one process writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            # idempotent, every statement commits on its own
+            connection.executescript(SCHEMA)
+        except (sqlite3.Error, OSError) as e:
+            if connection is not None:
+                connection.close()
+            self._disable(f"cannot open the cache in {self._directory}: {e}")
+            return None
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def _disable(self, reason):
+        self.logger.warning(f"{reason}; running without the cache")
+        self._disabled = True
+        self.close()
+
+
+class _WriteTransaction:
+    """BEGIN IMMEDIATE takes the write lock up front, so two processes
+        never both read then fail to upgrade
+    """
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __enter__(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+        return self._connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self._connection.execute("COMMIT")
+        else:
+            self._connection.execute("ROLLBACK")
+        return False
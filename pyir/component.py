@@ -3,8 +3,17 @@
 import logging
 
 class PYIRComponent(object):
+    # empty, so that subclasses declaring __slots__ carry no __dict__
+    __slots__ = ()
+
     def __init__(self):
-        self.logger = logging.getLogger(self.__class__.__name__)
+        pass
+
+    @property
+    def logger(self):
+        # looked up on demand: IR objects are created by the million
+        #  and most of them never log anything
+        return logging.getLogger(self.__class__.__name__)
 
 
 class PYIRComposite(PYIRComponent):
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+import concurrent.futures
+import io
+import json
+import os
+import time
+from typing import Optional
+
+from pyir import component, instrumentation, ir_pass, trace, typecheck
+from pyir.interface import binary, bril
+from pyir.program import program
+
+
+def load_pass_class(pass_path: str):
+    """Import a compiler pass from its dotted path,
+        e.g. "pyir.redundancy.tdce.TrivialDeadCodeElimination"
+    """
+    module_name, class_name = pass_path.rsplit(".", 1)
+    package = __import__(module_name, fromlist=[class_name])
+    return getattr(package, class_name)
+
+
+def build_pass_manager(
+    pass_paths: list[str],
+    function_jobs: int = 1,
+    cache=None,
+    block_memo=None
+) -> ir_pass.PassManager:
+    pass_manager = ir_pass.PassManager()
+    for pass_path in pass_paths:
+        PassClass = load_pass_class(pass_path)
+        pass_manager.add_pass(PassClass())
+    if function_jobs > 1:
+        pass_manager.set_executor(
+            ir_pass.FunctionParallelExecutor(function_jobs))
+    pass_manager.set_cache(cache)
+    pass_manager.set_block_memo(block_memo)
+    return pass_manager
+
+
+def collect_inputs(inputs: list[str], stdin=None) -> list[str]:
+    """Expand the batch inputs into a list of Bril files:
+        a directory contributes every *.bril and binary (*.pyir) file
+        under it (sorted), "-" reads newline-delimited paths from stdin
+    """
+    return [path for path, _ in collect_named_inputs(inputs, stdin)]
+
+
+def collect_named_inputs(
+    inputs: list[str],
+    stdin=None
+) -> list[tuple[str, str]]:
+    """Like collect_inputs, with the name each file goes by in an output
+        directory: its path relative to the directory it was found
+        under, or its base name when it was given on its own
+    """
+    named_paths = []
+    for entry in inputs:
+        if entry == "-":
+            for line in stdin:
+                line = line.strip()
+                if line:
+                    named_paths.append((line, os.path.basename(line)))
+        elif os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.endswith((".bril", binary.EXTENSION)):
+                        path = os.path.join(root, file_name)
+                        named_paths.append(
+                            (path, os.path.relpath(path, entry)))
+        else:
+            named_paths.append((entry, os.path.basename(entry)))
+    return named_paths
+
+
+def load_module(
+    source: str,
+    interface: bril.BrilInterface,
+    binary_interface: binary.BinaryInterface
+) -> program.Module:
+    """A Bril text file, or a module in the binary format"""
+    if binary.is_binary(source):
+        return binary_interface.load(source)
+    return interface.parse(source)
+
+
+# Bril JSON, Bril text, or the binary format of pyir.interface.binary
+OUTPUT_FORMATS = ("json", "text", "binary")
+
+
+class BatchResult:
+    def __init__(
+        self,
+        source: str,
+        output=None,
+        elapsed: float = 0.0,
+        error: Optional[str] = None
+    ):
+        self.source = source
+        # the optimized module, str or bytes in the driver's output format
+        self.output = output
+        self.elapsed = elapsed
+        self.error = error
+        # instrumentation report of a worker process, if collected
+        self.stats = None
+
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def write_record(self, stream):
+        """The JSON line of {"source": ..., "module": ...} or of
+            {"source": ..., "error": ...}, as json.dumps writes it; the
+            JSON output goes in as it is
+        """
+        # elapsed time is left out so records are reproducible
+        stream.write('{"source": ' + json.dumps(self.source))
+        if self.succeeded():
+            stream.write(', "module": ')
+            stream.write(self.output)
+        else:
+            stream.write(', "error": ' + json.dumps(self.error))
+        stream.write("}\n")
+
+
+class BatchDriver(component.PYIRComponent):
+    """Optimize many modules in one process with a single pass pipeline
+    """
+    @typecheck.typechecked
+    def __init__(
+        self,
+        pass_paths: list[str],
+        function_jobs: int = 1,
+        cache=None,
+        block_memo=None,
+        output_format: str = "json"
+    ):
+        super().__init__()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown output format {output_format}")
+        self._interface = bril.BrilInterface()
+        self._binary_interface = binary.BinaryInterface()
+        self._output_format = output_format
+        self._pass_manager = build_pass_manager(
+            pass_paths, function_jobs, cache, block_memo)
+
+    def run_file(self, source: str) -> BatchResult:
+        start = time.perf_counter()
+        try:
+            module = load_module(source, self._interface,
+                                 self._binary_interface)
+            self._pass_manager.transform(module)
+            output = self._dump(module)
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            return BatchResult(source, elapsed=elapsed,
+                               error=f"{type(e).__name__}: {e}")
+        elapsed = time.perf_counter() - start
+        return BatchResult(source, output=output, elapsed=elapsed)
+
+    def _dump(self, module: program.Module):
+        if self._output_format == "binary":
+            return self._binary_interface.dump(module)
+        # the text alone is far smaller than the dicts of dump_json
+        stream = io.StringIO()
+        if self._output_format == "json":
+            self._interface.write_json(module, stream)
+        else:
+            self._interface.write_text(module, stream)
+        return stream.getvalue()
+
+    def run(self, sources):
+        """Yield one BatchResult per source, in order; a failing source
+            is reported in its result and does not stop the batch
+        """
+        try:
+            for source in sources:
+                yield self.run_file(source)
+        finally:
+            # the run is over: stop the function-level workers
+            self._pass_manager.shutdown()
+
+
+# per-process driver, built once by the pool initializer
+_worker_driver = None
+
+
+def _init_worker(pass_paths, instrumented, trace_specs, cache, block_memo,
+                 output_format):
+    global _worker_driver
+    # the cache arrives without its connection, each worker opens one;
+    #  the block memo arrives empty
+    _worker_driver = BatchDriver(
+        pass_paths, cache=cache, block_memo=block_memo,
+        output_format=output_format)
+    if instrumented:
+        instrumentation.enable()
+    # the parent process truncated the files already
+    trace.configure(trace_specs, append=True)
+
+
+def _run_in_worker(source):
+    if instrumentation.get_active() is None:
+        result = _worker_driver.run_file(source)
+    else:
+        # a fresh collector per source, merged by the parent process
+        collector = instrumentation.enable()
+        result = _worker_driver.run_file(source)
+        result.stats = collector.to_json()
+    # pool workers exit without running atexit handlers
+    trace.flush_all()
+    return result
+
+
+class ParallelBatchDriver(component.PYIRComponent):
+    """Spread the sources across a process pool; every worker builds the
+        pass pipeline once, results come back in input order
+    """
+    @typecheck.typechecked
+    def __init__(
+        self,
+        pass_paths: list[str],
+        jobs: int,
+        cache=None,
+        block_memo=None,
+        output_format: str = "json"
+    ):
+        super().__init__()
+        if jobs < 1:
+            raise ValueError(f"jobs must be positive, got {jobs}")
+        self._pass_paths = pass_paths
+        self._jobs = jobs
+        self._cache = cache
+        self._block_memo = block_memo
+        self._output_format = output_format
+
+    def run(self, sources):
+        sources = list(sources)
+        # a few chunks per worker: amortize IPC yet keep the load balanced
+        chunksize = max(1, len(sources) // (self._jobs * 4))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self._jobs,
+            initializer=_init_worker,
+            initargs=(
+                self._pass_paths,
+                instrumentation.get_active() is not None,
+                trace.get_specs(),
+                self._cache,
+                self._block_memo,
+                self._output_format
+            )
+        ) as executor:
+            yield from executor.map(
+                _run_in_worker,
+                sources,
+                chunksize=chunksize
+            )
+
+
+def make_batch_driver(
+    pass_paths: list[str],
+    jobs: int = 1,
+    function_jobs: int = 1,
+    cache=None,
+    block_memo=None,
+    output_format: str = "json"
+):
+    if jobs == 1:
+        return BatchDriver(pass_paths, function_jobs, cache, block_memo,
+                           output_format)
+    if function_jobs > 1:
+        raise ValueError("file-level and function-level jobs are exclusive")
+    return ParallelBatchDriver(pass_paths, jobs, cache, block_memo,
+                               output_format)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Pass instrumentation: timers, counters and peak memory
+
+    Nothing is collected until enable() installs an Instrumentation as the
+    active collector. Meanwhile the PassManager takes its plain path and
+    count() returns right away, so the hooks can stay in production code.
+    Passes report their own events through count(), which credits the
+    pass the PassManager is running.
+"""
+
+import json
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # not on every platform; peak memory is then left out
+    resource = None
+
+_active = None
+
+
+class Instrumentation:
+    def __init__(self):
+        # pass name -> [wall seconds, CPU seconds, runs]
+        self._pass_times = {}
+        # pass name -> function name -> [wall seconds, CPU seconds]
+        self._function_times = {}
+        # pass name -> counter name -> value
+        self._counters = {}
+        self._peak_memory_kb = 0
+        self._current_pass = None
+
+    def start_pass(self, pass_name):
+        self._current_pass = pass_name
+        return time.perf_counter(), time.process_time()
+
+    def stop_pass(self, pass_name, start):
+        wall, cpu = self._elapsed(start)
+        times = self._pass_times.setdefault(pass_name, [0.0, 0.0, 0])
+        times[0] += wall
+        times[1] += cpu
+        times[2] += 1
+        self._current_pass = None
+        self._record_memory()
+
+    def start_function(self):
+        return time.perf_counter(), time.process_time()
+
+    def stop_function(self, pass_name, func_name, start):
+        wall, cpu = self._elapsed(start)
+        times = self._function_times.setdefault(pass_name, {}) \
+            .setdefault(func_name, [0.0, 0.0])
+        times[0] += wall
+        times[1] += cpu
+
+    def add_count(self, name, amount, pass_name=None):
+        if pass_name is None:
+            pass_name = self._current_pass or "(no pass)"
+        counters = self._counters.setdefault(pass_name, {})
+        counters[name] = counters.get(name, 0) + amount
+
+    def to_json(self) -> dict:
+        return {
+            "passes": {
+                name: {"wall": wall, "cpu": cpu, "runs": runs}
+                for name, (wall, cpu, runs) in self._pass_times.items()
+            },
+            "functions": {
+                pass_name: {
+                    func_name: {"wall": wall, "cpu": cpu}
+                    for func_name, (wall, cpu) in functions.items()
+                }
+                for pass_name, functions in self._function_times.items()
+            },
+            "counters": {
+                name: dict(counters)
+                for name, counters in self._counters.items()
+            },
+            "peak_memory_kb": self._peak_memory_kb,
+        }
+
+    def merge(self, report: dict):
+        """Add up a to_json() report, e.g. from a worker process"""
+        for name, times in report["passes"].items():
+            mine = self._pass_times.setdefault(name, [0.0, 0.0, 0])
+            mine[0] += times["wall"]
+            mine[1] += times["cpu"]
+            mine[2] += times["runs"]
+        for pass_name, functions in report["functions"].items():
+            for func_name, times in functions.items():
+                mine = self._function_times.setdefault(pass_name, {}) \
+                    .setdefault(func_name, [0.0, 0.0])
+                mine[0] += times["wall"]
+                mine[1] += times["cpu"]
+        for pass_name, counters in report["counters"].items():
+            for name, amount in counters.items():
+                self.add_count(name, amount, pass_name)
+        self._peak_memory_kb = max(
+            self._peak_memory_kb, report["peak_memory_kb"])
+
+    def report(self, stream=sys.stderr, timing=True, statistics=True):
+        """Print a human-readable report"""
+        self._record_memory()
+        if timing:
+            total_wall = sum(t[0] for t in self._pass_times.values())
+            stream.write("===== Pass execution timing report =====\n")
+            stream.write(f"{'Wall (s)':>10} {'CPU (s)':>10} "
+                         f"{'Wall %':>7} {'Runs':>6}  Pass\n")
+            for name, (wall, cpu, runs) in sorted(
+                    self._pass_times.items(), key=lambda item: -item[1][0]):
+                share = 100 * wall / total_wall if total_wall else 0.0
+                stream.write(f"{wall:10.4f} {cpu:10.4f} "
+                             f"{share:6.1f}% {runs:6}  {name}\n")
+            stream.write(f"{total_wall:10.4f} {'':>10} {'':>7} {'':>6}"
+                         f"  Total\n")
+
+            if self._function_times:
+                stream.write("===== Per-function timing =====\n")
+                for pass_name, functions in self._function_times.items():
+                    stream.write(f"  {pass_name}\n")
+                    for func_name, (wall, cpu) in sorted(
+                            functions.items(), key=lambda item: -item[1][0]):
+                        stream.write(f"{wall:10.4f} {cpu:10.4f}"
+                                     f"    @{func_name}\n")
+
+        if statistics:
+            stream.write("===== Statistics =====\n")
+            for pass_name, counters in self._counters.items():
+                for name, amount in counters.items():
+                    stream.write(f"{amount:10}  {pass_name} - {name}\n")
+            if self._peak_memory_kb:
+                stream.write(f"Peak memory: {self._peak_memory_kb} KB\n")
+
+    def dump(self, path):
+        self._record_memory()
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def _elapsed(self, start):
+        wall_start, cpu_start = start
+        return (time.perf_counter() - wall_start,
+                time.process_time() - cpu_start)
+
+    def _record_memory(self):
+        if resource is None:
+            return
+        # kilobytes on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self._peak_memory_kb = max(self._peak_memory_kb, peak)
+
+
+def enable() -> Instrumentation:
+    """Install a fresh collector and return it"""
+    global _active
+    _active = Instrumentation()
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def get_active():
+    return _active
+
+
+def count(name, amount=1):
+    """Add amount to the counter name of the running pass"""
+    if _active is not None:
+        _active.add_count(name, amount)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""A compact binary form of a Module, for chaining tools without JSON
+
+    Layout, every number an unsigned LEB128 varint:
+        magic b"PYIR", format version (one byte)
+        string count, byte length of the strings, the strings joined
+            by NUL in UTF-8: every name and type below is an index there
+        function count, then per function its name and byte length
+        the functions, back to back
+    A function is its argument count, a (name, type) per argument, its
+    entry count, and per entry an opcode: 0 for a label, followed by its
+    name, or 1 + the index of the operator in OPCODES, followed by
+    dest + 1 (0: no dest) and its type, then for a const a value tag and
+    the value, else the argument count, the arguments, the label count
+    and the labels. A file holds what Bril JSON holds and loads through
+    the same block splitting, so it makes the same Module. The function
+    index lets a reader over an mmap decode a function only when asked.
+"""
+
+import mmap
+import os
+import re
+import struct
+
+from pyir import component, typecheck
+from pyir.interface import bril
+from pyir.program import ir_builder, ir_type, program, use
+
+MAGIC = b"PYIR"
+# bump when the layout changes; readers refuse newer versions
+FORMAT_VERSION = 1
+EXTENSION = ".pyir"
+
+# the opcode of an operator is 1 + its index; append only
+OPCODES = tuple(use.get_operator(name) for name in (
+    "const", "id", "add", "sub", "mul", "div", "eq", "lt", "gt", "le",
+    "ge", "not", "and", "or", "jmp", "br", "ret", "print", "phi",
+))
+CONST_OPERATOR = use.get_operator("const")
+LABEL_TYPE = ir_type.get_type("basic-block")
+
+# const value tags
+INT_VALUE, FALSE_VALUE, TRUE_VALUE, FLOAT_VALUE, CHAR_VALUE = range(5)
+
+_MULTI_BYTE = re.compile(rb"[\x80-\xff]+[\x00-\x7f]")
+_DOUBLE = struct.Struct("<d")
+_DOUBLE_BITS = struct.Struct("<Q")
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def encode_varints(values: list) -> bytes:
+    if not values or max(values) < 0x80:
+        return bytes(values)
+    data = bytearray()
+    for value in values:
+        while value >= 0x80:
+            data.append(value & 0x7f | 0x80)
+            value >>= 7
+        data.append(value)
+    return bytes(data)
+
+
+def decode_varints(data) -> list:
+    """The varints of data; the runs of one-byte values are copied at
+        C speed, only the longer ones are decoded in Python
+    """
+    values = []
+    position = 0
+    for match in _MULTI_BYTE.finditer(data):
+        start, end = match.span()
+        values.extend(data[position:start])
+        value = 0
+        for shift, byte in enumerate(data[start:end]):
+            value |= (byte & 0x7f) << (7 * shift)
+        values.append(value)
+        position = end
+    values.extend(data[position:])
+    return values
+
+
+def is_binary(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class BinaryInterface(component.PYIRComponent):
+    """load/save Modules in the binary format, the counterpart of
+        BrilInterface's parse/dump_json
+    """
+    def load(self, path: str) -> program.Module:
+        with self.open(path) as reader:
+            return reader.read_module()
+
+    def load_bytes(self, data: bytes) -> program.Module:
+        return BinaryReader(data).read_module()
+
+    def open(self, path: str) -> "BinaryReader":
+        """A lazy reader over an mmap of path; close it when done"""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise BinaryFormatError(f"{path} is empty")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return BinaryReader(data)
+
+    @typecheck.typechecked
+    def save(self, module: program.Module, path: str):
+        data = self.dump(module)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    @typecheck.typechecked
+    def dump(self, module: program.Module) -> bytes:
+        strings = {}
+        opcodes = {operator: opcode
+                   for opcode, operator in enumerate(OPCODES, 1)}
+        index = []
+        bodies = []
+        for function in module.iter_functions():
+            body = encode_varints(
+                self._dump_function(function, strings, opcodes))
+            index += [self._string_id(strings, function.get_value()),
+                      len(body)]
+            bodies.append(body)
+
+        for string in strings:
+            if "\0" in string:
+                raise BinaryFormatError(f"NUL in name {string!r}")
+        string_data = "\0".join(strings).encode()
+        header = [len(strings), len(string_data)]
+        return b"".join([
+            MAGIC,
+            bytes([FORMAT_VERSION]),
+            encode_varints(header),
+            string_data,
+            encode_varints([len(bodies)] + index),
+            *bodies,
+        ])
+
+    def _dump_function(self, function, strings, opcodes) -> list:
+        string_id = self._string_id
+        values = []
+        arguments = function.get_arguments()
+        values.append(len(arguments))
+        for arg in arguments:
+            values.append(string_id(strings, arg.get_value()))
+            values.append(string_id(strings, arg.get_type().get_name()))
+
+        entries = []
+        num_entries = 0
+        for block in function.iter_basic_blocks():
+            label = block.get_label()
+            if label is not None:
+                entries += [0, string_id(strings, label)]
+                num_entries += 1
+            for instr in block.iter_instructions():
+                self._dump_instruction(instr, entries, strings, opcodes)
+                num_entries += 1
+        values.append(num_entries)
+        values += entries
+        return values
+
+    def _dump_instruction(self, instr, values, strings, opcodes):
+        string_id = self._string_id
+        operator = instr.get_operator()
+        if operator not in opcodes:
+            raise BinaryFormatError(
+                f"cannot encode operator {operator.get_name()}")
+        values.append(opcodes[operator])
+
+        destination = instr.get_destination()
+        if destination is None:
+            values.append(0)
+        else:
+            values.append(string_id(strings, destination.get_value()) + 1)
+            values.append(
+                string_id(strings, destination.get_type().get_name()))
+
+        if operator is CONST_OPERATOR:
+            values += self._dump_value(instr.get_operand(0).get_value(),
+                                       strings)
+            return
+
+        num_operands = instr.get_num_operands()
+        values.append(num_operands)
+        for operand_id in range(num_operands):
+            name = instr.get_operand(operand_id).get_value()
+            if not isinstance(name, str):
+                raise BinaryFormatError(f"cannot encode argument {name!r}")
+            values.append(string_id(strings, name))
+        num_labels = instr.get_num_labels()
+        values.append(num_labels)
+        for label_id in range(num_labels):
+            values.append(
+                string_id(strings, instr.get_label(label_id).get_value()))
+
+    def _dump_value(self, value, strings) -> list:
+        if value is True:
+            return [TRUE_VALUE]
+        if value is False:
+            return [FALSE_VALUE]
+        if isinstance(value, int):
+            # zigzag: small negative numbers stay short
+            return [INT_VALUE, value * 2 if value >= 0 else -value * 2 - 1]
+        if isinstance(value, float):
+            return [FLOAT_VALUE,
+                    _DOUBLE_BITS.unpack(_DOUBLE.pack(value))[0]]
+        if isinstance(value, str):
+            return [CHAR_VALUE, self._string_id(strings, value)]
+        raise BinaryFormatError(f"cannot encode value {value!r}")
+
+    @staticmethod
+    def _string_id(strings, string) -> int:
+        string_id = strings.get(string)
+        if string_id is None:
+            string_id = strings[string] = len(strings)
+        return string_id
+
+
+class BinaryReader(component.PYIRComponent):
+    """A module in the binary format, over bytes or an mmap: the strings
+        and the function index are read up front, every function when it
+        is asked for
+    """
+    def __init__(self, data):
+        super().__init__()
+        self._data = data
+        self._ir_builder = ir_builder.IRBuilder()
+        if data[:len(MAGIC)] != MAGIC:
+            raise BinaryFormatError("not a pyir binary module")
+        version = data[len(MAGIC)]
+        if version > FORMAT_VERSION:
+            raise BinaryFormatError(
+                f"format version {version}, this pyir reads up to "
+                f"{FORMAT_VERSION}")
+
+        position = len(MAGIC) + 1
+        num_strings, position = self._read_varint(position)
+        size, position = self._read_varint(position)
+        self._strings = bytes(data[position:position + size]).decode() \
+            .split("\0") if num_strings else []
+        if len(self._strings) != num_strings:
+            raise BinaryFormatError("corrupt string table")
+        position += size
+
+        num_functions, position = self._read_varint(position)
+        # (name, start, end in data) per function
+        self._functions = []
+        index = []
+        for _ in range(2 * num_functions):
+            value, position = self._read_varint(position)
+            index.append(value)
+        for name_id, size in zip(index[::2], index[1::2]):
+            self._functions.append(
+                (self._strings[name_id], position, position + size))
+            position += size
+        self._function_ids = {}
+        for function_id, (name, _, _) in enumerate(self._functions):
+            self._function_ids.setdefault(name, function_id)
+        if position > len(data):
+            raise BinaryFormatError("truncated module")
+        self._types = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def get_function_names(self) -> list[str]:
+        return [name for name, _, _ in self._functions]
+
+    def read_module(self) -> program.Module:
+        module = program.Module()
+        for function_id in range(len(self._functions)):
+            module.add_function(self._read(function_id))
+        return module
+
+    def read_function(self, name: str) -> program.Function:
+        """Decode the function named name, the first one if several are"""
+        if name not in self._function_ids:
+            raise KeyError(f"no function @{name}")
+        return self._read(self._function_ids[name])
+
+    def _read(self, function_id) -> program.Function:
+        name, start, end = self._functions[function_id]
+        values = decode_varints(self._data[start:end])
+        try:
+            return self._load_function(name, iter(values).__next__)
+        except (StopIteration, IndexError) as e:
+            raise BinaryFormatError(f"corrupt function @{name}") from e
+
+    def _load_function(self, name, next_value) -> program.Function:
+        strings = self._strings
+        get_type = self._get_type
+        function = program.Function(name)
+        for _ in range(next_value()):
+            arg_name = strings[next_value()]
+            function.add_argument(
+                use.Identifier(arg_name, get_type(next_value())))
+
+        build = self._ir_builder.build
+        entries = []
+        for _ in range(next_value()):
+            opcode = next_value()
+            if opcode == 0:
+                entries.append(strings[next_value()])
+                continue
+            operator = OPCODES[opcode - 1]
+
+            destination = None
+            dest_type = None
+            dest_id = next_value()
+            if dest_id:
+                dest_type = get_type(next_value())
+                destination = use.Identifier(
+                    strings[dest_id - 1], dest_type)
+
+            # typed like the loads of Bril JSON
+            if operator is CONST_OPERATOR:
+                operands = [use.Primitive(
+                    self._load_value(next_value), dest_type)]
+                labels = []
+            else:
+                operands = [
+                    use.Identifier(strings[next_value()], dest_type)
+                    for _ in range(next_value())]
+                labels = [
+                    use.Identifier(strings[next_value()], LABEL_TYPE)
+                    for _ in range(next_value())]
+            entries.append(
+                build(operator, destination, operands, labels))
+
+        bril.add_basic_blocks(function, entries)
+        return function
+
+    def _load_value(self, next_value):
+        tag = next_value()
+        if tag == INT_VALUE:
+            value = next_value()
+            return value >> 1 if not value & 1 else -(value >> 1) - 1
+        if tag == FALSE_VALUE:
+            return False
+        if tag == TRUE_VALUE:
+            return True
+        if tag == FLOAT_VALUE:
+            return _DOUBLE.unpack(_DOUBLE_BITS.pack(next_value()))[0]
+        if tag == CHAR_VALUE:
+            return self._strings[next_value()]
+        raise BinaryFormatError(f"unknown value tag {tag}")
+
+    def _get_type(self, string_id) -> ir_type.IRType:
+        use_type = self._types.get(string_id)
+        if use_type is None:
+            use_type = self._types[string_id] = \
+                ir_type.get_type(self._strings[string_id])
+        return use_type
+
+    def _read_varint(self, position) -> tuple:
+        value = 0
+        shift = 0
+        while True:
+            if position >= len(self._data):
+                raise BinaryFormatError("truncated module")
+            byte = self._data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
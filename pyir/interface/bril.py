@@ -2,11 +2,11 @@
 
 import json
 import logging
-import os
-import typeguard
+import subprocess
 from typing import Optional
 
-from pyir import component
+from pyir import component, typecheck
+from pyir.interface import bril_parser, bril_writer
 from pyir.program import (
     instruction,
     ir,
@@ -17,27 +17,54 @@ from pyir.program import (
 )
 
 class BrilInterface(component.PYIRComponent):
-    def __init__(self):
+    def __init__(self, columnar_storage=False):
         super().__init__()
         self._ir_builder = ir_builder.IRBuilder()
+        self._parser = bril_parser.BrilParser(columnar_storage)
+        self._writer = bril_writer.BrilWriter()
 
     def parse(self, bril_path: str):
+        with open(bril_path, "r") as f:
+            bril_text = f.read()
+        return self.parse_text(bril_text)
+
+    @typecheck.typechecked
+    def parse_text(self, bril_text: str) -> program.Module:
+        """Parse Bril text in-process, no bril2json round-trip"""
+        return self._parser.parse(bril_text)
+
+    def parse_json(self, json_data: bytes) -> program.Module:
+        """Bril JSON, e.g. the output of bril2json"""
+        return self._json_to_pyir(self._parse_json(json_data))
+
+    def read(self, stream) -> program.Module:
+        """Bril JSON or Bril text from a binary stream such as stdin"""
+        data = stream.read()
+        if data.lstrip().startswith(b"{"):
+            return self.parse_json(data)
+        return self.parse_text(data.decode())
+
+    def parse_with_bril2json(self, bril_path: str):
+        """The legacy path through the external bril2json tool"""
         json_data = self._bril_to_json(bril_path)
         json_dict = self._parse_json(json_data)
         module = self._json_to_pyir(json_dict)
         return module
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def _bril_to_json(self, bril_path: str) -> bytes:
-        JSON_TMP_FILE = "./tmp.json"
-        os.system(f"bril2json < {bril_path} > {JSON_TMP_FILE}")
-        with open(JSON_TMP_FILE, "rb") as f:
-            json_data = f.read()
-            f.close()
+        with open(bril_path, "rb") as f:
+            completed = subprocess.run(
+                ["bril2json"],
+                stdin=f,
+                stdout=subprocess.PIPE,
+                check=True
+            )
+        json_data = completed.stdout
         self.logger.debug(f"type of json_data: {type(json_data)}")
         return json_data
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def _parse_json(self, json_data: bytes) -> dict:
         try:
             module_json = json.loads(json_data)
@@ -49,51 +76,38 @@ class BrilInterface(component.PYIRComponent):
         return module_json
 
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def _json_to_pyir(self, json_dict: dict):
-        TERMINATORS = ["jmp", "br"]
         module = program.Module()
         for function_json in json_dict['functions']:
-            function = program.Function(function_json['name'])
-
-            if "args" in function_json:
-                for arg_json in function_json["args"]:
-                    use_type = ir_type.IRType(arg_json["type"])
-                    arg = use.Identifier(arg_json["name"], use_type)
-                    function.add_argument(arg)
-
-            # parse split basic_block
-            curr_block = program.BasicBlock()
-            for instruction_json in function_json['instrs']:
-                # label instruction in BRIL
-                if "label" in instruction_json:
-                    if curr_block.is_empty():
-                        curr_block.set_label(instruction_json["label"])
-                    else:
-                        function.add_basic_block(curr_block)
-                        curr_block = program.BasicBlock(instruction_json["label"])
-                    continue
-
-                instr = self._bril_to_ir(instruction_json)
-                curr_block.add_instruction(instr)
-                if instruction_json["op"] in TERMINATORS:
-                    function.add_basic_block(curr_block)
-                    curr_block = program.BasicBlock()
-
-            if not curr_block.is_empty():
-                function.add_basic_block(curr_block)
-
-            module.add_function(function)
-
+            module.add_function(self.load_function(function_json))
         return module
 
-    @typeguard.typechecked
+    @typecheck.typechecked
+    def load_function(self, function_json: dict) -> program.Function:
+        """One function of a Bril JSON program"""
+        function = program.Function(function_json['name'])
+
+        if "args" in function_json:
+            for arg_json in function_json["args"]:
+                use_type = ir_type.get_type(arg_json["type"])
+                arg = use.Identifier(arg_json["name"], use_type)
+                function.add_argument(arg)
+
+        add_basic_blocks(function, (
+            instruction_json["label"] if "label" in instruction_json
+            else self._bril_to_ir(instruction_json)
+            for instruction_json in function_json['instrs']
+        ))
+        return function
+
+    @typecheck.typechecked
     def _bril_to_ir(self, instruction_json: dict):
-        operator = use.Operator(instruction_json["op"])
+        operator = use.get_operator(instruction_json["op"])
 
         dest_type = None
         if "type" in instruction_json:
-            dest_type = ir_type.IRType(instruction_json["type"])
+            dest_type = ir_type.get_type(instruction_json["type"])
 
         destination = None
         if "dest" in instruction_json:
@@ -118,11 +132,11 @@ class BrilInterface(component.PYIRComponent):
         if "labels" in instruction_json:
             for arg in instruction_json["labels"]:
                 labels.append(use.Identifier(
-                    arg, ir_type.IRType("basic-block")))
+                    arg, ir_type.get_type("basic-block")))
 
         dest_type = None
         if "type" in instruction_json:
-            dest_type = ir_type.IRType(instruction_json["type"])
+            dest_type = ir_type.get_type(instruction_json["type"])
 
         return self._ir_builder.build(
             operator,
@@ -131,38 +145,51 @@ class BrilInterface(component.PYIRComponent):
             labels=labels,
         )
 
-    @typeguard.typechecked
+    def write_json(self, module: program.Module, stream):
+        """json.dump(self.dump_json(module), stream), written a block at
+            a time without the dict
+        """
+        self._writer.write_json(module, stream)
+
+    def write_text(self, module: program.Module, stream):
+        """Bril text, which parse_text reads back"""
+        self._writer.write_text(module, stream)
+
+    @typecheck.typechecked
     def dump_json(self, module: program.Module) -> dict:
         module_json = {}
         module_json["functions"] = []
-        for function in module.get_functions():
-            function_json = {}
-            argv = []
-            for arg in function.get_arguments():
-                arg_json = {
-                    "name": arg.get_value(),
-                    "type": arg.get_type().get_name()
-                }
-                argv.append(arg_json)
-            if argv:
-                function_json["args"] = argv
-
-            instrs = []
-            for block in function.get_basic_blocks():
-                label = block.get_label()
-                if label is not None:
-                    instrs.append({"label": label})
-
-                for instr in block.get_instructions():
-                    instr = self._instr_to_json(instr)
-                    instrs.append(instr)
-
-            function_json["instrs"] = instrs
-            function_json["name"] = function.get_value()
-            module_json["functions"].append(function_json)
-
+        for function in module.iter_functions():
+            module_json["functions"].append(self.dump_function(function))
         return module_json
 
+    @typecheck.typechecked
+    def dump_function(self, function: program.Function) -> dict:
+        function_json = {}
+        argv = []
+        for arg in function.get_arguments():
+            arg_json = {
+                "name": arg.get_value(),
+                "type": arg.get_type().get_name()
+            }
+            argv.append(arg_json)
+        if argv:
+            function_json["args"] = argv
+
+        instrs = []
+        for block in function.iter_basic_blocks():
+            label = block.get_label()
+            if label is not None:
+                instrs.append({"label": label})
+
+            for instr in block.iter_instructions():
+                instr = self._instr_to_json(instr)
+                instrs.append(instr)
+
+        function_json["instrs"] = instrs
+        function_json["name"] = function.get_value()
+        return function_json
+
     def _instr_to_json(self, instr: instruction.Instruction):
         instr_json = {}
         # instruction must have operator
@@ -200,3 +227,35 @@ class BrilInterface(component.PYIRComponent):
 
 
         return instr_json
+
+
+def add_basic_blocks(
+    function: program.Function,
+    entries,
+    columnar_storage: bool = False
+):
+    """Split a Bril instruction list into the basic blocks of function;
+        the entries are label names and instructions. The JSON, text and
+        binary loaders all go through here
+    """
+    curr_block = program.BasicBlock(None, columnar_storage)
+    for entry in entries:
+        # label instruction in BRIL
+        if isinstance(entry, str):
+            if curr_block.is_empty() and \
+                    curr_block.get_label() is None:
+                curr_block.set_label(entry)
+            else:
+                # an empty labeled block stays: jumps may target it
+                function.add_basic_block(curr_block)
+                curr_block = program.BasicBlock(entry, columnar_storage)
+            continue
+
+        curr_block.add_instruction(entry)
+        if entry.get_operator().get_name() in program.TERMINATORS:
+            function.add_basic_block(curr_block)
+            curr_block = program.BasicBlock(None, columnar_storage)
+
+    if not curr_block.is_empty() or \
+            curr_block.get_label() is not None:
+        function.add_basic_block(curr_block)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+import re
+from typing import Optional
+
+from pyir import component, typecheck
+# bril imports this module: only bril.add_basic_blocks is used, at parse time
+from pyir.interface import bril
+from pyir.program import (
+    ir_builder,
+    ir_type,
+    program,
+    use
+)
+
+
+class BrilSyntaxError(Exception):
+    def __init__(self, message, line):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class BrilToken:
+    __slots__ = ("kind", "text", "line")
+
+    def __init__(self, kind, text, line):
+        self.kind = kind
+        self.text = text
+        self.line = line
+
+    def __repr__(self):
+        return f"{self.kind}({self.text!r})@{self.line}"
+
+
+class BrilTokenizer(component.PYIRComponent):
+    """Split Bril text into tokens, the same lexical classes as bril2json:
+        FUNC (@name), LABEL (.name), IDENT, NUMBER, CHAR and punctuation
+    """
+    _IDENT = r"[_%A-Za-z][_%.A-Za-z0-9]*"
+    TOKEN_PATTERN = re.compile("|".join([
+        r"(?P<NEWLINE>\n)",
+        r"(?P<SKIP>[ \t\r]+|#[^\n]*)",
+        rf"(?P<FUNC>@{_IDENT})",
+        rf"(?P<LABEL>\.{_IDENT})",
+        # ints, and floats like bril-txt's SIGNED_FLOAT; a bare inf or
+        #  nan is an IDENT, only a literal where a value is expected
+        r"(?P<NUMBER>[-+]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)"
+        r"(?:[eE][-+]?[0-9]+)?"
+        r"|[-+]inf(?![_%.A-Za-z0-9]))",
+        rf"(?P<IDENT>{_IDENT})",
+        r"(?P<CHAR>'[^']')",
+        r"(?P<PUNCT>[{}():;=,<>])",
+        r"(?P<MISMATCH>.)",
+    ]))
+
+    def tokenize(self, text: str) -> list[BrilToken]:
+        tokens = []
+        line = 1
+        for match in self.TOKEN_PATTERN.finditer(text):
+            kind = match.lastgroup
+            if kind == "NEWLINE":
+                line += 1
+                continue
+            if kind == "SKIP":
+                continue
+            if kind == "MISMATCH":
+                raise BrilSyntaxError(
+                    f"unexpected character {match.group()!r}", line)
+            tokens.append(BrilToken(kind, match.group(), line))
+        return tokens
+
+
+class BrilParser(component.PYIRComponent):
+    """Recursive-descent parser from Bril text straight into a
+        program.Module; the basic blocks are split by
+        bril.add_basic_blocks, like the JSON and binary loaders do
+    """
+    _INT_PATTERN = re.compile(r"[-+]?[0-9]+")
+
+    def __init__(self, columnar_storage=False):
+        super().__init__()
+        self._columnar_storage = columnar_storage
+        self._tokenizer = BrilTokenizer()
+        self._ir_builder = ir_builder.IRBuilder()
+        self._tokens = []
+        self._pos = 0
+
+    @typecheck.typechecked
+    def parse(self, text: str) -> program.Module:
+        self._tokens = self._tokenizer.tokenize(text)
+        self._pos = 0
+
+        module = program.Module()
+        try:
+            while not self._at_end():
+                module.add_function(self._parse_function())
+        finally:
+            # do not keep the token stream alive along with the module
+            self._tokens = []
+        return module
+
+    def _parse_function(self) -> program.Function:
+        name = self._expect("FUNC").text[1:]
+        function = program.Function(name)
+
+        if self._accept("PUNCT", "("):
+            if not self._accept("PUNCT", ")"):
+                while True:
+                    arg_name = self._expect("IDENT").text
+                    self._expect("PUNCT", ":")
+                    arg_type = ir_type.get_type(self._parse_type())
+                    function.add_argument(use.Identifier(arg_name, arg_type))
+                    if self._accept("PUNCT", ")"):
+                        break
+                    self._expect("PUNCT", ",")
+
+        # return type: not represented in program.Function
+        if self._accept("PUNCT", ":"):
+            self._parse_type()
+
+        self._expect("PUNCT", "{")
+        bril.add_basic_blocks(function, self._parse_body(name),
+                              self._columnar_storage)
+        return function
+
+    def _parse_body(self, name):
+        """The label names and instructions up to the closing brace"""
+        while not self._accept("PUNCT", "}"):
+            token = self._peek()
+            if token is None:
+                raise BrilSyntaxError(f"unterminated function @{name}",
+                                      self._tokens[-1].line)
+
+            # label instruction in BRIL
+            if token.kind == "LABEL":
+                self._advance()
+                self._expect("PUNCT", ":")
+                yield token.text[1:]
+                continue
+
+            yield self._parse_instruction()
+
+    def _parse_instruction(self):
+        first = self._expect("IDENT")
+        destination = None
+        dest_type = None
+
+        following = self._peek()
+        if following is not None and following.kind == "PUNCT" and \
+                following.text in (":", "="):
+            if self._accept("PUNCT", ":"):
+                dest_type = ir_type.get_type(self._parse_type())
+            self._expect("PUNCT", "=")
+            destination = use.Identifier(first.text, dest_type)
+            op_token = self._expect("IDENT")
+        else:
+            op_token = first
+
+        operator_name = op_token.text
+        operands = []
+        labels = []
+        if operator_name == "const":
+            operands.append(
+                use.Primitive(self._parse_literal(), dest_type)
+            )
+            self._expect("PUNCT", ";")
+        else:
+            while not self._accept("PUNCT", ";"):
+                token = self._advance()
+                if token.kind == "IDENT":
+                    operands.append(use.Identifier(token.text, dest_type))
+                elif token.kind == "LABEL":
+                    labels.append(use.Identifier(
+                        token.text[1:], ir_type.get_type("basic-block")))
+                elif token.kind == "FUNC":
+                    raise BrilSyntaxError(
+                        f"function call {token.text} is not supported",
+                        token.line)
+                else:
+                    raise BrilSyntaxError(
+                        f"unexpected token {token.text!r}", token.line)
+
+        instr = self._ir_builder.build(
+            use.get_operator(operator_name),
+            destination=destination,
+            operands=operands,
+            labels=labels,
+        )
+        if instr is None:
+            raise BrilSyntaxError(
+                f"cannot decode operator {operator_name}", op_token.line)
+        return instr
+
+    def _parse_type(self) -> str:
+        type_name = self._expect("IDENT").text
+        if self._accept("PUNCT", "<"):
+            type_name = f"{type_name}<{self._parse_type()}>"
+            self._expect("PUNCT", ">")
+        return type_name
+
+    def _parse_literal(self):
+        token = self._advance()
+        if token.kind == "NUMBER":
+            if self._INT_PATTERN.fullmatch(token.text):
+                return int(token.text)
+            return float(token.text)
+        if token.kind == "IDENT" and token.text in ("true", "false"):
+            return token.text == "true"
+        if token.kind == "IDENT" and token.text in ("inf", "nan"):
+            return float(token.text)
+        if token.kind == "CHAR":
+            return token.text[1]
+        raise BrilSyntaxError(f"invalid literal {token.text!r}", token.line)
+
+    # token stream helpers
+    def _at_end(self) -> bool:
+        return self._pos >= len(self._tokens)
+
+    def _peek(self) -> Optional[BrilToken]:
+        if self._at_end():
+            return None
+        return self._tokens[self._pos]
+
+    def _advance(self) -> BrilToken:
+        token = self._peek()
+        if token is None:
+            line = self._tokens[-1].line if self._tokens else 1
+            raise BrilSyntaxError("unexpected end of input", line)
+        self._pos += 1
+        return token
+
+    def _accept(self, kind, text=None) -> bool:
+        token = self._peek()
+        if token is None or token.kind != kind:
+            return False
+        if text is not None and token.text != text:
+            return False
+        self._pos += 1
+        return True
+
+    def _expect(self, kind, text=None) -> BrilToken:
+        token = self._advance()
+        if token.kind != kind or (text is not None and token.text != text):
+            expected = text if text is not None else kind
+            raise BrilSyntaxError(
+                f"expected {expected}, got {token.text!r}", token.line)
+        return token
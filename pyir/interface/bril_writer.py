@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import json
+
+from pyir import component, typecheck
+from pyir.program import program, use
+
+CONST_OPERATOR_NAME = "const"
+
+
+class BrilWriter(component.PYIRComponent):
+    """Write a Module to a text stream a block at a time, as Bril JSON
+        byte for byte the same as json.dump(BrilInterface.dump_json(...))
+        or as Bril text, without building the whole output in memory
+    """
+    def __init__(self):
+        super().__init__()
+        # name -> its JSON text; names repeat all over a module
+        self._encoded = {}
+
+    @typecheck.typechecked
+    def write_json(self, module: program.Module, stream):
+        write = stream.write
+        write('{"functions": [')
+        for function_id, function in enumerate(module.iter_functions()):
+            if function_id:
+                write(", ")
+            self._write_function_json(function, write)
+        write("]}")
+        # the cache only helps within a module
+        self._encoded.clear()
+
+    @typecheck.typechecked
+    def write_text(self, module: program.Module, stream):
+        write = stream.write
+        for function in module.iter_functions():
+            arguments = function.get_arguments()
+            header = f"@{function.get_value()}"
+            if arguments:
+                header += "(" + ", ".join(
+                    f"{arg.get_value()}: {arg.get_type().get_name()}"
+                    for arg in arguments) + ")"
+            write(header + " {\n")
+            for block in function.iter_basic_blocks():
+                lines = []
+                label = block.get_label()
+                if label is not None:
+                    lines.append(f".{label}:\n")
+                for instr in block.iter_instructions():
+                    lines.append(f"  {self._instr_text(instr)}\n")
+                write("".join(lines))
+            write("}\n")
+
+    def _write_function_json(self, function, write):
+        encode = self._encode
+        arguments = function.get_arguments()
+        if arguments:
+            write('{"args": [' + ", ".join(
+                f'{{"name": {encode(arg.get_value())}, '
+                f'"type": {encode(arg.get_type().get_name())}}}'
+                for arg in arguments) + '], "instrs": [')
+        else:
+            write('{"instrs": [')
+
+        separator = ""
+        for block in function.iter_basic_blocks():
+            entries = []
+            label = block.get_label()
+            if label is not None:
+                entries.append(f'{{"label": {encode(label)}}}')
+            for instr in block.iter_instructions():
+                entries.append(self._instr_json(instr))
+            if entries:
+                write(separator + ", ".join(entries))
+                separator = ", "
+        write(f'], "name": {encode(function.get_value())}}}')
+
+    def _instr_json(self, instr) -> str:
+        """The text of BrilInterface._instr_to_json(instr)"""
+        encode = self._encode
+        operator_name = instr.get_operator().get_name()
+        parts = ['{"op": ', encode(operator_name)]
+        destination = instr.get_destination()
+        if destination is not None:
+            parts += [', "dest": ', encode(destination.get_value()),
+                      ', "type": ', encode(destination.get_type().get_name())]
+
+        if operator_name == CONST_OPERATOR_NAME:
+            parts += [', "value": ', encode(instr.get_operand(0).get_value())]
+        else:
+            num_operands = instr.get_num_operands()
+            if num_operands:
+                parts += [', "args": [', ", ".join(
+                    encode(instr.get_operand(operand_id).get_value())
+                    for operand_id in range(num_operands)), "]"]
+            num_labels = instr.get_num_labels()
+            if num_labels:
+                parts += [', "labels": [', ", ".join(
+                    encode(instr.get_label(label_id).get_value())
+                    for label_id in range(num_labels)), "]"]
+        parts.append("}")
+        return "".join(parts)
+
+    def _encode(self, value) -> str:
+        value_type = type(value)
+        if value_type is int:
+            # what json writes for an int
+            return int.__repr__(value)
+        if value_type is not str:
+            return json.dumps(value)
+        encoded = self._encoded.get(value)
+        if encoded is None:
+            encoded = self._encoded[value] = json.dumps(value)
+        return encoded
+
+    def _instr_text(self, instr) -> str:
+        words = [instr.get_operator().get_name()]
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            if isinstance(operand, use.Primitive):
+                words.append(self._literal(operand.get_value()))
+            else:
+                words.append(str(operand.get_value()))
+        for label_id in range(instr.get_num_labels()):
+            words.append(f".{instr.get_label(label_id).get_value()}")
+        text = " ".join(words)
+
+        destination = instr.get_destination()
+        if destination is not None:
+            text = (f"{destination.get_value()}: "
+                    f"{destination.get_type().get_name()} = {text}")
+        return text + ";"
+
+    def _literal(self, value) -> str:
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, str):
+            return f"'{value}'"
+        return str(value)
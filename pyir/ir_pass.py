@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import concurrent.futures
 import enum
-import typeguard
+import pickle
 
+from pyir import component, instrumentation, typecheck
+from pyir.analysis import manager
 from pyir.program import program
 from pyir.utils import array
 
@@ -14,17 +17,67 @@ class CompilerPassScope:
 
 
 class CompilerPass(object):
-    @typeguard.typechecked
+    # The widest scope the pass reads or writes. Passes up to
+    #  GLOBAL_OPTIMIZATION never look outside the function at hand.
+    SCOPE = CompilerPassScope.INTERPROCEDURAL_OPTIMIZATION
+    # Analysis classes the pass reads through get_analysis(), and those
+    #  still valid after the pass reports a change
+    REQUIRED_ANALYSES = ()
+    PRESERVED_ANALYSES = ()
+    # local_optimize reads nothing but the block, and its names only
+    #  through equality and order: a memo.BlockMemo may replay it
+    MEMOIZABLE = False
+
+    _analysis_manager = None
+    _block_memo = None
+
+    @typecheck.typechecked
     def transform(self, module: program.Module) -> bool:
         """Change the module in-place
         """
         changed = self.interprocedural_optimize(module)
-        for func in module.get_functions():
-            changed |= self.global_optimize(func)
-            for block in func.get_basic_blocks():
-                changed |= self.local_optimize(block)
+        for func in module.iter_functions():
+            changed |= self.transform_function(func)
+        return changed
+
+    def transform_function(self, func: program.Function) -> bool:
+        """Run the function-local part of the pass on one function"""
+        changed = self.global_optimize(func)
+        for block in func.iter_basic_blocks():
+            changed |= self.optimize_block(block)
         return changed
 
+    def optimize_block(self, block: program.BasicBlock) -> bool:
+        """local_optimize(block), through the block memo if there is one"""
+        if self._block_memo is None or not self.MEMOIZABLE:
+            return self.local_optimize(block)
+        return self._block_memo.optimize(self, block)
+
+    def set_block_memo(self, block_memo):
+        self._block_memo = block_memo
+
+    def is_function_local(self) -> bool:
+        return self.SCOPE != CompilerPassScope.INTERPROCEDURAL_OPTIMIZATION
+
+    def get_required_analyses(self) -> tuple:
+        return self.REQUIRED_ANALYSES
+
+    def get_preserved_analyses(self) -> tuple:
+        return self.PRESERVED_ANALYSES
+
+    def set_analysis_manager(self, analysis_manager):
+        self._analysis_manager = analysis_manager
+
+    def get_analysis(self, analysis_class, func: program.Function):
+        """The cached result of a declared analysis over func"""
+        if analysis_class not in self.get_required_analyses():
+            raise ValueError(f"{type(self).__name__} does not require "
+                             f"{analysis_class.__name__}")
+        if self._analysis_manager is None:
+            # outside of a PassManager nothing would invalidate a cache
+            return manager.AnalysisManager().get(analysis_class, func)
+        return self._analysis_manager.get(analysis_class, func)
+
     def interprocedural_optimize(self, module: program.Module) -> bool:
         """interprocedural optimization
             returns True for success response
@@ -47,18 +100,65 @@ class CompilerPassComposite(CompilerPass):
     def __init__(self):
         self._passes = array.Array(CompilerPass)
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def add_pass(self, compiler_pass: CompilerPass) -> bool:
-        # TODO: check pass dependency
+        # passes depend on analyses only, computed on demand
+        for analysis_class in compiler_pass.get_required_analyses():
+            if not issubclass(analysis_class, manager.Analysis):
+                raise TypeError(f"{analysis_class} is not an analysis")
+        compiler_pass.set_analysis_manager(self._analysis_manager)
+        compiler_pass.set_block_memo(self._block_memo)
         self._passes.append(compiler_pass)
         return True
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def transform(self, module: program.Module) -> bool:
         for compiler_pass in self._passes:
             compiler_pass.transform(module)
         return True
 
+    def get_passes(self) -> list:
+        return list(self._passes)
+
+    def transform_function(self, func: program.Function) -> bool:
+        changed = False
+        for compiler_pass in self._passes:
+            changed |= compiler_pass.transform_function(func)
+        return changed
+
+    def is_function_local(self) -> bool:
+        for compiler_pass in self._passes:
+            if not compiler_pass.is_function_local():
+                return False
+        return True
+
+    def get_required_analyses(self) -> tuple:
+        required = dict.fromkeys(self.REQUIRED_ANALYSES)
+        for compiler_pass in self._passes:
+            required.update(
+                dict.fromkeys(compiler_pass.get_required_analyses()))
+        return tuple(required)
+
+    def get_preserved_analyses(self) -> tuple:
+        # the declared ones, and those every sub-pass preserves
+        preserved = dict.fromkeys(self.PRESERVED_ANALYSES)
+        if self._passes:
+            common = set(self._passes[0].get_preserved_analyses())
+            for compiler_pass in self._passes:
+                common &= set(compiler_pass.get_preserved_analyses())
+            preserved.update(dict.fromkeys(common))
+        return tuple(preserved)
+
+    def set_analysis_manager(self, analysis_manager):
+        self._analysis_manager = analysis_manager
+        for compiler_pass in self._passes:
+            compiler_pass.set_analysis_manager(analysis_manager)
+
+    def set_block_memo(self, block_memo):
+        self._block_memo = block_memo
+        for compiler_pass in self._passes:
+            compiler_pass.set_block_memo(block_memo)
+
 
 class PassManager(CompilerPassComposite):
     """Singleton compilerpass"""
@@ -66,3 +166,188 @@ class PassManager(CompilerPassComposite):
         if not hasattr(cls, "instance"):
             cls.instance = super(PassManager, cls).__new__(cls)
         return cls.instance
+
+    def __init__(self):
+        super().__init__()
+        # the singleton is initialized again for every new pipeline:
+        #  stop the workers of the previous one
+        self.shutdown()
+        self._executor = None
+        self._cache = None
+        self.set_analysis_manager(manager.AnalysisManager())
+        self.set_block_memo(None)
+
+    def set_executor(self, executor):
+        """Opt in to running function-local passes through an executor,
+            e.g. FunctionParallelExecutor; None runs everything serially
+        """
+        if executor is not self.get_executor():
+            self.shutdown()
+        self._executor = executor
+
+    def get_executor(self):
+        # unset until the first __init__ is done
+        return getattr(self, "_executor", None)
+
+    def shutdown(self):
+        """Stop the worker processes of the executor, if any; a later
+            transform starts them again
+        """
+        executor = self.get_executor()
+        if executor is not None:
+            executor.shutdown()
+
+    def set_cache(self, cache):
+        """Opt in to looking up the optimized functions in a cache, e.g.
+            cache.OptimizationCache; a pipeline with interprocedural
+            passes always runs
+        """
+        self._cache = cache
+
+    def get_analysis_manager(self) -> manager.AnalysisManager:
+        return self._analysis_manager
+
+    @typecheck.typechecked
+    def transform(self, module: program.Module) -> bool:
+        if self._cache is not None and self.is_function_local():
+            return self._cache.transform(self, module)
+        return self.transform_uncached(module)
+
+    def transform_uncached(self, module: program.Module) -> bool:
+        collector = instrumentation.get_active()
+
+        # consecutive function-local passes share one trip to the workers
+        local_passes = []
+        for compiler_pass in self._passes:
+            if self._executor is not None and \
+                    compiler_pass.is_function_local():
+                local_passes.append(compiler_pass)
+                continue
+            if local_passes:
+                self._run_on_executor(local_passes, module, collector)
+                local_passes = []
+            self._run_pass(compiler_pass, module, collector)
+            # between two passes no removed instruction is held
+            for func in module.iter_functions():
+                func.reclaim_storage()
+
+        if local_passes:
+            self._run_on_executor(local_passes, module, collector)
+        # the module is done: keep no function alive
+        self._analysis_manager.clear()
+        return True
+
+    def _run_pass(self, compiler_pass, module, collector):
+        if collector is not None:
+            self._run_instrumented(compiler_pass, module, collector)
+            return
+        if not compiler_pass.is_function_local():
+            if compiler_pass.transform(module):
+                self._analysis_manager.clear()
+            return
+
+        # same as transform(), invalidating the analyses function-wise
+        preserved = compiler_pass.get_preserved_analyses()
+        for func in module.get_functions():
+            if compiler_pass.transform_function(func):
+                self._analysis_manager.invalidate(func, preserved)
+
+    def _run_instrumented(self, compiler_pass, module, collector):
+        pass_name = type(compiler_pass).__name__
+        num_instrs = self._count_instructions(module)
+        start = collector.start_pass(pass_name)
+        if compiler_pass.is_function_local():
+            # one timer per function
+            preserved = compiler_pass.get_preserved_analyses()
+            for func in module.get_functions():
+                func_start = collector.start_function()
+                changed = compiler_pass.transform_function(func)
+                collector.stop_function(
+                    pass_name, func.get_value(), func_start)
+                if changed:
+                    self._analysis_manager.invalidate(func, preserved)
+        elif compiler_pass.transform(module):
+            self._analysis_manager.clear()
+        collector.stop_pass(pass_name, start)
+        collector.add_count(
+            "instructions removed (net)",
+            num_instrs - self._count_instructions(module),
+            pass_name
+        )
+
+    def _run_on_executor(self, passes, module, collector):
+        # the functions come back as new objects
+        self._analysis_manager.clear()
+        if collector is None:
+            self._executor.run(passes, module)
+            return
+
+        # the workers collect nothing: the group is timed as a whole
+        pass_name = "+".join(type(p).__name__ for p in passes)
+        start = collector.start_pass(pass_name)
+        self._executor.run(passes, module)
+        collector.stop_pass(pass_name, start)
+
+    def _count_instructions(self, module):
+        return sum(
+            len(func.get_instructions()) for func in module.iter_functions()
+        )
+
+
+def _transform_function_in_worker(payload: bytes) -> bytes:
+    passes, func = pickle.loads(payload)
+    changed = False
+    for compiler_pass in passes:
+        changed_by_pass = compiler_pass.transform_function(func)
+        func.reclaim_storage()
+        if not changed_by_pass:
+            continue
+        changed = True
+        # the passes share the (unpickled) analysis manager
+        if compiler_pass._analysis_manager is not None:
+            compiler_pass._analysis_manager.invalidate(
+                func, compiler_pass.get_preserved_analyses())
+    return pickle.dumps((changed, func))
+
+
+class FunctionParallelExecutor(component.PYIRComponent):
+    """Run function-local passes on every function of a module in a
+        process pool, and splice the optimized functions back in place
+    """
+    @typecheck.typechecked
+    def __init__(self, jobs: int):
+        super().__init__()
+        if jobs < 1:
+            raise ValueError(f"jobs must be positive, got {jobs}")
+        self._jobs = jobs
+        self._pool = None
+
+    def run(self, passes: list, module: program.Module) -> bool:
+        functions = module.get_functions()
+        payloads = [self._pack(passes, func) for func in functions]
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._jobs)
+
+        changed = False
+        results = self._pool.map(_transform_function_in_worker, payloads)
+        for func, result in zip(functions, results):
+            func_changed, new_func = pickle.loads(result)
+            func.insert_next(new_func)
+            func.remove_from_parent()
+            changed |= func_changed
+        return changed
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _pack(self, passes, func) -> bytes:
+        # detach the function, so that the rest of the module stays home
+        parent = func._parent
+        func._parent = None
+        try:
+            return pickle.dumps((passes, func))
+        finally:
+            func._parent = parent
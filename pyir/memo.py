@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Block-level memoization of local passes
+
+    A block's shape is its instructions with every variable renamed to
+    %N, N its rank among the block's names in sorted order, and every
+    label to %LN by first appearance. A pass declaring MEMOIZABLE reads
+    nothing but the block, and names only through equality and order,
+    so blocks of one shape come out of it alike: it runs once on a
+    renamed copy, and every block of that shape gets the result with
+    its own names put back. Names the pass makes up (lvn.N) are kept as
+    they are, unless the block already uses them; such a block runs the
+    pass itself. Computing a shape costs about a fifth of lvn and a miss
+    twice the pass, so it pays off where blocks repeat, as in generated
+    or inlined code (see benchmark/memo_bench.py).
+"""
+
+import collections
+
+from pyir import component, instrumentation, trace, typecheck
+from pyir.program import ir_builder, ir_type, program, use
+
+
+class BlockShape:
+    """The alpha-renamed form of a block, with the names to map back"""
+    __slots__ = ("key", "names", "labels")
+
+    def __init__(self, key: tuple, names: dict, labels: dict):
+        self.key = key
+        # canonical name -> name in the block
+        self.names = names
+        self.labels = labels
+
+
+def get_shape(block: program.BasicBlock) -> BlockShape:
+    names = set()
+    rows = _get_rows(block.get_instructions(), names)
+    # zero-padded, so that the ranks sort like the names
+    width = len(str(len(names)))
+    rename = {name: f"%{rank:0{width}d}"
+              for rank, name in enumerate(sorted(names))}
+    relabel = {}
+    key = []
+    for operator, destination, operands, labels in rows:
+        if destination is not None:
+            destination = (rename[destination[0]], destination[1])
+        if operands:
+            operands = tuple((rename[operand[0]], operand[1])
+                             if len(operand) == 2 else operand
+                             for operand in operands)
+        if labels:
+            labels = tuple(relabel.setdefault(label, f"%L{len(relabel)}")
+                           for label in labels)
+        key.append((operator, destination, operands, labels))
+    return BlockShape(
+        tuple(key),
+        {canonical: name for name, canonical in rename.items()},
+        {canonical: label for label, canonical in relabel.items()},
+    )
+
+
+def get_key(instrs) -> tuple:
+    """The instructions as nested tuples, names kept as they are"""
+    return tuple(_get_rows(instrs, set()))
+
+
+def _get_rows(instrs, names: set) -> list:
+    """The key of each instruction; adds the names it uses to names"""
+    rows = []
+    for instr in instrs:
+        destination = instr.get_destination()
+        if destination is not None:
+            name = destination.get_value()
+            names.add(name)
+            use_type = destination.get_type()
+            destination = (
+                name, None if use_type is None else use_type.get_name())
+        operands = []
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            value = operand.get_value()
+            use_type = operand.get_type()
+            type_name = None if use_type is None else use_type.get_name()
+            if type(operand) is use.Identifier:
+                names.add(value)
+                operands.append((value, type_name))
+            else:
+                # True and 1 are equal in Python, not in Bril
+                operands.append((value, type(value), type_name))
+        rows.append((
+            instr.get_operator().get_name(),
+            destination,
+            tuple(operands),
+            tuple(instr.get_label(label_id).get_value()
+                  for label_id in range(instr.get_num_labels())),
+        ))
+    return rows
+
+
+class BlockMemo(component.PYIRComponent):
+    """(pass class, block shape) -> what local_optimize made of it, for
+        the max_entries most recently used shapes. Install it with
+        set_block_memo() on a pass or the PassManager
+    """
+    DEFAULT_MAX_ENTRIES = 4096
+    LABEL_TYPE = ir_type.get_type("basic-block")
+
+    @typecheck.typechecked
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__()
+        self._ir_builder = ir_builder.IRBuilder()
+        self._entries = collections.OrderedDict()
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "evictions", "bypassed"), 0)
+        self.set_max_entries(max_entries)
+
+    def __getstate__(self):
+        # a worker process starts with an empty memo of its own
+        state = self.__dict__.copy()
+        state["_entries"] = collections.OrderedDict()
+        return state
+
+    def set_max_entries(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive, got {max_entries}")
+        self._max_entries = max_entries
+        while len(self._entries) > max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_max_entries(self) -> int:
+        return self._max_entries
+
+    def get_num_entries(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> dict:
+        return dict(self._stats)
+
+    def clear(self):
+        self._entries.clear()
+
+    def optimize(self, compiler_pass, block: program.BasicBlock) -> bool:
+        """compiler_pass.local_optimize(block), replayed if the shape of
+            block was seen before
+        """
+        # traces name the real instructions
+        if any(trace.is_enabled(channel) for channel in trace.CHANNELS):
+            return self._bypass(compiler_pass, block)
+
+        shape = get_shape(block)
+        key = (type(compiler_pass), shape.key)
+        result = self._entries.get(key)
+        if result is None:
+            self._count("misses")
+            result = self._run(compiler_pass, shape)
+            self._entries[key] = result
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+        else:
+            self._count("hits")
+            self._entries.move_to_end(key)
+
+        changed, output = result
+        if output is None:
+            return changed
+        if not self._replay(output, shape, block):
+            return self._bypass(compiler_pass, block)
+        return changed
+
+    def _run(self, compiler_pass, shape) -> tuple:
+        """(changed, output or None if unchanged) of the pass on a renamed
+            copy of the block; the output lists the index of every input
+            instruction kept as it is, in increasing order, and the
+            resolved key of every other one
+        """
+        identity = BlockShape(
+            shape.key,
+            {name: name for name in shape.names},
+            {label: label for label in shape.labels},
+        )
+        copy = program.BasicBlock()
+        for instr in self._build(map(_resolve, shape.key), identity):
+            copy.add_instruction(instr)
+        changed = compiler_pass.local_optimize(copy)
+        output_key = get_key(copy.get_instructions())
+        if output_key == shape.key:
+            return changed, None
+
+        positions = collections.defaultdict(collections.deque)
+        for index, instr_key in enumerate(shape.key):
+            positions[instr_key].append(index)
+        output = []
+        last = -1
+        for instr_key in output_key:
+            indices = positions.get(instr_key)
+            while indices and indices[0] <= last:
+                indices.popleft()
+            if indices:
+                last = indices.popleft()
+                output.append(last)
+            else:
+                output.append(_resolve(instr_key))
+        return changed, tuple(output)
+
+    def _replay(self, output, shape, block) -> bool:
+        """Make block the output of _run, False if a name made up by the
+            pass is taken in the block
+        """
+        new_instrs = self._build(
+            [entry for entry in output if type(entry) is not int], shape)
+        if new_instrs is None:
+            return False
+        instrs = block.get_instructions()
+        kept = {entry for entry in output if type(entry) is int}
+        for index, instr in enumerate(instrs):
+            if index not in kept:
+                instr.remove_from_parent()
+        new_instrs = iter(new_instrs)
+        previous = None
+        for entry in output:
+            if type(entry) is int:
+                previous = instrs[entry]
+                continue
+            instr = next(new_instrs)
+            if previous is None:
+                block.insert_first_child(instr)
+            else:
+                previous.insert_next(instr)
+            previous = instr
+        return True
+
+    def _build(self, resolved_key, shape):
+        """The instructions of resolved_key with the names of shape, None
+            if a name made up by the pass is taken in the block
+        """
+        names = shape.names
+        taken = set(names.values())
+        labels = shape.labels
+        builder = self._ir_builder
+
+        def map_name(name):
+            if name in names:
+                return names[name]
+            # made up by the pass
+            if name in taken:
+                raise KeyError(name)
+            return name
+
+        instrs = []
+        try:
+            for operator, destination, operands, instr_labels in \
+                    resolved_key:
+                if destination is not None:
+                    destination = use.Identifier(
+                        map_name(destination[0]), destination[1])
+                uses = [use.Identifier(map_name(value), use_type)
+                        if is_identifier else use.Primitive(value, use_type)
+                        for is_identifier, value, use_type in operands]
+                instrs.append(builder.build(
+                    operator,
+                    destination,
+                    uses,
+                    [use.Identifier(labels[label], self.LABEL_TYPE)
+                     for label in instr_labels],
+                ))
+        except KeyError:
+            return None
+        return instrs
+
+    def _bypass(self, compiler_pass, block) -> bool:
+        self._count("bypassed")
+        return compiler_pass.local_optimize(block)
+
+    def _count(self, name):
+        self._stats[name] += 1
+        instrumentation.count(f"block memo {name}")
+
+
+def _resolve(instr_key) -> tuple:
+    """instr_key with the operator and types as objects, and operands as
+        (is identifier, value, type); these only live in one process
+    """
+    operator, destination, operands, labels = instr_key
+    if destination is not None:
+        destination = (destination[0], _get_type(destination[1]))
+    return (
+        use.get_operator(operator),
+        destination,
+        tuple((True, operand[0], _get_type(operand[1]))
+              if len(operand) == 2 else
+              (False, operand[0], _get_type(operand[2]))
+              for operand in operands),
+        labels,
+    )
+
+
+def _get_type(type_name):
+    return None if type_name is None else ir_type.get_type(type_name)
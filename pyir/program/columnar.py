@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+
+import array
+import itertools
+import sys
+
+from pyir.program import hierarchical_impl, instruction, ir_type, use
+
+
+class InstructionColumns:
+    """Struct-of-arrays storage: one row per instruction, one typed
+        column per field. Operands, destinations and labels are ids into
+        a table of interned Use objects, opcodes are ids into a table of
+        (operator, instruction class, #operands, #labels). Operands and
+        labels past the first two (phi) go to the `wide` side table.
+        Rows are never moved; the order is kept by the next/prev columns
+        and removed rows are only marked dead, readable until reclaim()
+        hands them to later add_row calls.
+    """
+    NONE = -1
+    # the fields of a row, for get_field/set_field
+    DESTINATION = 0
+    OPERAND = 1
+    LABEL = 2
+
+    def __init__(self):
+        self.opcodes = array.array("i")
+        self.destinations = array.array("i")
+        self.operands0 = array.array("i")
+        self.operands1 = array.array("i")
+        self.labels0 = array.array("i")
+        self.labels1 = array.array("i")
+        self.next = array.array("i")
+        self.prev = array.array("i")
+        self.live = array.array("b")
+        # row -> (operand ids, label ids) past the first two
+        self.wide = {}
+        self.head = self.NONE
+        self.tail = self.NONE
+        self.count = 0
+        self.version = 0
+        # removed since the last reclaim(), and free for add_row
+        self._dead_rows = []
+        self._free_rows = []
+
+        self._opcode_table = []
+        self._opcode_ids = {}
+        self._symbols = []
+        self._symbol_ids = {}
+        self._identifier_ids = set()
+
+    # symbol tables
+    def get_symbol(self, symbol_id):
+        if symbol_id == self.NONE:
+            return None
+        return self._symbols[symbol_id]
+
+    def get_opcode(self, opcode_id):
+        return self._opcode_table[opcode_id]
+
+    def is_identifier(self, symbol_id) -> bool:
+        return symbol_id in self._identifier_ids
+
+    def _intern_symbol(self, operand) -> int:
+        if operand is None:
+            return self.NONE
+        value = operand.get_value()
+        use_type = operand.get_type()
+        type_name = None if use_type is None else use_type.get_name()
+        is_identifier = isinstance(operand, use.Identifier)
+        # type(value) keeps True and 1 apart
+        key = (is_identifier, type(value), value, type_name)
+        symbol_id = self._symbol_ids.get(key)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            if is_identifier:
+                # a private copy: the caller may rename its own later
+                operand = use.Identifier(value, use_type)
+            self._symbols.append(operand)
+            self._symbol_ids[key] = symbol_id
+            if is_identifier:
+                self._identifier_ids.add(symbol_id)
+        return symbol_id
+
+    def _intern_opcode(self, instr) -> int:
+        # ret and phi have a varying number of operands
+        key = (instr.get_operator(), type(instr),
+               instr.get_num_operands(), instr.get_num_labels())
+        opcode_id = self._opcode_ids.get(key)
+        if opcode_id is None:
+            opcode_id = len(self._opcode_table)
+            self._opcode_table.append((
+                instr.get_operator(),
+                type(instr),
+                instr.get_num_operands(),
+                instr.get_num_labels(),
+            ))
+            self._opcode_ids[key] = opcode_id
+        return opcode_id
+
+    # rows
+    def add_row(self, instr, after=NONE, at_head=False) -> int:
+        """Store instr in a new row linked right after the row `after`,
+            at the head when at_head is set, or at the end otherwise
+        """
+        num_operands = instr.get_num_operands()
+        num_labels = instr.get_num_labels()
+        operands = [self.NONE] * max(2, num_operands)
+        for i in range(num_operands):
+            operands[i] = self._intern_symbol(instr.get_operand(i))
+        labels = [self.NONE] * max(2, num_labels)
+        for i in range(num_labels):
+            labels[i] = self._intern_symbol(instr.get_label(i))
+
+        opcode_id = self._intern_opcode(instr)
+        destination_id = self._intern_symbol(instr.get_destination())
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self.opcodes[row] = opcode_id
+            self.destinations[row] = destination_id
+            self.operands0[row] = operands[0]
+            self.operands1[row] = operands[1]
+            self.labels0[row] = labels[0]
+            self.labels1[row] = labels[1]
+            self.live[row] = 1
+        else:
+            row = len(self.opcodes)
+            self.opcodes.append(opcode_id)
+            self.destinations.append(destination_id)
+            self.operands0.append(operands[0])
+            self.operands1.append(operands[1])
+            self.labels0.append(labels[0])
+            self.labels1.append(labels[1])
+            self.live.append(1)
+            self.next.append(self.NONE)
+            self.prev.append(self.NONE)
+        if num_operands > 2 or num_labels > 2:
+            self.wide[row] = (tuple(operands[2:]), tuple(labels[2:]))
+
+        if at_head:
+            after = self.NONE
+        elif after == self.NONE:
+            after = self.tail
+        self._link_after(row, after)
+        self.count += 1
+        self.version += 1
+        return row
+
+    def remove_row(self, row):
+        if not self.live[row]:
+            return False
+        prev_row = self.prev[row]
+        next_row = self.next[row]
+        if prev_row == self.NONE:
+            self.head = next_row
+        else:
+            self.next[prev_row] = next_row
+        if next_row == self.NONE:
+            self.tail = prev_row
+        else:
+            self.prev[next_row] = prev_row
+        self.live[row] = 0
+        self._dead_rows.append(row)
+        self.count -= 1
+        self.version += 1
+        return True
+
+    def reclaim(self):
+        """Let add_row reuse the rows removed so far, and drop the
+            symbols only they referred to once those are the majority.
+            A handle on a removed row may then read another instruction:
+            call it when nothing holds one, e.g. between two passes
+        """
+        if not self._dead_rows:
+            return
+        for row in self._dead_rows:
+            self.wide.pop(row, None)
+        self._free_rows.extend(self._dead_rows)
+        self._dead_rows = []
+
+        referenced = set()
+        for column in self._symbol_columns():
+            referenced.update(itertools.compress(column, self.live))
+        for operand_ids, label_ids in self.wide.values():
+            referenced.update(operand_ids)
+            referenced.update(label_ids)
+        referenced.discard(self.NONE)
+        if 2 * len(referenced) < len(self._symbols):
+            self._prune_symbols(referenced)
+
+    def _symbol_columns(self):
+        return (self.destinations, self.operands0, self.operands1,
+                self.labels0, self.labels1)
+
+    def _prune_symbols(self, referenced):
+        symbols = self._symbols
+        self._symbols = []
+        self._symbol_ids = {}
+        self._identifier_ids = set()
+        new_ids = {self.NONE: self.NONE}
+        for symbol_id in sorted(referenced):
+            new_ids[symbol_id] = self._intern_symbol(symbols[symbol_id])
+
+        # free rows refer to nothing any more
+        get = new_ids.get
+        none = self.NONE
+        (self.destinations, self.operands0, self.operands1,
+         self.labels0, self.labels1) = (
+            array.array("i", [get(i, none) for i in column])
+            for column in self._symbol_columns()
+        )
+        for row, (operand_ids, label_ids) in self.wide.items():
+            self.wide[row] = (tuple(new_ids[i] for i in operand_ids),
+                              tuple(new_ids[i] for i in label_ids))
+
+    def get_field(self, row, kind, index=0) -> int:
+        """Symbol id of the destination, or of operand or label #index"""
+        if kind == self.DESTINATION:
+            return self.destinations[row]
+        if index >= 2:
+            return self.wide[row][kind - self.OPERAND][index - 2]
+        return self._field_column(kind, index)[row]
+
+    def set_field(self, row, kind, index, symbol_id):
+        if kind == self.DESTINATION:
+            self.destinations[row] = symbol_id
+        elif index >= 2:
+            fields = list(self.wide[row])
+            ids = list(fields[kind - self.OPERAND])
+            ids[index - 2] = symbol_id
+            fields[kind - self.OPERAND] = tuple(ids)
+            self.wide[row] = tuple(fields)
+        else:
+            self._field_column(kind, index)[row] = symbol_id
+
+    def rename(self, row, kind, index, name):
+        """Point one field of the row at the identifier `name`, of the
+            same type; the other rows reading the old name keep it
+        """
+        use_type = self._symbols[self.get_field(row, kind, index)].get_type()
+        self.set_field(row, kind, index,
+                       self._intern_symbol(use.Identifier(name, use_type)))
+
+    def _field_column(self, kind, index):
+        if kind == self.OPERAND:
+            return self.operands0 if index == 0 else self.operands1
+        return self.labels0 if index == 0 else self.labels1
+
+    def rows(self):
+        """Live rows in order; like MapList iteration, it tolerates
+            removals and skips rows inserted right after the current one
+        """
+        row = self.head
+        while row != self.NONE:
+            next_row = self.next[row]
+            if self.live[row]:
+                yield row
+            row = next_row
+
+    def _link_after(self, row, after):
+        if after == self.NONE:
+            next_row = self.head
+            self.head = row
+        else:
+            next_row = self.next[after]
+            self.next[after] = row
+        self.prev[row] = after
+        self.next[row] = next_row
+        if next_row == self.NONE:
+            self.tail = row
+        else:
+            self.prev[next_row] = row
+
+    # column-wise queries
+    def used_names(self) -> set:
+        """Names of the identifiers read by live rows, computed with set
+            operations over the operand columns
+        """
+        used_ids = set(itertools.compress(self.operands0, self.live))
+        used_ids.update(itertools.compress(self.operands1, self.live))
+        for row, (operand_ids, _) in self.wide.items():
+            if self.live[row]:
+                used_ids.update(operand_ids)
+        used_ids &= self._identifier_ids
+        return {self._symbols[i].get_value() for i in used_ids}
+
+
+class ColumnarIdentifier(use.Identifier):
+    """An identifier as read from one field of a row: renaming it
+        rewrites that field only, like renaming the operand of an
+        object-backed instruction
+    """
+    __slots__ = ("_instr", "_kind", "_index")
+
+    def __init__(self, symbol, instr, kind, index):
+        # no Identifier.__init__: the symbol's name is interned already
+        self._value = symbol._value
+        self._type = symbol._type
+        self._chains = None
+        self._instr = instr
+        self._kind = kind
+        self._index = index
+
+    def rename_as(self, new_name):
+        if not isinstance(new_name, use.Identifier):
+            raise TypeError
+        new_name_str = new_name.get_value()
+        if not isinstance(new_name_str, str):
+            raise TypeError
+        instr = self._instr
+        columns = instr._columns
+        chains = None
+        if columns.live[instr._row] and instr._parent is not None:
+            chains = instr._parent._get_def_use()
+        if chains is not None:
+            chains.remove_instruction(instr)
+        self._value = sys.intern(new_name_str)
+        columns.rename(instr._row, self._kind, self._index, self._value)
+        if chains is not None:
+            chains.add_instruction(instr)
+
+
+class ColumnarInstruction(instruction.Instruction):
+    """A lightweight view on one row of InstructionColumns implementing
+        the Instruction API. Primitives are shared between rows, while
+        each identifier comes back as a ColumnarIdentifier of its own
+    """
+    __slots__ = ("_columns", "_row")
+
+    INSTRUCTION_TYPE = ir_type.get_type("instruction")
+
+    def __init__(self, columns, row, parent):
+        # no Instruction.__init__: the fields live in the columns
+        self._value = "some instruction"
+        self._type = self.INSTRUCTION_TYPE
+        self._child_type = None
+        self._children_impl = None
+        self._parent = parent
+        self._key_in_parent = row
+        self._columns = columns
+        self._row = row
+
+    def get_operator(self) -> use.Operator:
+        return self._opcode()[0]
+
+    def get_destination(self):
+        return self._get_use(InstructionColumns.DESTINATION, 0)
+
+    def get_operand(self, index: int) -> use.Use:
+        if index < 0 or index >= self.get_num_operands():
+            raise IndexError
+        return self._get_use(InstructionColumns.OPERAND, index)
+
+    def get_label(self, index: int) -> use.Identifier:
+        if index < 0 or index >= self.get_num_labels():
+            raise IndexError
+        return self._get_use(InstructionColumns.LABEL, index)
+
+    def get_num_operands(self):
+        return self._opcode()[2]
+
+    def get_num_labels(self):
+        return self._opcode()[3]
+
+    def get_instruction_class(self):
+        return self._opcode()[1]
+
+    def _get_use(self, kind, index):
+        columns = self._columns
+        symbol_id = columns.get_field(self._row, kind, index)
+        symbol = columns.get_symbol(symbol_id)
+        if symbol is None or not columns.is_identifier(symbol_id):
+            return symbol
+        return ColumnarIdentifier(symbol, self, kind, index)
+
+    def _opcode(self):
+        columns = self._columns
+        return columns.get_opcode(columns.opcodes[self._row])
+
+    def __eq__(self, other):
+        if not isinstance(other, ColumnarInstruction):
+            return False
+        return self._columns is other._columns and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._columns), self._row))
+
+
+class ColumnarHierarchicalImpl(hierarchical_impl.HierarchicalImpl):
+    """Children implementation keeping a block's instructions in
+        InstructionColumns; the key of a child is its row
+    """
+    def __init__(self, child_type):
+        self._columns = InstructionColumns()
+        self._owner = None
+        self._snapshot = None
+
+    def set_owner(self, owner):
+        self._owner = owner
+
+    def get_columns(self) -> InstructionColumns:
+        return self._columns
+
+    def get_list(self):
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != self._columns.version:
+            snapshot = self._snapshot = (
+                self._columns.version,
+                tuple(self.iterate())
+            )
+        return snapshot[1]
+
+    def iterate(self):
+        columns = self._columns
+        owner = self._owner
+        for row in columns.rows():
+            yield ColumnarInstruction(columns, row, owner)
+
+    def get_version(self) -> int:
+        return self._columns.version
+
+    def get_handle(self, key, element):
+        if isinstance(element, ColumnarInstruction):
+            return element
+        return ColumnarInstruction(self._columns, key, self._owner)
+
+    def append(self, element):
+        return self._columns.add_row(element)
+
+    def remove_key(self, key):
+        self._columns.remove_row(key)
+
+    def insert_as_next(self, element, key):
+        return self._columns.add_row(element, after=key)
+
+    def insert_as_first(self, element):
+        return self._columns.add_row(element, at_head=True)
+
+    def is_empty(self):
+        return self._columns.count == 0
+
+    def reclaim(self):
+        self._columns.reclaim()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+from pyir.program import use
+
+
+class DefUseChains:
+    """Def-use and use-def chains of one function, keyed by identifier
+        name. Both directions are ordered dictionaries, so queries are
+        O(1) and iteration follows insertion order. The function keeps
+        them up to date as instructions are added, removed or renamed.
+    """
+    def __init__(self):
+        # name -> {instruction: number of operands reading the name}
+        self._uses = {}
+        # name -> {instruction: None}
+        self._definitions = {}
+
+    # queries
+    def get_uses(self, name) -> tuple:
+        """Instructions reading the identifier"""
+        return tuple(self._uses.get(self._name(name), ()))
+
+    def get_num_uses(self, name) -> int:
+        users = self._uses.get(self._name(name))
+        if users is None:
+            return 0
+        return sum(users.values())
+
+    def is_used(self, name) -> bool:
+        return bool(self._uses.get(self._name(name)))
+
+    def get_definitions(self, name) -> tuple:
+        """Instructions writing the identifier"""
+        return tuple(self._definitions.get(self._name(name), ()))
+
+    def get_definition(self, name):
+        """The defining instruction when there is exactly one"""
+        definitions = self._definitions.get(self._name(name))
+        if definitions is None or len(definitions) != 1:
+            return None
+        return next(iter(definitions))
+
+    def get_names(self) -> list:
+        """Every name read or written, in first-seen order"""
+        return list(dict.fromkeys(
+            list(self._definitions) + list(self._uses)))
+
+    # maintenance
+    def add_instruction(self, instr):
+        for operand in self._identifier_operands(instr):
+            operand._chains = self
+            users = self._uses.setdefault(operand.get_value(), {})
+            users[instr] = users.get(instr, 0) + 1
+
+        destination = instr.get_destination()
+        if destination is not None:
+            destination._chains = self
+            self._definitions.setdefault(
+                destination.get_value(), {})[instr] = None
+
+    def remove_instruction(self, instr):
+        for operand in self._identifier_operands(instr):
+            self._discard_use(operand.get_value(), instr)
+
+        destination = instr.get_destination()
+        if destination is not None:
+            self._discard(self._definitions, destination.get_value(), instr)
+
+    def rename(self, identifier, old_name, new_name):
+        """identifier, held by some instructions, got renamed"""
+        for instr in list(self._uses.get(old_name, ())):
+            for operand in self._identifier_operands(instr):
+                if operand is identifier:
+                    self._discard_use(old_name, instr)
+                    users = self._uses.setdefault(new_name, {})
+                    users[instr] = users.get(instr, 0) + 1
+
+        for instr in list(self._definitions.get(old_name, ())):
+            if instr.get_destination() is identifier:
+                self._discard(self._definitions, old_name, instr)
+                self._definitions.setdefault(new_name, {})[instr] = None
+
+    def _discard_use(self, name, instr):
+        users = self._uses.get(name)
+        if users is None or instr not in users:
+            return
+        users[instr] -= 1
+        if users[instr] == 0:
+            self._discard(self._uses, name, instr)
+
+    def _discard(self, chains, name, instr):
+        instrs = chains.get(name)
+        if instrs is None:
+            return
+        instrs.pop(instr, None)
+        if not instrs:
+            del chains[name]
+
+    def _identifier_operands(self, instr):
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            if isinstance(operand, use.Identifier):
+                yield operand
+
+    def _name(self, name):
+        if isinstance(name, use.Use):
+            return name.get_value()
+        return name
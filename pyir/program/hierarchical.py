@@ -1,16 +1,18 @@
 #!/usr/bin/env python3
 
-import typeguard
-
+from pyir import typecheck
 from pyir.program import use, hierarchical_impl
 
 
 class Hierarchical(use.Use):
+    __slots__ = ("_child_type", "_children_impl", "_parent", "_key_in_parent")
+
     def __init__(
         self,
         name,
         use_type,
-        child_type
+        child_type,
+        children_impl=None
     ):
         super().__init__(
             name,
@@ -18,12 +20,24 @@ class Hierarchical(use.Use):
         )
 
         self._child_type = child_type
-        self._children_impl = (
-            hierarchical_impl.MapListHierarchicalImpl(child_type)
-        )
+        if child_type is None:
+            # a leaf of the hierarchy (Instruction) holds no container
+            self._children_impl = None
+        elif children_impl is not None:
+            self._children_impl = children_impl
+        else:
+            self._children_impl = (
+                hierarchical_impl.MapListHierarchicalImpl(child_type)
+            )
         self._parent = None
         self._key_in_parent = None
 
+    def is_leaf(self) -> bool:
+        return self._children_impl is None
+
+    def get_parent(self):
+        return self._parent
+
     def set_parent(self, parent):
         if not isinstance(self, parent._child_type):
             raise TypeError
@@ -32,6 +46,7 @@ class Hierarchical(use.Use):
     def remove_from_parent(self):
         if self._parent is None:
             raise "Parent is None"
+        self._parent._on_child_removed(self)
         self._parent.remove_key(self._key_in_parent)
 
     def insert_next(self, element):
@@ -44,21 +59,56 @@ class Hierarchical(use.Use):
         self._children_impl.remove_key(key)
 
     def get_children(self):
+        """A snapshot of the children, cached until they change"""
+        if self.is_leaf():
+            return None
         return self._children_impl.get_list()
 
-    @typeguard.typechecked
+    def iter_children(self):
+        """Lazy iteration, allocates no list; children may be removed
+            or inserted after the current one while iterating
+        """
+        if self.is_leaf():
+            return iter(())
+        return self._children_impl.iterate()
+
+    def get_version(self) -> int:
+        if self.is_leaf():
+            return 0
+        return self._children_impl.get_version()
+
+    @typecheck.typechecked
     def add_child(self, element):
-        if not isinstance(element, self._child_type):
+        if self.is_leaf() or not isinstance(element, self._child_type):
             raise TypeError
         element._key_in_parent = self._children_impl.append(element)
         element.set_parent(self)
+        self._on_child_added(element)
 
     def insert_child(self, element, key):
-        if not isinstance(element, self._child_type):
+        if self.is_leaf() or not isinstance(element, self._child_type):
             raise TypeError
         element._key_in_parent = (self._children_impl.
                                   insert_as_next(element, key))
         element.set_parent(self)
+        self._on_child_added(element)
+
+    def _on_child_added(self, element):
+        """Hook run once element is attached"""
+        pass
+
+    def _on_child_removed(self, element):
+        """Hook run right before element is detached"""
+        pass
+
+    def insert_first_child(self, element):
+        if self.is_leaf() or not isinstance(element, self._child_type):
+            raise TypeError
+        element._key_in_parent = self._children_impl.insert_as_first(element)
+        element.set_parent(self)
+        self._on_child_added(element)
 
     def has_no_child(self) -> bool:
+        if self.is_leaf():
+            return True
         return self._children_impl.is_empty()
@@ -4,6 +4,8 @@ from pyir.program import use
 from pyir.utils import array, map_list
 
 class HierarchicalImpl(object):
+    __slots__ = ()
+
     def get_data(self):
         """get a list of data"""
         raise NotImplementedError
@@ -20,6 +22,22 @@ class HierarchicalImpl(object):
     def get_list(self):
         raise NotImplementedError
 
+    def iterate(self):
+        """lazy, mutation-tolerant iteration over the children"""
+        raise NotImplementedError
+
+    def get_version(self) -> int:
+        """changes whenever the children change"""
+        raise NotImplementedError
+
+    def get_handle(self, key, element):
+        """the object iteration yields for the child stored under key"""
+        return element
+
+    def reclaim(self):
+        """free what removed children left behind; none may be held"""
+        pass
+
 
 class ArrayHierarchicalImpl(HierarchicalImpl):
     def __init__(self, child_type):
@@ -50,6 +68,8 @@ class ArrayHierarchicalImpl(HierarchicalImpl):
 
 
 class MapListHierarchicalImpl(HierarchicalImpl):
+    __slots__ = ("_map_list", "_count")
+
     def __init__(self, child_type):
         self._map_list = map_list.MapList()
         self._count = 0
@@ -57,6 +77,12 @@ class MapListHierarchicalImpl(HierarchicalImpl):
     def get_list(self):
         return self._map_list.get_list()
 
+    def iterate(self):
+        return iter(self._map_list)
+
+    def get_version(self) -> int:
+        return self._map_list.get_version()
+
     def append(self, element):
         self._count += 1
         return self._map_list.append(element)
@@ -69,5 +95,9 @@ class MapListHierarchicalImpl(HierarchicalImpl):
         self._count += 1
         return self._map_list.insert_next(element, key)
 
+    def insert_as_first(self, element):
+        self._count += 1
+        return self._map_list.insert_first(element)
+
     def is_empty(self):
         return self._count == 0
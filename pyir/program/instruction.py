@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
 
-import typeguard
 from typing import Optional
 
-from pyir import component
+from pyir import component, typecheck
 from pyir.program import use, hierarchical, ir_type
 
 
@@ -11,8 +10,16 @@ class Instruction(hierarchical.Hierarchical):
     """While this is a Hierarchical type, we (temporary) set
         this as the last-level of hierarchy
     """
-
-    @typeguard.typechecked
+    __slots__ = (
+        "_operator",
+        "_destination",
+        "_operand0",
+        "_operand1",
+        "_label0",
+        "_label1",
+    )
+
+    @typecheck.typechecked
     def __init__(
             self,
             operator: use.Operator,
@@ -24,8 +31,8 @@ class Instruction(hierarchical.Hierarchical):
         ):
         super().__init__(
             name="some instruction",
-            use_type=ir_type.IRType("instruction"),
-            child_type=use.Use # it should have no chlid
+            use_type=ir_type.get_type("instruction"),
+            child_type=None # leaf: it has no child
         )
         self._operator = operator
         self._destination = destination
@@ -37,7 +44,7 @@ class Instruction(hierarchical.Hierarchical):
     def get_operator(self) -> use.Operator:
         return self._operator
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def get_destination(self) -> Optional[use.Identifier]:
         return self._destination
 
@@ -55,10 +62,6 @@ class Instruction(hierarchical.Hierarchical):
             return self._label0
         return self._label1
 
-    # hierarchical
-    def get_children(self):
-        return None
-
     def get_num_operands(self):
         raise NotImplementedError
 
@@ -66,6 +69,8 @@ class Instruction(hierarchical.Hierarchical):
         raise NotImplementedError
 
 class UnaryInstruction(Instruction):
+    __slots__ = ()
+
     def get_num_operands(self):
         return 1
 
@@ -73,6 +78,8 @@ class UnaryInstruction(Instruction):
         return 0
 
 class BinaryInstruction(Instruction):
+    __slots__ = ()
+
     def get_num_operands(self):
         return 2
 
@@ -3,80 +3,112 @@
 from pyir.program import instruction
 
 class AddInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "add"
 
 
 class SubtractInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "sub"
 
 
 class MultiplyInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "mul"
 
 
 class DivideInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "div"
 
 
 class AndInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "and"
 
 
 class OrInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "or"
 
 
 class NotInstruction(instruction.UnaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "not"
 
 class EqualToInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "eq"
 
 
 class GreaterThanInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "gt"
 
 
 class GreaterThanOrEqualToInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "ge"
 
 
 class LessThanInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "lt"
 
 
 class LessThanOrEqualToInstruction(instruction.BinaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "le"
 
 
 class PrintInstruction(instruction.UnaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "print"
 
 
 class ConstantInstruction(instruction.UnaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "const"
 
 
 class IdInstruction(instruction.UnaryInstruction):
+    __slots__ = ()
+
     def string_code(self):
         return "id"
 
 
 class JumpInstruction(instruction.Instruction):
+    __slots__ = ()
+
     def string_code(self):
         return "jmp"
 
@@ -88,6 +120,8 @@ class JumpInstruction(instruction.Instruction):
 
 
 class BranchInstruction(instruction.Instruction):
+    __slots__ = ()
+
     def string_code(self):
         return "br"
 
@@ -96,3 +130,47 @@ class BranchInstruction(instruction.Instruction):
 
     def get_num_labels(self):
         return 2
+
+
+class ReturnInstruction(instruction.Instruction):
+    """ret, with one operand when the function returns a value"""
+    __slots__ = ()
+
+    def string_code(self):
+        return "ret"
+
+    def get_num_operands(self):
+        return 0 if self._operand0 is None else 1
+
+    def get_num_labels(self):
+        return 0
+
+
+class PhiInstruction(instruction.Instruction):
+    """dest = phi v1 ... vn .b1 ... .bn: the value vi when control comes
+        from the block labeled bi. Operand i pairs with label i, as many
+        as the block has predecessors
+    """
+    __slots__ = ("_values", "_blocks")
+
+    def __init__(self, operator, destination, values: list, blocks: list):
+        super().__init__(operator, destination=destination)
+        if len(values) != len(blocks):
+            raise ValueError("phi needs one label per value")
+        self._values = list(values)
+        self._blocks = list(blocks)
+
+    def string_code(self):
+        return "phi"
+
+    def get_operand(self, index: int):
+        return self._values[index]
+
+    def get_label(self, index: int):
+        return self._blocks[index]
+
+    def get_num_operands(self):
+        return len(self._values)
+
+    def get_num_labels(self):
+        return len(self._blocks)
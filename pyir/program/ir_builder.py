@@ -1,36 +1,37 @@
 #!/usr/bin/env python3
 
-import typeguard
 from typing import Optional
 
-from pyir import component
+from pyir import component, typecheck
 from pyir.program import instruction, use, ir
 
 class IRBuilder(component.PYIRComponent):
     OPERATOR_TO_IR_MAP = {
-        use.Operator("add"): ir.AddInstruction,
-        use.Operator("sub"): ir.SubtractInstruction,
-        use.Operator("mul"): ir.AddInstruction,
-        use.Operator("div"): ir.DivideInstruction,
-        use.Operator("and"): ir.AndInstruction,
-        use.Operator("or"): ir.OrInstruction,
-        use.Operator("not"): ir.NotInstruction,
-        use.Operator("eq"): ir.EqualToInstruction,
-        use.Operator("gt"): ir.GreaterThanInstruction,
-        use.Operator("ge"): ir.GreaterThanOrEqualToInstruction,
-        use.Operator("lt"): ir.LessThanInstruction,
-        use.Operator("le"): ir.LessThanOrEqualToInstruction,
-        use.Operator("print"): ir.PrintInstruction,
-        use.Operator("const"): ir.ConstantInstruction,
-        use.Operator("id"): ir.IdInstruction,
-        use.Operator("jmp"): ir.JumpInstruction,
-        use.Operator("br"): ir.BranchInstruction,
+        use.get_operator("add"): ir.AddInstruction,
+        use.get_operator("sub"): ir.SubtractInstruction,
+        use.get_operator("mul"): ir.AddInstruction,
+        use.get_operator("div"): ir.DivideInstruction,
+        use.get_operator("and"): ir.AndInstruction,
+        use.get_operator("or"): ir.OrInstruction,
+        use.get_operator("not"): ir.NotInstruction,
+        use.get_operator("eq"): ir.EqualToInstruction,
+        use.get_operator("gt"): ir.GreaterThanInstruction,
+        use.get_operator("ge"): ir.GreaterThanOrEqualToInstruction,
+        use.get_operator("lt"): ir.LessThanInstruction,
+        use.get_operator("le"): ir.LessThanOrEqualToInstruction,
+        use.get_operator("print"): ir.PrintInstruction,
+        use.get_operator("const"): ir.ConstantInstruction,
+        use.get_operator("id"): ir.IdInstruction,
+        use.get_operator("jmp"): ir.JumpInstruction,
+        use.get_operator("br"): ir.BranchInstruction,
+        use.get_operator("ret"): ir.ReturnInstruction,
+        use.get_operator("phi"): ir.PhiInstruction,
     }
 
     def __init__(self):
         super().__init__()
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def build(
         self,
         operator: use.Operator,
@@ -42,6 +43,9 @@ class IRBuilder(component.PYIRComponent):
             self.logger.debug(f"cannot decode operator {operator.get_name()}")
             return None
 
+        if self.OPERATOR_TO_IR_MAP[operator] is ir.PhiInstruction:
+            return ir.PhiInstruction(operator, destination, operands, labels)
+
         # operator
         # destination =destination
         if destination is not None:
@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 
-import typeguard
 
-from pyir import component
+from pyir import component, typecheck
 
 class IRType(component.PYIRComponent):
+    __slots__ = ("_type_name",)
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def __init__(self, type_name: str):
         self._type_name = type_name
 
@@ -14,12 +14,31 @@ class IRType(component.PYIRComponent):
         return self._type_name
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, IRType):
             return False
         return self._type_name == other._type_name
 
     def __hash__(self):
         return hash(self._type_name)
+
+    def __reduce__(self):
+        # unpickled types are interned again
+        return (get_type, (self._type_name,))
+
+
+_TYPES = {}
+
+
+def get_type(type_name: str) -> IRType:
+    """Interned IRType: one shared instance per type name, so that
+        comparing types is an identity check
+    """
+    interned = _TYPES.get(type_name)
+    if interned is None:
+        interned = _TYPES[type_name] = IRType(type_name)
+    return interned
 """
 class IRTypeInferencer(component.PYIRComponent):
     TYPE_MAP = {
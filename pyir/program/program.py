@@ -1,50 +1,115 @@
 #!/usr/bin/env python3
 
 import logging
-import typeguard
 from typing import Optional
 
-from pyir import component
-from pyir.program import instruction, use, ir_type, hierarchical
+from pyir import component, typecheck
+from pyir.program import (
+    columnar, def_use, instruction, use, ir_type, hierarchical
+)
 from pyir.utils import array
 
+# operators that end a basic block
+TERMINATORS = frozenset(("jmp", "br", "ret"))
+
 
 class BasicBlock(hierarchical.Hierarchical):
-    def __init__(self, label=None):
+    __slots__ = ("_label",)
+
+    def __init__(self, label=None, columnar_storage=False):
+        children_impl = None
+        if columnar_storage:
+            children_impl = columnar.ColumnarHierarchicalImpl(
+                instruction.Instruction)
         super().__init__(
             label,
-            ir_type.IRType("basic-block"),
-            instruction.Instruction
+            ir_type.get_type("basic-block"),
+            instruction.Instruction,
+            children_impl
         )
+        if columnar_storage:
+            children_impl.set_owner(self)
         self._label = label
 
     def get_instructions(self):
         return self.get_children()
 
+    def iter_instructions(self):
+        return self.iter_children()
+
+    def is_columnar(self) -> bool:
+        return isinstance(
+            self._children_impl,
+            columnar.ColumnarHierarchicalImpl
+        )
+
+    def get_used_names(self) -> set:
+        """Names of the identifiers read by the instructions"""
+        if self.is_columnar():
+            return self._children_impl.get_columns().used_names()
+
+        used = set()
+        for instr in self.iter_instructions():
+            for operand_id in range(instr.get_num_operands()):
+                operand = instr.get_operand(operand_id)
+                if isinstance(operand, use.Identifier):
+                    used.add(operand.get_value())
+        return used
+
     def is_empty(self):
         return self.has_no_child()
 
-    @typeguard.typechecked
+    def reclaim_storage(self):
+        """Reuse the storage of the removed instructions; the caller
+            holds none of them any more
+        """
+        self._children_impl.reclaim()
+
+    @typecheck.typechecked
     def set_label(self, label: str):
         self._label = label
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def get_label(self) -> Optional[str]:
         return self._label
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def add_instruction(self, instr: instruction.Instruction):
         self.add_child(instr)
 
+    def _get_def_use(self):
+        func = self._parent
+        if func is None:
+            return None
+        return func._def_use
+
+    def _on_child_added(self, element):
+        chains = self._get_def_use()
+        if chains is not None:
+            chains.add_instruction(self._children_impl.get_handle(
+                element._key_in_parent, element))
+
+    def _on_child_removed(self, element):
+        chains = self._get_def_use()
+        if chains is not None:
+            chains.remove_instruction(self._children_impl.get_handle(
+                element._key_in_parent, element))
+
 
 class Function(hierarchical.Hierarchical):
+    __slots__ = ("_arguments", "_instructions_cache", "_def_use")
+
     def __init__(self, name):
         super().__init__(
             name,
-            ir_type.IRType("function"),
+            ir_type.get_type("function"),
             BasicBlock
         )
         self._arguments = []
+        # (own version, versions of the blocks, instructions)
+        self._instructions_cache = None
+        # built on the first query, maintained incrementally afterwards
+        self._def_use = None
 
     def get_arguments(self):
         return self._arguments
@@ -52,36 +117,90 @@ class Function(hierarchical.Hierarchical):
     def get_basic_blocks(self):
         return self.get_children()
 
-    def get_instructions(self) -> list[instruction.Instruction]:
+    def iter_basic_blocks(self):
+        return self.iter_children()
+
+    def get_instructions(self) -> tuple:
         """A handy function that allows user to get all instrucitons in
-            a list
+            a tuple; the snapshot is reused until some block changes
         """
-        instrs = []
-        for block in self.get_children():
-            for instr in block.get_children():
-                instrs.append(instr)
+        cache = self._instructions_cache
+        if cache is not None and cache[0] == self.get_version():
+            versions = cache[1]
+            for i, block in enumerate(self.get_children()):
+                if block.get_version() != versions[i]:
+                    break
+            else:
+                return cache[2]
+
+        blocks = self.get_children()
+        instrs = tuple(self.iter_instructions())
+        versions = [block.get_version() for block in blocks]
+        self._instructions_cache = (self.get_version(), versions, instrs)
         return instrs
 
-    @typeguard.typechecked
+    def iter_instructions(self):
+        """Lazy iteration over the instructions of every block"""
+        for block in self.iter_children():
+            yield from block.iter_children()
+
+    def get_used_names(self) -> set:
+        """Names of the identifiers read anywhere in the function"""
+        used = set()
+        for block in self.iter_children():
+            used |= block.get_used_names()
+        return used
+
+    def get_def_use(self) -> def_use.DefUseChains:
+        """Def-use chains of the function. They are built once, then kept
+            up to date by every instruction added, removed or renamed
+        """
+        if self._def_use is None:
+            chains = def_use.DefUseChains()
+            for instr in self.iter_instructions():
+                chains.add_instruction(instr)
+            self._def_use = chains
+        return self._def_use
+
+    def _on_child_added(self, element):
+        if self._def_use is not None:
+            for instr in element.iter_instructions():
+                self._def_use.add_instruction(instr)
+
+    def _on_child_removed(self, element):
+        if self._def_use is not None:
+            for instr in element.iter_instructions():
+                self._def_use.remove_instruction(instr)
+
+    def reclaim_storage(self):
+        for block in self.iter_children():
+            block.reclaim_storage()
+
+    @typecheck.typechecked
     def add_argument(self, arg: use.Identifier):
         self._arguments.append(arg)
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def add_basic_block(self, block: BasicBlock):
         self.add_child(block)
 
 
 class Module(hierarchical.Hierarchical):
+    __slots__ = ()
+
     def __init__(self, name=None):
         super().__init__(
             name,
-            ir_type.IRType("module"),
+            ir_type.get_type("module"),
             Function
         )
 
     def get_functions(self):
         return self.get_children()
 
-    @typeguard.typechecked
+    def iter_functions(self):
+        return self.iter_children()
+
+    @typecheck.typechecked
     def add_function(self, func: Function):
         self.add_child(func)
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
 
-import typeguard
+import sys
 
-from pyir import component
+from pyir import component, typecheck
 from pyir.program import ir_type
 
 class Use(component.PYIRComponent):
+    __slots__ = ("_value", "_type")
+
     def __init__(self, value, use_type):
         self._value = value
         self._type = use_type
@@ -21,6 +23,8 @@ class Use(component.PYIRComponent):
 
 
 class Primitive(Use):
+    __slots__ = ()
+
     def __eq__(self, other):
         if not isinstance(other, Primitive):
             return False
@@ -33,13 +37,25 @@ class Primitive(Use):
         return hash(self.__repr__())
 
 class Identifier(Use):
+    # _chains: the def-use chains indexing this identifier, if any
+    __slots__ = ("_chains",)
+
+    def __init__(self, value, use_type):
+        if isinstance(value, str):
+            value = sys.intern(value)
+        super().__init__(value, use_type)
+        self._chains = None
+
     def rename_as(self, new_name):
         if not isinstance(new_name, Identifier):
             raise TypeError
         new_name_str = new_name.get_value()
         if not isinstance(new_name_str, str):
             raise TypeError
-        self._value = new_name_str
+        old_name = self._value
+        self._value = sys.intern(new_name_str)
+        if self._chains is not None:
+            self._chains.rename(self, old_name, self._value)
 
     def __eq__(self, other):
         if not isinstance(other, Identifier):
@@ -50,7 +66,9 @@ class Identifier(Use):
         return hash(self._value)
 
 class Operator(component.PYIRComponent):
-    @typeguard.typechecked
+    __slots__ = ("_name",)
+
+    @typecheck.typechecked
     def __init__(self, name: str):
         super().__init__()
         self._name = name
@@ -59,6 +77,8 @@ class Operator(component.PYIRComponent):
         return self._name
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Operator):
             return False
         return self._name == other._name
@@ -68,3 +88,18 @@ class Operator(component.PYIRComponent):
 
     def __repr__(self):
         return self._name
+
+    def __reduce__(self):
+        # unpickled operators are interned again
+        return (get_operator, (self._name,))
+
+
+_OPERATORS = {}
+
+
+def get_operator(name: str) -> Operator:
+    """Interned Operator: one shared instance per operator name"""
+    interned = _OPERATORS.get(name)
+    if interned is None:
+        interned = _OPERATORS[name] = Operator(name)
+    return interned
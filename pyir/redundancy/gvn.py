@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+from pyir import instrumentation, ir_pass, trace
+from pyir.analysis import cfg, dominance
+from pyir.program import program, use
+from pyir.redundancy.numbering import table, extension
+from pyir.ssa import construction
+
+
+class GlobalValueNumberingRaw(ir_pass.CompilerPass):
+    """Value numbering over the dominator tree: LVN's table, numbering
+        and extensions, but a block starts from the values of the blocks
+        dominating it instead of an empty table (Briggs, Cooper and
+        Simpson's dominator-based value numbering). Knowledge flows
+        through names assigned once by an instruction dominating all
+        their uses, which is every name in SSA form; the other names
+        stay local to their block as in LVN
+    """
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    REQUIRED_ANALYSES = (
+        cfg.ControlFlowGraphAnalysis,
+        dominance.DominatorTreeAnalysis,
+    )
+    # jmp and br are left in place
+    PRESERVED_ANALYSES = (
+        cfg.ControlFlowGraphAnalysis,
+        dominance.DominatorTreeAnalysis,
+    )
+
+    def get_extensions(self) -> list:
+        return [extension.CommutativityExtension()]
+
+    def global_optimize(self, func: program.Function) -> bool:
+        tree = self.get_analysis(dominance.DominatorTreeAnalysis, func)
+        graph = tree.get_cfg()
+        if graph.get_num_blocks() == 0:
+            return False
+        local_names = find_local_names(func, graph, tree)
+        gvn_table = table.ScopedNumberingTable(
+            lambda name: name not in local_names)
+        gvn_table.add_extensions(*self.get_extensions())
+
+        # entries (block index, False when entering, True when leaving)
+        walk = [(0, False)]
+        while walk:
+            index, leaving = walk.pop()
+            if leaving:
+                gvn_table.leave_block()
+                continue
+            block = graph.get_block(index)
+            gvn_table.enter_block(block)
+            for instr in block.iter_instructions():
+                gvn_encoding = gvn_table.add_entry(instr)
+                if gvn_encoding is None:
+                    continue
+                new_instr = gvn_table.reconstruct(gvn_encoding)
+                instr.insert_next(new_instr)
+                instr.remove_from_parent()
+            gvn_table.seal_block()
+            walk.append((index, True))
+            walk.extend((child, False)
+                        for child in reversed(tree.get_children(index)))
+
+        instrumentation.count("values numbered", gvn_table.get_num_entries())
+        if trace.is_enabled(trace.LVN_TABLE):
+            trace.emit(trace.LVN_TABLE, gvn_table.format_table())
+        return True
+
+
+class GlobalValueNumbering(GlobalValueNumberingRaw):
+    def get_extensions(self) -> list:
+        return [
+            extension.CommutativityExtension(),
+            extension.CopyPropagationExtension(),
+        ]
+
+
+class GlobalValueNumberingConstantFold(GlobalValueNumberingRaw):
+    def get_extensions(self) -> list:
+        return [extension.ConstantFoldExtension()]
+
+
+def find_local_names(func, graph, tree) -> set:
+    """Names that may hold different values in a block and in a block it
+        dominates: assigned more than once, or used where their only
+        assignment does not dominate the use. Arguments are assigned at
+        the entry; the operands of a phi are used at the end of the
+        predecessor they come from
+    """
+    # name -> (block index, position), None once assigned twice
+    assignments = {arg.get_value(): (0, -1) for arg in func.get_arguments()}
+    uses = []
+    for index, block in enumerate(graph.get_blocks()):
+        for position, instr in enumerate(block.iter_instructions()):
+            is_phi = instr.get_operator() is construction.PHI
+            for operand_id in range(instr.get_num_operands()):
+                operand = instr.get_operand(operand_id)
+                if not isinstance(operand, use.Identifier):
+                    continue
+                if is_phi:
+                    predecessor = graph.get_index_of_label(
+                        instr.get_label(operand_id).get_value())
+                    uses.append((operand.get_value(), predecessor, None))
+                else:
+                    uses.append((operand.get_value(), index, position))
+            destination = instr.get_destination()
+            if destination is not None:
+                name = destination.get_value()
+                if name in assignments:
+                    assignments[name] = None
+                else:
+                    assignments[name] = (index, position)
+
+    local_names = {name for name, site in assignments.items() if site is None}
+    for name, index, position in uses:
+        site = assignments.get(name)
+        if site is None:
+            # assigned twice, or never: an undefined value
+            continue
+        def_index, def_position = site
+        if def_index == index:
+            # at the end of the block when position is None
+            if position is not None and def_position >= position:
+                local_names.add(name)
+        elif not tree.dominates(def_index, index):
+            local_names.add(name)
+    return local_names
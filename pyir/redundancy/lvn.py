@@ -1,10 +1,16 @@
 #!/usr/bin/env python3
 
-from pyir import ir_pass
+from pyir import instrumentation, ir_pass, trace
+from pyir.analysis import cfg
 from pyir.program import program
 from pyir.redundancy.numbering import table, extension
 
 class LocalValueNumberingRaw(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.LOCAL_OPTIMIZATION
+    # jmp and br are left in place
+    PRESERVED_ANALYSES = (cfg.ControlFlowGraphAnalysis,)
+    MEMOIZABLE = True
+
     def local_optimize(self, block: program.BasicBlock):
         # initialize
         lvn_table = table.LocalNumberingTable(block)
@@ -12,7 +18,7 @@ class LocalValueNumberingRaw(ir_pass.CompilerPass):
             extension.CommutativityExtension(),
         )
 
-        for instr in block.get_instructions():
+        for instr in block.iter_instructions():
             lvn_encoding = lvn_table.add_entry(instr)
             if lvn_encoding is None:
                 continue
@@ -20,11 +26,18 @@ class LocalValueNumberingRaw(ir_pass.CompilerPass):
             instr.insert_next(new_instr)
             instr.remove_from_parent()
 
-        lvn_table.show_table("tmp_table.txt")
+        instrumentation.count("values numbered", lvn_table.get_num_entries())
+        if trace.is_enabled(trace.LVN_TABLE):
+            trace.emit(trace.LVN_TABLE, lvn_table.format_table())
         return True
 
 
 class LocalValueNumbering(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.LOCAL_OPTIMIZATION
+    # jmp and br are left in place
+    PRESERVED_ANALYSES = (cfg.ControlFlowGraphAnalysis,)
+    MEMOIZABLE = True
+
     def local_optimize(self, block: program.BasicBlock):
         # init
         lvn_table = table.LocalNumberingTable(block)
@@ -33,7 +46,7 @@ class LocalValueNumbering(ir_pass.CompilerPass):
             extension.CopyPropagationExtension(),
         )
 
-        for instr in block.get_instructions():
+        for instr in block.iter_instructions():
             lvn_encoding = lvn_table.add_entry(instr)
             if lvn_encoding is None:
                 continue
@@ -41,11 +54,18 @@ class LocalValueNumbering(ir_pass.CompilerPass):
             instr.insert_next(new_instr)
             instr.remove_from_parent()
 
-        lvn_table.show_table("tmp_table.txt")
+        instrumentation.count("values numbered", lvn_table.get_num_entries())
+        if trace.is_enabled(trace.LVN_TABLE):
+            trace.emit(trace.LVN_TABLE, lvn_table.format_table())
         return True
 
 
 class LocalValueNumberingConstantFold(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.LOCAL_OPTIMIZATION
+    # jmp and br are left in place
+    PRESERVED_ANALYSES = (cfg.ControlFlowGraphAnalysis,)
+    MEMOIZABLE = True
+
     def local_optimize(self, block: program.BasicBlock):
         # init
         lvn_table = table.LocalNumberingTable(block)
@@ -53,7 +73,7 @@ class LocalValueNumberingConstantFold(ir_pass.CompilerPass):
             extension.ConstantFoldExtension(),
         )
 
-        for instr in block.get_instructions():
+        for instr in block.iter_instructions():
             lvn_encoding = lvn_table.add_entry(instr)
             if lvn_encoding is None:
                 continue
@@ -61,5 +81,7 @@ class LocalValueNumberingConstantFold(ir_pass.CompilerPass):
             instr.insert_next(new_instr)
             instr.remove_from_parent()
 
-        lvn_table.show_table("tmp_table.txt")
+        instrumentation.count("values numbered", lvn_table.get_num_entries())
+        if trace.is_enabled(trace.LVN_TABLE):
+            trace.emit(trace.LVN_TABLE, lvn_table.format_table())
         return True
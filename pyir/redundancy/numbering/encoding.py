@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
-import typeguard
-
+from pyir import typecheck
 from pyir.program import use, ir_type
 
+# interned types used by the numbering table
+NUMBER_TYPE = ir_type.get_type("numbering-number")
+NULL_TYPE = ir_type.get_type("null")
 
 class NumberingEncoding:
     """My encoding scheme is simple:
@@ -14,11 +16,22 @@ class NumberingEncoding:
 
 
 class NumberingValue:
+    """The key of the numbering table. Values are compared through a flat
+        tuple (operator, tag0, value0, tag1, value1, ...) of interned
+        objects: the tag is NUMBER_TYPE for a reference to a table entry
+        and the Python type of the value otherwise, so that 1 and True stay
+        apart as they did in the textual form. The key and its hash are
+        computed once and dropped when the value is modified.
+    """
+    __slots__ = ("_operator", "_operands", "_key", "_hash")
+
     def __init__(self, operator, operands=None):
         self._operator = operator
         if operands is None:
             operands = []
         self._operands = operands
+        self._key = None
+        self._hash = None
 
     def get_operator(self):
         return self._operator
@@ -31,27 +44,47 @@ class NumberingValue:
 
     def set_operator(self, new_operator):
         self._operator = new_operator
+        self._key = None
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def add_operand(self, operand: use.Use):
         self._operands.append(operand)
+        self._key = None
+
+    def get_key(self) -> tuple:
+        key = self._key
+        if key is None:
+            key = [self._operator]
+            for operand in self._operands:
+                value = operand.get_value()
+                if operand.get_type() is NUMBER_TYPE:
+                    # numbering-number: refer to some entries in the table
+                    key.append(NUMBER_TYPE)
+                else:
+                    # others: could be use.Primitive or use.Identfier
+                    key.append(type(value))
+                key.append(value)
+            key = self._key = tuple(key)
+            self._hash = hash(key)
+        return key
 
     def __repr__(self):
         curr_repr = [self._operator.get_name()]
         for operand in self._operands:
-            if operand.get_type() == ir_type.IRType("numbering-number"):
-                # numbering-number: refer to some entries in the table
+            if operand.get_type() is NUMBER_TYPE:
                 curr_repr.append(f"#{str(operand.get_value())}")
             else:
-                # others: could be use.Primitive or use.Identfier
                 curr_repr.append(str(operand.get_value()))
 
         return ",".join(curr_repr)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, NumberingValue):
             return False
-        return self.__repr__() == other.__repr__()
+        return self.get_key() == other.get_key()
 
     def __hash__(self):
-        return hash(self.__repr__())
+        self.get_key()
+        return self._hash
@@ -2,9 +2,12 @@
 
 import enum
 
-from pyir.program import use, ir_type
+from pyir import instrumentation
+from pyir.program import use
 from pyir.redundancy.numbering import encoding
 
+ID_OPERATOR = use.get_operator("id")
+CONST_OPERATOR = use.get_operator("const")
 
 class NumberingUndefined:
     def __init__(self, name):
@@ -32,14 +35,12 @@ class NumberingExtension(object):
 
 
 class CommutativityExtension(NumberingExtension):
-    def __init__(self):
-        self.COMMUTATIVITY_OPERATIONS = set([
-            use.Operator("add"),
-            use.Operator("sub"),
-            use.Operator("mul"),
-            use.Operator("and"),
-            use.Operator("or"),
-        ])
+    COMMUTATIVITY_OPERATIONS = set([
+        use.get_operator("add"),
+        use.get_operator("mul"),
+        use.get_operator("and"),
+        use.get_operator("or"),
+    ])
 
     def update_value(self, value, table):
         if value.get_operator() not in self.COMMUTATIVITY_OPERATIONS:
@@ -73,15 +74,15 @@ class CopyPropagationExtension(NumberingExtension):
         pass
 
     def update_value(self, value, table):
-        if value.get_operator() != use.Operator("id"):
+        if value.get_operator() is not ID_OPERATOR:
             return value
 
         operand = value.get_operand(0)
-        if operand.get_type() != ir_type.IRType("numbering-number"):
+        if operand.get_type() is not encoding.NUMBER_TYPE:
             return value
 
         referred_entry = table.get_entry_by_number(operand)
-        if referred_entry.value.get_operator() != use.Operator("id"):
+        if referred_entry.value.get_operator() is not ID_OPERATOR:
             return value
 
         return encoding.NumberingValue(
@@ -100,59 +101,59 @@ class CopyPropagationExtension(NumberingExtension):
         if entry.variable == identifier:
             return None
 
-        if entry.value.get_operator() != use.Operator("id"):
+        if entry.value.get_operator() is not ID_OPERATOR:
             return None
 
         reference = entry.value.get_operand(0)
-        if reference.get_type() == ir_type.IRType("numbering-number"):
+        if reference.get_type() is encoding.NUMBER_TYPE:
             referred_entry = table.get_entry_by_number(reference)
             reference = referred_entry.variable
 
         return encoding.NumberingValue(
-            use.Operator("id"),
+            ID_OPERATOR,
             [reference]
         )
 
 class ConstantFoldExtension(NumberingExtension):
+    EQUATIONS = {
+        use.get_operator("add"): lambda x: x[0] + x[1],
+        use.get_operator("sub"): lambda x: x[0] - x[1],
+        use.get_operator("mul"): lambda x: x[0] * x[1],
+        use.get_operator("div"): lambda x: x[0] // x[1],
+        use.get_operator("and"): lambda x: x[0] and x[1],
+        use.get_operator("or"): lambda x: x[0] or x[1],
+        use.get_operator("not"): lambda x: not x[0],
+        use.get_operator("eq"): lambda x: x[0] == x[1],
+        use.get_operator("ge"): lambda x: x[0] >= x[1],
+        use.get_operator("gt"): lambda x: x[0] > x[1],
+        use.get_operator("le"): lambda x: x[0] <= x[1],
+        use.get_operator("lt"): lambda x: x[0] < x[1],
+    }
+
+    PRESUMABLES = {
+        use.get_operator("div"): (lambda x: x[1] == 0, None),
+        use.get_operator("and"): (lambda x: x[0] is False or x[1] is False, False),
+        use.get_operator("or"): (lambda x: x[0] is True or x[1] is True, True),
+        use.get_operator("eq"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
+        use.get_operator("ge"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
+        use.get_operator("le"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
+    }
+
     def __init__(self):
         # NumberingTableEntry: Primitive
         self._constant_map = {}
-        self.EQUATIONS = {
-            use.Operator("add"): lambda x: x[0] + x[1],
-            use.Operator("sub"): lambda x: x[0] - x[1],
-            use.Operator("mul"): lambda x: x[0] * x[1],
-            use.Operator("div"): lambda x: x[0] // x[1],
-            use.Operator("and"): lambda x: x[0] and x[1],
-            use.Operator("or"): lambda x: x[0] or x[1],
-            use.Operator("not"): lambda x: not x[0],
-            use.Operator("eq"): lambda x: x[0] == x[1],
-            use.Operator("ge"): lambda x: x[0] >= x[1],
-            use.Operator("gt"): lambda x: x[0] > x[1],
-            use.Operator("le"): lambda x: x[0] <= x[1],
-            use.Operator("lt"): lambda x: x[0] < x[1],
-        }
-
-        self.PRESUMABLES = {
-            use.Operator("div"): (lambda x: x[1] == 0, None),
-            use.Operator("and"): (lambda x: x[0] is False or x[1] is False, False),
-            use.Operator("or"): (lambda x: x[0] is True or x[1] is True, True),
-            use.Operator("eq"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
-            use.Operator("ge"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
-            use.Operator("le"): (lambda x: isinstance(x[0], NumberingUndefined) and isinstance(x[1], NumberingUndefined) and x[0] == x[1], True),
-        }
 
     def _eval(self, identifier, value, table) -> use.Primitive:
         operator = value.get_operator()
         if operator not in self.EQUATIONS:
             return None
 
-        equation = self.EQUATIONS[operator]
         use_type = identifier.get_type()
 
         raw_operands = []
         for operand_i in range(value.get_num_operands()):
             operand = value.get_operand(operand_i)
-            if operand.get_type() != ir_type.IRType("numbering-number"):
+            if operand.get_type() is not encoding.NUMBER_TYPE:
                 # None indicates variable in the equation
                 raw_operands.append(NumberingUndefined(operand.get_value()))
                 continue
@@ -166,29 +167,38 @@ class ConstantFoldExtension(NumberingExtension):
             raw_primitive = const_primitive.get_value()
             raw_operands.append(raw_primitive)
 
+        raw_result = self.evaluate(operator, tuple(raw_operands))
+        if raw_result is None:
+            return None
+        if use_type is None:
+            raise TypeError
+        return use.Primitive(raw_result, use_type)
 
-        if operator in self.PRESUMABLES:
-            condition, result = self.PRESUMABLES[operator]
-            if condition(tuple(raw_operands)):
-                return use.Primitive(result, use_type)
+    @classmethod
+    def evaluate(cls, operator, raw_operands: tuple):
+        """The result of operator on raw values, NumberingUndefined for
+            operands not known to be constant. None when the result is
+            not a constant: it depends on an unknown operand, or the
+            instruction traps like a division by zero
+        """
+        if operator in cls.PRESUMABLES:
+            condition, result = cls.PRESUMABLES[operator]
+            if condition(raw_operands):
+                return result
 
         for raw_operand in raw_operands:
             if isinstance(raw_operand, NumberingUndefined):
                 return None
-
-        raw_result = equation(tuple(raw_operands))
-        if use_type is None:
-            raise TypeError
-        return use.Primitive(raw_result, use_type)
+        return cls.EQUATIONS[operator](raw_operands)
 
     def update_table(self, entry, table):
         value = entry.value
-        if value.get_operator() == use.Operator("const"):
+        if value.get_operator() is CONST_OPERATOR:
             self._constant_map[entry] = value.get_operand(0)
             return True
-        elif value.get_operator() == use.Operator("id"):
+        elif value.get_operator() is ID_OPERATOR:
             reference = value.get_operand(0)
-            if reference.get_type() == ir_type.IRType("numbering-number"):
+            if reference.get_type() is not encoding.NUMBER_TYPE:
                 return False
             referred_entry = table.get_entry_by_number(reference)
             if referred_entry not in self._constant_map:
@@ -200,6 +210,7 @@ class ConstantFoldExtension(NumberingExtension):
         if result is None:
             return False
         self._constant_map[entry] = result
+        instrumentation.count("constants folded")
         return True
 
     def get_propagated_value(self, identifier, entry, table):
@@ -207,6 +218,6 @@ class ConstantFoldExtension(NumberingExtension):
             return None
 
         return encoding.NumberingValue(
-            use.Operator("const"),
+            CONST_OPERATOR,
             [self._constant_map[entry]]
         )
@@ -1,15 +1,17 @@
 #!/usr/bin/env python3
 
 import copy
-import typeguard
 from typing import Optional
 
-from pyir import component
+from pyir import component, typecheck
 from pyir.program import use, instruction, ir_type, ir_builder, program
+from pyir.utils import scoped_dict
 from pyir.redundancy.numbering import encoding, extension
 
 class NumberingTableEntry:
-    @typeguard.typechecked
+    __slots__ = ("value", "number", "variable")
+
+    @typecheck.typechecked
     def __init__(
         self,
         number: use.Identifier,
@@ -23,13 +25,17 @@ class NumberingTableEntry:
 
 class LocalNumberingTable(component.PYIRComponent):
     def __init__(
-        self, block: program.BasicBlock):
+        self, block: Optional[program.BasicBlock]):
         self._entries = []
         self._value_to_entry = {}
+        # keyed by identifier value: interned names for variables, ints
+        #  for numbers. Identifiers compare by value only, and plain
+        #  keys skip their Python-level __hash__/__eq__
         self._id_to_entry = {}
         self._ir_builder = ir_builder.IRBuilder()
         self._extensions = []
-        self.initialize(block)
+        if block is not None:
+            self.initialize(block)
 
     def add_extensions(self, *new_extensions):
         for new_extension in new_extensions:
@@ -37,17 +43,19 @@ class LocalNumberingTable(component.PYIRComponent):
 
     def initialize(self, block):
         self.last_write = {}
-        for instr in block.get_instructions():
+        for instr in block.iter_instructions():
             destination = instr.get_destination()
             if destination is None:
                 continue
-            self.last_write[destination] = instr
+            self.last_write[destination.get_value()] = instr
 
     def add_entry(self, instr: instruction.Instruction) -> Optional[encoding.NumberingEncoding]:
 
         # An instruction must have some operator
         operator = instr.get_operator()
-        if operator.get_name() in ["jmp", "br"]:
+        # a phi depends on the incoming edge: like an argument, its value
+        #  is unknown to the block
+        if operator.get_name() in ["jmp", "br", "phi"]:
             return None
 
         #
@@ -55,15 +63,18 @@ class LocalNumberingTable(component.PYIRComponent):
         if variable is None:
             variable = self._rename_with_number(
                 len(self._entries),
-                ir_type.IRType("null")
+                encoding.NULL_TYPE
             )
 
         # Construct numbering value
         numbering_value = encoding.NumberingValue(operator)
         for operand_i in range(instr.get_num_operands()):
             operand = instr.get_operand(operand_i)
-            if operand in self._id_to_entry:
-                refer_number = self._id_to_entry[operand].number
+            referred_entry = None
+            if isinstance(operand, use.Identifier):
+                referred_entry = self._id_to_entry.get(operand.get_value())
+            if referred_entry is not None:
+                refer_number = referred_entry.number
                 numbering_value.add_operand(refer_number)
             else:
                 numbering_value.add_operand(operand)
@@ -72,15 +83,18 @@ class LocalNumberingTable(component.PYIRComponent):
         for extension in self._extensions:
             numbering_value = extension.update_value(numbering_value, self)
 
-        # The value has been used before:
-        if numbering_value in self._value_to_entry:
-            self._id_to_entry[variable] = \
-                self._value_to_entry[numbering_value]
+        # The value has been used before; an effect (print) without a
+        #  destination happens again each time
+        known_entry = None
+        if instr.get_destination() is not None:
+            known_entry = self._value_to_entry.get(numbering_value)
+        if known_entry is not None:
+            self._id_to_entry[variable.get_value()] = known_entry
             return encoding.NumberingEncoding(variable)
 
         new_number = use.Identifier(
             len(self._entries),
-            ir_type.IRType("numbering-number")
+            encoding.NUMBER_TYPE
         )
 
         new_entry = NumberingTableEntry(
@@ -89,18 +103,18 @@ class LocalNumberingTable(component.PYIRComponent):
             variable
         )
 
-        if (variable in self.last_write and
-            self.last_write[variable] != instr):
+        last_instr = self.last_write.get(variable.get_value())
+        if last_instr is not None and last_instr != instr:
             new_entry.variable = self._rename_with_number(
                 len(self._entries),
                 variable.get_type()
             )
-            self._id_to_entry[new_entry.variable] = new_entry
+            self._id_to_entry[new_entry.variable.get_value()] = new_entry
             # Note that we do not cancel the outdated varaiable
 
         self._entries.append(new_entry)
-        self._id_to_entry[new_number] = new_entry
-        self._id_to_entry[variable] = new_entry
+        self._id_to_entry[new_number.get_value()] = new_entry
+        self._id_to_entry[variable.get_value()] = new_entry
         self._value_to_entry[numbering_value] = new_entry
 
         # 2nd point of running extension:
@@ -114,13 +128,13 @@ class LocalNumberingTable(component.PYIRComponent):
         enc: encoding.NumberingEncoding
     ) -> instruction.Instruction:
         identifier = enc.identifier
-        entry = self._id_to_entry[identifier]
+        entry = self._id_to_entry[identifier.get_value()]
 
         operands = []
         for operand_i in range(entry.value.get_num_operands()):
             operand = entry.value.get_operand(operand_i)
-            if operand.get_type() == ir_type.IRType("numbering-number"):
-                referred_entry = self._id_to_entry[operand]
+            if operand.get_type() is encoding.NUMBER_TYPE:
+                referred_entry = self._id_to_entry[operand.get_value()]
                 operand = referred_entry.variable
             operands.append(operand)
 
@@ -138,11 +152,11 @@ class LocalNumberingTable(component.PYIRComponent):
             new_operands = [new_value.get_operand(i) \
                             for i in range(new_value.get_num_operands())]
 
-            if identifier.get_type() == ir_type.IRType("numbering-number"):
+            if identifier.get_type() is encoding.NUMBER_TYPE:
                 destination = entry.variable
             else:
                 destination = identifier
-            if destination.get_type() == ir_type.IRType("null"):
+            if destination.get_type() is encoding.NULL_TYPE:
                 destination = None
             return self._ir_builder.build(
                 operator=new_value.get_operator(),
@@ -151,8 +165,8 @@ class LocalNumberingTable(component.PYIRComponent):
                 labels=[]
             )
 
-        if identifier.get_type() == ir_type.IRType("numbering-number"):
-            if entry.variable.get_type() == ir_type.IRType("null"):
+        if identifier.get_type() is encoding.NUMBER_TYPE:
+            if entry.variable.get_type() is encoding.NULL_TYPE:
                 destination = None
             else:
                 destination = entry.variable
@@ -166,32 +180,34 @@ class LocalNumberingTable(component.PYIRComponent):
 
 
         return self._ir_builder.build(
-            operator=use.Operator("id"),
+            operator=use.get_operator("id"),
             destination=identifier,
             operands=[entry.variable],
             labels=[]
         )
 
-    def show_table(self, file_name="tmp_table.txt"):
+    def format_table(self) -> str:
         row = lambda a,b,c: f"| {a.rjust(15)}| {b.rjust(25)}| {c.rjust(15)}|\n"
-        header = "-" * 64 + "\n"
-        header += row("#", "Value", "Variable")
-        header += "-" * 64 + "\n"
-        body = ""
+        rule = "-" * 64 + "\n"
+        lines = [rule, row("#", "Value", "Variable"), rule]
         for entry in self._entries:
             n = str(entry.number.get_value())
             val = str(entry.value)
             var = str(entry.variable.get_value())
-            body += row(n, val, var)
+            lines.append(row(n, val, var))
+        return "".join(lines)
 
+    def show_table(self, file_name="tmp_table.txt"):
         with open(file_name, "a") as f:
-            f.write(header + body)
-            f.close()
+            f.write(self.format_table())
+
+    def get_num_entries(self) -> int:
+        return len(self._entries)
 
     def get_entry_by_number(self, number: use.Identifier) -> NumberingTableEntry:
-        if number.get_type() != ir_type.IRType("numbering-number"):
+        if number.get_type() is not encoding.NUMBER_TYPE:
             raise TypeError
-        return self._id_to_entry[number]
+        return self._id_to_entry[number.get_value()]
 
     def _rename_with_number(self,
         number: int,
@@ -202,3 +218,71 @@ class LocalNumberingTable(component.PYIRComponent):
             use_type
         )
 
+
+
+class ScopedNumberingTable(LocalNumberingTable):
+    """The numbering table of a walk of the dominator tree: a block sees
+        the values numbered in the blocks dominating it. enter_block()
+        opens the block's scope, leave_block() closes it once the blocks
+        it dominates are done. A name is only known past its block when
+        is_global(name) holds, i.e. nothing can assign it again between
+        there and the dominated blocks. Entry numbers, and so the lvn.N
+        names, never repeat within the function
+    """
+    def __init__(self, is_global):
+        super().__init__(None)
+        self._value_to_entry = scoped_dict.ScopedDict()
+        self._id_to_entry = scoped_dict.ScopedDict()
+        self._is_global = is_global
+        # entry number -> whether the entry may outlive its block
+        self._portable = {}
+
+    def enter_block(self, block: program.BasicBlock):
+        self._value_to_entry.push_scope()
+        self._id_to_entry.push_scope()
+        self.initialize(block)
+
+    def seal_block(self):
+        """Forget what only holds inside the current block, before the
+            blocks it dominates are numbered
+        """
+        for key in self._id_to_entry.get_scope_keys():
+            entry = self._id_to_entry.get(key)
+            if entry is None:
+                continue
+            if not self._is_portable(entry) or \
+                    (isinstance(key, str) and not self._is_global(key)):
+                del self._id_to_entry[key]
+        for value in self._value_to_entry.get_scope_keys():
+            entry = self._value_to_entry.get(value)
+            if entry is not None and not self._is_portable(entry):
+                del self._value_to_entry[value]
+
+    def leave_block(self):
+        self._value_to_entry.pop_scope()
+        self._id_to_entry.pop_scope()
+
+    def _is_portable(self, entry) -> bool:
+        """The entry's variable holds its value in the dominated blocks,
+            and so do the names and entries its value refers to
+        """
+        number = entry.number.get_value()
+        portable = self._portable.get(number)
+        if portable is not None:
+            return portable
+
+        portable = self._is_global(entry.variable.get_value())
+        for operand_i in range(entry.value.get_num_operands()):
+            if not portable:
+                break
+            operand = entry.value.get_operand(operand_i)
+            if not isinstance(operand, use.Identifier):
+                continue
+            if operand.get_type() is encoding.NUMBER_TYPE:
+                # entries refer to older entries only: no cycle
+                portable = self._is_portable(
+                    self._entries[operand.get_value()])
+            else:
+                portable = self._is_global(operand.get_value())
+        self._portable[number] = portable
+        return portable
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+from pyir import instrumentation, ir_pass
+from pyir.analysis import cfg, dataflow, def_use
+from pyir.program import ir_builder, program, use
+from pyir.redundancy.numbering import extension
+from pyir.ssa import construction
+
+CONST_OPERATOR = use.get_operator("const")
+ID_OPERATOR = use.get_operator("id")
+JMP_OPERATOR = use.get_operator("jmp")
+BR_OPERATOR = use.get_operator("br")
+
+
+class ConstantLattice:
+    """The value of every name found by sparse conditional constant
+        propagation (Wegman and Zadeck): absent while no executable
+        definition has been seen, a raw constant, or OVERDEFINED. Along
+        with the executable CFG edges, so branches on a constant only
+        make the taken edge executable. Values flow through the def-use
+        chains, which are the SSA edges in SSA form; outside it a name
+        assigned more than once is overdefined from the start, as are
+        the arguments
+    """
+    OVERDEFINED = dataflow.ConstantPropagation.UNKNOWN
+
+    def __init__(self, func: program.Function, graph: cfg.ControlFlowGraph,
+                 chains):
+        self._graph = graph
+        self._chains = chains
+        self._values = {arg.get_value(): self.OVERDEFINED
+                        for arg in func.get_arguments()}
+        for name in chains.get_names():
+            if len(chains.get_definitions(name)) > 1:
+                self._values[name] = self.OVERDEFINED
+        # (predecessor index, successor index)
+        self._executable_edges = set()
+        self._executable_blocks = set()
+        self._solve()
+
+    def get_value(self, name: str):
+        """A raw constant, OVERDEFINED, or None if no value reaches"""
+        return self._values.get(name)
+
+    def is_constant(self, name: str) -> bool:
+        value = self._values.get(name)
+        return value is not None and value is not self.OVERDEFINED
+
+    def is_executable(self, index: int) -> bool:
+        return index in self._executable_blocks
+
+    def is_executable_edge(self, predecessor: int, successor: int) -> bool:
+        return (predecessor, successor) in self._executable_edges
+
+    def _solve(self):
+        graph = self._graph
+        if graph.get_num_blocks() == 0:
+            return
+        # edges to follow, and instructions whose operands changed
+        flow_worklist = [(None, 0)]
+        ssa_worklist = []
+        while flow_worklist or ssa_worklist:
+            while flow_worklist:
+                predecessor, index = flow_worklist.pop()
+                if predecessor is not None:
+                    if (predecessor, index) in self._executable_edges:
+                        continue
+                    self._executable_edges.add((predecessor, index))
+                block = graph.get_block(index)
+                if index in self._executable_blocks:
+                    # a new edge only changes the phis
+                    for instr in block.iter_instructions():
+                        if instr.get_operator() is construction.PHI:
+                            self._visit(instr, index, flow_worklist,
+                                        ssa_worklist)
+                    continue
+                self._executable_blocks.add(index)
+                for instr in block.iter_instructions():
+                    self._visit(instr, index, flow_worklist, ssa_worklist)
+                last = block.get_instructions()[-1:]
+                if not last or last[0].get_operator() not in \
+                        (JMP_OPERATOR, BR_OPERATOR):
+                    flow_worklist.extend(
+                        (index, successor)
+                        for successor in graph.get_successors(index))
+
+            while ssa_worklist:
+                instr = ssa_worklist.pop()
+                index = graph.get_index(instr.get_parent())
+                if index in self._executable_blocks:
+                    self._visit(instr, index, flow_worklist, ssa_worklist)
+
+            if not flow_worklist:
+                # a br on a value never defined takes no edge; both are
+                #  kept so that the jumps stay valid
+                flow_worklist.extend(self._undecided_branches())
+
+    def _undecided_branches(self) -> list:
+        edges = []
+        for index in self._executable_blocks:
+            last = self._graph.get_block(index).get_instructions()[-1:]
+            if not last or last[0].get_operator() is not BR_OPERATOR:
+                continue
+            condition = last[0].get_operand(0)
+            if self._operand_value(condition) is None:
+                self._values[condition.get_value()] = self.OVERDEFINED
+                edges.extend((index, self._target(last[0], label_id))
+                             for label_id in range(2))
+        return edges
+
+    def _visit(self, instr, index, flow_worklist, ssa_worklist):
+        operator = instr.get_operator()
+        if operator is JMP_OPERATOR:
+            flow_worklist.append((index, self._target(instr, 0)))
+            return
+        if operator is BR_OPERATOR:
+            condition = self._operand_value(instr.get_operand(0))
+            if condition is self.OVERDEFINED:
+                flow_worklist.extend((index, self._target(instr, label_id))
+                                     for label_id in range(2))
+            elif condition is not None:
+                label_id = 0 if condition else 1
+                flow_worklist.append((index, self._target(instr, label_id)))
+            return
+
+        destination = instr.get_destination()
+        if destination is None:
+            return
+        name = destination.get_value()
+        old_value = self._values.get(name)
+        if old_value is self.OVERDEFINED:
+            return
+        new_value = self._meet(old_value, self._evaluate(instr, index))
+        if new_value is None or self._same(new_value, old_value):
+            return
+        self._values[name] = new_value
+        ssa_worklist.extend(self._chains.get_uses(name))
+
+    def _evaluate(self, instr, index):
+        operator = instr.get_operator()
+        if operator is CONST_OPERATOR:
+            return instr.get_operand(0).get_value()
+        if operator is ID_OPERATOR:
+            return self._operand_value(instr.get_operand(0))
+        if operator is construction.PHI:
+            value = None
+            for operand_id in range(instr.get_num_operands()):
+                predecessor = self._graph.get_index_of_label(
+                    instr.get_label(operand_id).get_value())
+                if (predecessor, index) in self._executable_edges:
+                    value = self._meet(value, self._operand_value(
+                        instr.get_operand(operand_id)))
+            return value
+        if operator not in extension.ConstantFoldExtension.EQUATIONS:
+            return self.OVERDEFINED
+
+        raw_operands = []
+        waiting = False
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            value = self._operand_value(operand)
+            if value is None or value is self.OVERDEFINED:
+                waiting |= value is None
+                value = extension.NumberingUndefined(operand.get_value())
+            raw_operands.append(value)
+        result = extension.ConstantFoldExtension.evaluate(
+            operator, tuple(raw_operands))
+        if result is not None:
+            return result
+        # some operand may still turn out constant
+        if waiting:
+            return None
+        return self.OVERDEFINED
+
+    def _operand_value(self, operand):
+        if isinstance(operand, use.Identifier):
+            return self._values.get(operand.get_value())
+        return operand.get_value()
+
+    def _target(self, instr, label_id) -> int:
+        return self._graph.get_index_of_label(
+            instr.get_label(label_id).get_value())
+
+    def _meet(self, left, right):
+        if left is None:
+            return right
+        if right is None or self._same(left, right):
+            return left
+        return self.OVERDEFINED
+
+    def _same(self, left, right) -> bool:
+        # True == 1 in Python, but not in Bril
+        return left is right or \
+            (type(left) is type(right) and left == right)
+
+
+class SparseConditionalConstantPropagation(ir_pass.CompilerPass):
+    """Rewrites every definition of a constant as a const, a br on a
+        constant as a jmp, and deletes the blocks no executable edge
+        reaches; phis lose the values of the edges gone. The constants
+        come from ConstantLattice, which folds with the equations of
+        ConstantFoldExtension, so it finds what lvn-fold finds in a block
+        and carries it across blocks. Most precise in SSA form; tdce
+        removes the definitions left unused
+    """
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    REQUIRED_ANALYSES = (
+        cfg.ControlFlowGraphAnalysis,
+        def_use.DefUseAnalysis,
+    )
+    PRESERVED_ANALYSES = (def_use.DefUseAnalysis,)
+
+    def __init__(self):
+        self._ir_builder = ir_builder.IRBuilder()
+
+    def global_optimize(self, func: program.Function) -> bool:
+        graph = self.get_analysis(cfg.ControlFlowGraphAnalysis, func)
+        chains = self.get_analysis(def_use.DefUseAnalysis, func)
+        lattice = ConstantLattice(func, graph, chains)
+
+        program_changed = False
+        for index, block in enumerate(graph.get_blocks()):
+            if not lattice.is_executable(index):
+                continue
+            for instr in block.get_instructions():
+                new_instr = self._rewrite(instr, index, graph, lattice)
+                if new_instr is None:
+                    continue
+                instr.insert_next(new_instr)
+                instr.remove_from_parent()
+                program_changed = True
+
+        for index, block in enumerate(graph.get_blocks()):
+            if not lattice.is_executable(index):
+                block.remove_from_parent()
+                instrumentation.count("blocks removed")
+                program_changed = True
+        return program_changed
+
+    def _rewrite(self, instr, index, graph, lattice):
+        """The instruction replacing instr, None to keep it"""
+        operator = instr.get_operator()
+        destination = instr.get_destination()
+        if operator is BR_OPERATOR:
+            condition = instr.get_operand(0)
+            if not lattice.is_constant(condition.get_value()):
+                return None
+            label_id = 0 if lattice.get_value(condition.get_value()) else 1
+            instrumentation.count("branches folded")
+            return self._ir_builder.build(
+                JMP_OPERATOR, None, [], [instr.get_label(label_id)])
+
+        if destination is None or operator is CONST_OPERATOR:
+            return None
+        if lattice.is_constant(destination.get_value()):
+            instrumentation.count("constants propagated")
+            return self._ir_builder.build(
+                CONST_OPERATOR,
+                destination,
+                [use.Primitive(lattice.get_value(destination.get_value()),
+                               destination.get_type())],
+                [])
+
+        if operator is not construction.PHI:
+            return None
+        # drop the values of edges that are never taken
+        operands = []
+        labels = []
+        for operand_id in range(instr.get_num_operands()):
+            label = instr.get_label(operand_id)
+            predecessor = graph.get_index_of_label(label.get_value())
+            if lattice.is_executable_edge(predecessor, index):
+                operands.append(instr.get_operand(operand_id))
+                labels.append(label)
+        if len(labels) == instr.get_num_labels():
+            return None
+        return self._ir_builder.build(
+            construction.PHI, destination, operands, labels)
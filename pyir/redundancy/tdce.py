@@ -1,47 +1,57 @@
 #!/usr/bin/env python
 
-from pyir import ir_pass
+from pyir import instrumentation, ir_pass, trace
+from pyir.analysis import cfg, def_use
 from pyir.program import program, use
 
 
 class InusedDefinitionElimination(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.LOCAL_OPTIMIZATION
+    # only definitions go, never jmp or br
+    PRESERVED_ANALYSES = (cfg.ControlFlowGraphAnalysis,)
+
     def local_optimize(self, block: program.BasicBlock):
-        # Identifier:
-        last_defined = {}
         program_changed = False
-        for instr in block.get_instructions():
+        for instr in self.find_killed(block):
+            trace.note_removed(instr)
+            instr.remove_from_parent()
+            program_changed = True
+        return program_changed
+
+    def find_killed(self, block: program.BasicBlock) -> list:
+        """Definitions overwritten in the block before any use"""
+        # Identifier name: its latest definition not used so far
+        last_defined = {}
+        killed = []
+        for instr in block.iter_instructions():
+            # operands are read before the destination is written
+            for operand_id in range(instr.get_num_operands()):
+                operand = instr.get_operand(operand_id)
+                if isinstance(operand, use.Identifier):
+                    last_defined.pop(operand.get_value(), None)
+
             destination = instr.get_destination()
             if destination is None:
                 continue
 
-            if (destination in last_defined and
-                    last_defined[destination] is not None):
-                last_defined[destination].remove_from_parent()
-                program_changed = True
-
-            last_defined[destination] = instr
-            for operand_id in range(instr.get_num_operands()):
-                operand = instr.get_operand(operand_id)
-                if isinstance(operand, use.Primitive):
-                    continue
-                if operand in last_defined:
-                    last_defined[operand] = None
-        return program_changed
+            name = destination.get_value()
+            if name in last_defined:
+                killed.append(last_defined[name])
+            last_defined[name] = instr
+        return killed
 
 class InusedIdentifierElimination(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    PRESERVED_ANALYSES = (cfg.ControlFlowGraphAnalysis,)
+
     def global_optimize(self, func: program.Function):
-        used = set()
+        used = func.get_used_names()
         program_changed = False
-        for instr in func.get_instructions():
-            for operand_id in range(instr.get_num_operands()):
-                operand = instr.get_operand(operand_id)
-                if not isinstance(operand, use.Identifier):
-                    continue
-                used.add(operand)
-
-        for instr in func.get_instructions():
+        for instr in func.iter_instructions():
             destination = instr.get_destination()
-            if destination is not None and destination not in used:
+            if destination is not None and \
+                    destination.get_value() not in used:
+                trace.note_removed(instr)
                 instr.remove_from_parent()
                 # if program changed, we need to run the pass again
                 program_changed = True
@@ -50,25 +60,70 @@ class InusedIdentifierElimination(ir_pass.CompilerPass):
 
 
 class TrivialDeadCodeElimination(ir_pass.CompilerPassComposite):
+    """Both passes above until nothing changes, driven by a worklist:
+        with the function's def-use chains, deleting an instruction only
+        revisits the definitions whose last use it was, and only the
+        blocks it was deleted from are scanned for killed definitions
+        again
+    """
+    REQUIRED_ANALYSES = (def_use.DefUseAnalysis,)
+    PRESERVED_ANALYSES = (
+        def_use.DefUseAnalysis,
+        cfg.ControlFlowGraphAnalysis,
+    )
+
     def __init__(self):
         super().__init__()
+        self._dead_definitions = InusedDefinitionElimination()
         self.add_pass(InusedIdentifierElimination())
-        self.add_pass(InusedDefinitionElimination())
+        self.add_pass(self._dead_definitions)
 
     def transform(self, module):
-        """This composite is special:
-           we need to run passes again if program changed"""
-        program_ever_changed = False
+        program_changed = False
+        for func in module.iter_functions():
+            program_changed |= self.transform_function(func)
+        return program_changed
+
+    def transform_function(self, func):
+        chains = self.get_analysis(def_use.DefUseAnalysis, func)
+        worklist = []
+        for name in chains.get_names():
+            if not chains.is_used(name):
+                worklist.extend(chains.get_definitions(name))
+
+        removed = set()
+        # blocks to scan for killed definitions, in a stable order
+        dirty_blocks = dict.fromkeys(func.iter_basic_blocks())
+
+        def remove(instr):
+            dirty_blocks[instr.get_parent()] = None
+            trace.note_removed(instr)
+            # the chains drop instr on removal
+            instr.remove_from_parent()
+            removed.add(instr)
+            for operand_name in self._operand_names(instr):
+                if not chains.is_used(operand_name):
+                    worklist.extend(chains.get_definitions(operand_name))
 
-        while True:
-            # run all passes
-            program_changed = False
-            for compiler_pass in self._passes:
-                program_changed |= compiler_pass.transform(module)
+        iterations = 0
+        while worklist or dirty_blocks:
+            iterations += 1
+            while worklist:
+                instr = worklist.pop()
+                if instr not in removed:
+                    remove(instr)
 
-            if not program_changed:
-                break
+            blocks = list(dirty_blocks)
+            dirty_blocks.clear()
+            for block in blocks:
+                for instr in self._dead_definitions.find_killed(block):
+                    remove(instr)
 
-            program_ever_changed = True
+        instrumentation.count("iterations", iterations)
+        return len(removed) > 0
 
-        return program_ever_changed
+    def _operand_names(self, instr):
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            if isinstance(operand, use.Identifier):
+                yield operand.get_value()
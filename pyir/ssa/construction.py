@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+from pyir import ir_pass
+from pyir.analysis import cfg, dataflow, dominance
+from pyir.program import ir_builder, ir_type, program, use
+
+# the value of a variable on paths where it was never assigned
+UNDEFINED = "__undefined"
+PHI = use.get_operator("phi")
+
+
+def is_ssa(func: program.Function) -> bool:
+    """True if no name is the destination of two instructions"""
+    assigned = set()
+    for instr in func.iter_instructions():
+        destination = instr.get_destination()
+        if destination is None:
+            continue
+        if destination.get_value() in assigned:
+            return False
+        assigned.add(destination.get_value())
+    return True
+
+
+class SSAConstruction(ir_pass.CompilerPass):
+    """Static single assignment form: every definition of x gets a fresh
+        name x.N, and phis merge the names reaching a join. Phis are
+        placed on the iterated dominance frontiers of the definitions of
+        each variable (Cytron et al.); pruned SSA only places them where
+        the variable is live, so that no phi is dead from the start.
+        The entry gets an empty block of its own if it is a jump target,
+        and every block gets a label and a terminator.
+    """
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    PRUNED = True
+
+    def __init__(self):
+        self._ir_builder = ir_builder.IRBuilder()
+
+    def global_optimize(self, func: program.Function) -> bool:
+        if func.has_no_child():
+            return False
+        cfg.add_entry_block(func)
+        cfg.add_terminators(func)
+        graph = cfg.ControlFlowGraph(func)
+        tree = dominance.DominatorTree(graph)
+
+        types = {arg.get_value(): arg.get_type()
+                 for arg in func.get_arguments()}
+        phis = self._place_phis(graph, tree, types)
+        incoming = self._rename(func, graph, tree, phis)
+        self._insert_phis(graph, phis, incoming, types)
+        return True
+
+    def _place_phis(self, graph, tree, types) -> list:
+        """Per block index: {variable: None} needing a phi there; the
+            rename fills in the phi's name"""
+        # variable -> indices of the blocks assigning it
+        def_blocks = {}
+        for index, block in enumerate(graph.get_blocks()):
+            for instr in block.iter_instructions():
+                destination = instr.get_destination()
+                if destination is None:
+                    continue
+                name = destination.get_value()
+                types.setdefault(name, destination.get_type())
+                blocks = def_blocks.setdefault(name, [])
+                if not blocks or blocks[-1] != index:
+                    blocks.append(index)
+
+        if self.PRUNED:
+            liveness = dataflow.solve(dataflow.LiveVariables(graph))
+            live_problem = liveness.get_problem()
+
+        phis = [{} for _ in range(graph.get_num_blocks())]
+        for name, blocks in def_blocks.items():
+            if self.PRUNED:
+                bit = live_problem.get_bit(name)
+            assigned = set(blocks)
+            worklist = list(blocks)
+            while worklist:
+                for join in tree.get_frontier(worklist.pop()):
+                    if name in phis[join]:
+                        continue
+                    if self.PRUNED and not liveness.get_in(join) & bit:
+                        continue
+                    phis[join][name] = None
+                    # the phi is one more definition
+                    if join not in assigned:
+                        assigned.add(join)
+                        worklist.append(join)
+        return phis
+
+    def _rename(self, func, graph, tree, phis) -> list:
+        """Rename along a preorder walk of the dominator tree, with one
+            stack of names per variable. Children are visited in label
+            order like Bril's reference to_ssa, whose numbering the
+            bril_test outputs follow. Returns, per block index and
+            variable, the (predecessor label, name) pairs of its phi
+        """
+        names = graph.get_names()
+        stacks = {arg.get_value(): [arg.get_value()]
+                  for arg in func.get_arguments()}
+        counters = {}
+        # names a fresh one must not take: the arguments keep theirs,
+        #  and the original destinations may already look like x.N
+        taken = set(stacks)
+        for instr in func.iter_instructions():
+            destination = instr.get_destination()
+            if destination is not None:
+                taken.add(destination.get_value())
+        incoming = [{name: [] for name in block_phis}
+                    for block_phis in phis]
+
+        # entries (block index, pushed variables or None when entering)
+        walk = [(0, None)]
+        while walk:
+            index, pushed = walk.pop()
+            if pushed is not None:
+                for name in pushed:
+                    stacks[name].pop()
+                continue
+
+            pushed = []
+            block_phis = phis[index]
+            for name in block_phis:
+                fresh = block_phis[name] = self._fresh_name(
+                    name, counters, taken)
+                stacks.setdefault(name, []).append(fresh)
+                pushed.append(name)
+            for instr in graph.get_block(index).get_instructions():
+                self._rename_instruction(
+                    instr, stacks, counters, taken, pushed)
+
+            for successor in graph.get_successors(index):
+                for name, pairs in incoming[successor].items():
+                    pairs.append((names[index], self._top(name, stacks)))
+
+            walk.append((index, pushed))
+            children = sorted(tree.get_children(index),
+                              key=names.__getitem__, reverse=True)
+            walk.extend((child, None) for child in children)
+        return incoming
+
+    def _rename_instruction(self, instr, stacks, counters, taken, pushed):
+        operands = []
+        for operand_id in range(instr.get_num_operands()):
+            operand = instr.get_operand(operand_id)
+            if isinstance(operand, use.Identifier):
+                operand = use.Identifier(
+                    self._top(operand.get_value(), stacks),
+                    operand.get_type())
+            operands.append(operand)
+
+        destination = instr.get_destination()
+        if destination is not None:
+            name = destination.get_value()
+            fresh = self._fresh_name(name, counters, taken)
+            stacks.setdefault(name, []).append(fresh)
+            pushed.append(name)
+            destination = use.Identifier(fresh, destination.get_type())
+
+        labels = [instr.get_label(i) for i in range(instr.get_num_labels())]
+        new_instr = self._ir_builder.build(
+            instr.get_operator(),
+            destination=destination,
+            operands=operands,
+            labels=labels,
+        )
+        instr.insert_next(new_instr)
+        instr.remove_from_parent()
+
+    def _fresh_name(self, name, counters, taken) -> str:
+        """A new name x.N for variable x; N counts up per variable,
+            skipping the names in taken"""
+        number = counters.get(name, 0)
+        fresh = f"{name}.{number}"
+        while fresh in taken:
+            number += 1
+            fresh = f"{name}.{number}"
+        counters[name] = number + 1
+        taken.add(fresh)
+        return fresh
+
+    def _top(self, name, stacks) -> str:
+        stack = stacks.get(name)
+        if not stack:
+            return UNDEFINED
+        return stack[-1]
+
+    def _insert_phis(self, graph, phis, incoming, types):
+        label_type = ir_type.get_type("basic-block")
+        for index, block_phis in enumerate(phis):
+            block = graph.get_block(index)
+            # each goes first: the block lists them by descending name,
+            #  as Bril's reference to_ssa does
+            for name in sorted(block_phis):
+                use_type = types[name]
+                pairs = incoming[index][name]
+                phi = self._ir_builder.build(
+                    PHI,
+                    destination=use.Identifier(block_phis[name], use_type),
+                    operands=[use.Identifier(value, use_type)
+                              for _, value in pairs],
+                    labels=[use.Identifier(label, label_type)
+                            for label, _ in pairs],
+                )
+                block.insert_first_child(phi)
+
+
+class MinimalSSAConstruction(SSAConstruction):
+    """A phi on every iterated dominance frontier, live or not"""
+    PRUNED = False
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+from pyir import ir_pass
+from pyir.analysis import cfg
+from pyir.program import ir_builder, ir_type, program, use
+from pyir.ssa import construction
+
+
+class SSADestruction(ir_pass.CompilerPass):
+    """Out of SSA: each phi becomes copies on its incoming edges. The
+        copies go at the end of the predecessor, before its jump, when
+        the edge is the predecessor's only way out; other (critical)
+        edges are split with a new block. The copies of one edge read
+        all their sources before writing, so they are ordered and the
+        cycles among them broken with a temporary. Values from
+        UNDEFINED need no copy.
+    """
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    ID = use.get_operator("id")
+    JUMP = use.get_operator("jmp")
+
+    def __init__(self):
+        self._ir_builder = ir_builder.IRBuilder()
+
+    def global_optimize(self, func: program.Function) -> bool:
+        graph = cfg.ControlFlowGraph(func)
+        joins = []
+        for index, block in enumerate(graph.get_blocks()):
+            phis = [instr for instr in block.get_instructions()
+                    if instr.get_operator() is construction.PHI]
+            if phis:
+                joins.append((index, phis))
+        if not joins:
+            return False
+
+        taken = {arg.get_value() for arg in func.get_arguments()}
+        for instr in func.iter_instructions():
+            if instr.get_destination() is not None:
+                taken.add(instr.get_destination().get_value())
+        labels = set(graph.get_names())
+
+        for index, phis in joins:
+            # predecessor label -> [(destination, source)]
+            edges = {}
+            for phi in phis:
+                destination = phi.get_destination()
+                for operand_id in range(phi.get_num_operands()):
+                    source = phi.get_operand(operand_id)
+                    label = phi.get_label(operand_id).get_value()
+                    copies = edges.setdefault(label, [])
+                    if source.get_value() in \
+                            (construction.UNDEFINED, destination.get_value()):
+                        continue
+                    copies.append((destination, source))
+            for label, copies in edges.items():
+                if copies:
+                    self._insert_on_edge(
+                        graph, graph.get_index_of_label(label), index,
+                        self._sequentialize(copies, taken), labels)
+            for phi in phis:
+                phi.remove_from_parent()
+        return True
+
+    def _sequentialize(self, copies, taken) -> list:
+        """Copy instructions with the effect of the parallel copies"""
+        pending = list(copies)
+        ordered = []
+        while pending:
+            sources = {source.get_value() for _, source in pending}
+            ready = [copy for copy in pending
+                     if copy[0].get_value() not in sources]
+            if not ready:
+                # a cycle: keep one source aside, which frees its writer
+                _, source = pending[0]
+                temporary = use.Identifier(
+                    self._fresh_name(source.get_value(), taken),
+                    source.get_type())
+                ordered.append((temporary, source))
+                pending = [
+                    (destination, temporary
+                     if value.get_value() == source.get_value() else value)
+                    for destination, value in pending
+                ]
+                continue
+            ordered.extend(ready)
+            pending = [copy for copy in pending if copy not in ready]
+
+        return [
+            self._ir_builder.build(
+                self.ID,
+                destination=use.Identifier(destination.get_value(),
+                                           destination.get_type()),
+                operands=[use.Identifier(source.get_value(),
+                                         destination.get_type())],
+                labels=[],
+            )
+            for destination, source in ordered
+        ]
+
+    def _insert_on_edge(self, graph, predecessor, successor, copies, labels):
+        block = graph.get_block(predecessor)
+        if len(graph.get_successors(predecessor)) == 1:
+            self._append_before_terminator(block, copies)
+            return
+
+        # split the critical edge with a block of its own
+        names = graph.get_names()
+        label = self._fresh_name(
+            f"{names[predecessor]}.{names[successor]}", labels)
+        label_type = ir_type.get_type("basic-block")
+        split = program.BasicBlock(label, block.is_columnar())
+        block.insert_next(split)
+        for copy in copies:
+            split.add_instruction(copy)
+        split.add_instruction(self._ir_builder.build(
+            self.JUMP, destination=None, operands=[],
+            labels=[use.Identifier(names[successor], label_type)]))
+
+        branch = block.get_instructions()[-1]
+        targets = []
+        for label_id in range(branch.get_num_labels()):
+            target = branch.get_label(label_id)
+            if target.get_value() == names[successor]:
+                target = use.Identifier(label, label_type)
+            targets.append(target)
+        new_branch = self._ir_builder.build(
+            branch.get_operator(),
+            destination=None,
+            operands=[branch.get_operand(i)
+                      for i in range(branch.get_num_operands())],
+            labels=targets,
+        )
+        branch.insert_next(new_branch)
+        branch.remove_from_parent()
+
+    def _append_before_terminator(self, block, copies):
+        instrs = block.get_instructions()
+        terminator = None
+        if instrs and instrs[-1].get_operator().get_name() in \
+                program.TERMINATORS:
+            terminator = instrs[-1]
+            terminator.remove_from_parent()
+        for copy in copies:
+            block.add_instruction(copy)
+        if terminator is not None:
+            block.add_instruction(terminator)
+
+    def _fresh_name(self, base, taken) -> str:
+        number = 0
+        while f"{base}.{number}" in taken:
+            number += 1
+        name = f"{base}.{number}"
+        taken.add(name)
+        return name
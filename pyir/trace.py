@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Debug tracing for passes, through named channels
+
+    Every channel is off until a sink is attached to it, and passes check
+    is_enabled() before formatting anything, so a disabled channel costs
+    one dictionary lookup. Sinks buffer the records: a file sink keeps
+    its file open and writes whole buffers, not one record per call.
+
+    Channels:
+        lvn-table             the numbering table of every block
+        removed-instructions  instructions deleted by tdce and friends
+"""
+
+import atexit
+import sys
+
+LVN_TABLE = "lvn-table"
+REMOVED_INSTRUCTIONS = "removed-instructions"
+CHANNELS = (LVN_TABLE, REMOVED_INSTRUCTIONS)
+
+# channel name -> sink
+_channels = {}
+# channel -> file ("-" for stderr, None for memory), to rebuild in workers
+_specs = {}
+
+
+class TraceSink:
+    def write(self, channel, text):
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class MemorySink(TraceSink):
+    """Keeps the records, e.g. for tests"""
+    def __init__(self):
+        self.records = []
+
+    def write(self, channel, text):
+        self.records.append((channel, text))
+
+    def getvalue(self, channel=None) -> str:
+        return "".join(
+            text for record_channel, text in self.records
+            if channel is None or record_channel == channel
+        )
+
+
+class StreamSink(TraceSink):
+    """Buffers the records and writes them out in large chunks"""
+    def __init__(self, stream, buffer_size=1 << 16):
+        self._stream = stream
+        self._buffer = []
+        self._buffered = 0
+        self._buffer_size = buffer_size
+
+    def write(self, channel, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._stream.write("".join(self._buffer))
+            self._stream.flush()
+            self._buffer = []
+            self._buffered = 0
+
+
+class FileSink(StreamSink):
+    """Starts the file afresh, unless append is set: worker processes
+        add to the file their parent started
+    """
+    def __init__(self, path, buffer_size=1 << 16, append=False):
+        super().__init__(open(path, "a" if append else "w"), buffer_size)
+
+    def close(self):
+        self.flush()
+        self._stream.close()
+
+
+def enable(channel, sink) -> TraceSink:
+    if channel not in CHANNELS:
+        raise ValueError(f"unknown trace channel {channel}")
+    if channel in _channels:
+        _channels[channel].flush()
+    _channels[channel] = sink
+    return sink
+
+
+def disable(channel):
+    sink = _channels.pop(channel, None)
+    _specs.pop(channel, None)
+    if sink is not None and sink not in _channels.values():
+        sink.close()
+
+
+def is_enabled(channel) -> bool:
+    return channel in _channels
+
+
+def emit(channel, text):
+    sink = _channels.get(channel)
+    if sink is not None:
+        sink.write(channel, text)
+
+
+def configure(specs: dict, append: bool = False):
+    """Attach a sink per channel: a path, "-" for stderr, or None to
+        keep the records in memory. Channels sharing a path share a sink.
+        Files are truncated, unless append is set (in worker processes)
+    """
+    sinks = {}
+    for channel, path in specs.items():
+        if path not in sinks:
+            if path is None:
+                sinks[path] = MemorySink()
+            elif path == "-":
+                sinks[path] = StreamSink(sys.stderr)
+            else:
+                sinks[path] = FileSink(path, append=append)
+        enable(channel, sinks[path])
+        _specs[channel] = path
+
+
+def get_specs() -> dict:
+    return dict(_specs)
+
+
+def parse_spec(spec: str) -> tuple:
+    """"channel" or "channel=path" from the command line"""
+    channel, _, path = spec.partition("=")
+    if channel not in CHANNELS:
+        raise ValueError(f"unknown trace channel {channel}, "
+                         f"expected one of {', '.join(CHANNELS)}")
+    return channel, path or "-"
+
+
+@atexit.register
+def flush_all():
+    for sink in _channels.values():
+        sink.flush()
+
+
+def format_instruction(instr) -> str:
+    """Bril-like text of an instruction"""
+    words = [instr.get_operator().get_name()]
+    for operand_id in range(instr.get_num_operands()):
+        words.append(str(instr.get_operand(operand_id).get_value()))
+    for label_id in range(instr.get_num_labels()):
+        words.append(f".{instr.get_label(label_id).get_value()}")
+    text = " ".join(words)
+
+    destination = instr.get_destination()
+    if destination is not None:
+        use_type = destination.get_type().get_name()
+        text = f"{destination.get_value()}: {use_type} = {text}"
+    return text + ";"
+
+
+def note_removed(instr):
+    """Trace instr on removed-instructions; call it before the removal"""
+    if REMOVED_INSTRUCTIONS not in _channels:
+        return
+    block = instr.get_parent()
+    func = None if block is None else block.get_parent()
+    where = "?" if func is None else func.get_value()
+    emit(REMOVED_INSTRUCTIONS, f"@{where}: {format_instruction(instr)}\n")
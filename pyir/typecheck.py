@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Checked/unchecked switch for the runtime type checks
+
+    Methods decorated with typecheck.typechecked are bound onto their class
+    either as the typeguard-instrumented version (checked, the default for
+    development) or as the plain function (unchecked, for production), so
+    the unchecked mode costs nothing per call. The mode is read from the
+    PYIR_TYPECHECK environment variable at import time ("0" disables the
+    checks) and can be flipped later with set_checked().
+"""
+
+import os
+
+ENV_VAR = "PYIR_TYPECHECK"
+
+_checked = os.environ.get(ENV_VAR, "1") != "0"
+_methods = []
+
+
+class _TypecheckedMethod:
+    def __init__(self, func):
+        self._func = func
+        self._checked_func = None
+        self._owner = None
+        self._name = None
+
+    def __set_name__(self, owner, name):
+        self._owner = owner
+        self._name = name
+        _methods.append(self)
+        self.bind()
+
+    def bind(self):
+        if not _checked:
+            setattr(self._owner, self._name, self._func)
+            return
+        if self._checked_func is None:
+            import typeguard
+            self._checked_func = typeguard.typechecked(self._func)
+        setattr(self._owner, self._name, self._checked_func)
+
+
+def typechecked(func):
+    """Drop-in replacement of typeguard.typechecked for methods"""
+    return _TypecheckedMethod(func)
+
+
+def set_checked(checked: bool):
+    """Rebind every decorated method in the requested mode"""
+    global _checked
+    _checked = checked
+    for method in _methods:
+        method.bind()
+
+
+def is_checked() -> bool:
+    return _checked
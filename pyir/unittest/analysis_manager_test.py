@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from pyir import ir_pass
+from pyir.analysis import manager
+from pyir.interface import bril_parser
+
+SOURCE = """
+@main {
+  a: int = const 1;
+  print a;
+}
+"""
+
+runs = {}
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+class CountingAnalysis(manager.Analysis):
+    def run(self, func, analysis_manager):
+        runs["counting"] = runs.get("counting", 0) + 1
+        return runs["counting"]
+
+
+class DerivedAnalysis(manager.Analysis):
+    REQUIRES = (CountingAnalysis,)
+
+    def run(self, func, analysis_manager):
+        runs["derived"] = runs.get("derived", 0) + 1
+        return analysis_manager.get(CountingAnalysis, func) * 10
+
+
+class ReadingPass(ir_pass.CompilerPass):
+    SCOPE = ir_pass.CompilerPassScope.GLOBAL_OPTIMIZATION
+    REQUIRED_ANALYSES = (DerivedAnalysis,)
+
+    def __init__(self, changes, preserved=()):
+        self._changes = changes
+        self.PRESERVED_ANALYSES = preserved
+
+    def global_optimize(self, func):
+        self.get_analysis(DerivedAnalysis, func)
+        return self._changes
+
+
+def caching_test():
+    runs.clear()
+    func = bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+    analysis_manager = manager.AnalysisManager()
+    check(analysis_manager.get(DerivedAnalysis, func) == 10, "wrong result")
+    check(analysis_manager.get(DerivedAnalysis, func) == 10, "wrong result")
+    check(runs == {"counting": 1, "derived": 1}, f"recomputed: {runs}")
+
+    # preserving the derived analysis alone does not keep it alive
+    analysis_manager.invalidate(func, preserved=(DerivedAnalysis,))
+    check(not analysis_manager.is_cached(DerivedAnalysis, func),
+          "derived analysis outlived its input")
+    check(analysis_manager.get(DerivedAnalysis, func) == 20, "stale result")
+    print("PASS: caching_test")
+
+
+def pass_manager_test():
+    runs.clear()
+    module = bril_parser.BrilParser().parse(SOURCE)
+    pass_manager = ir_pass.PassManager()
+    pass_manager.add_pass(ReadingPass(False))
+    pass_manager.add_pass(ReadingPass(True, (CountingAnalysis,)))
+    pass_manager.add_pass(ReadingPass(False))
+    pass_manager.transform(module)
+    # computed once, recomputed after the change: the input is reused
+    check(runs == {"counting": 1, "derived": 2}, f"unexpected runs: {runs}")
+    print("PASS: pass_manager_test")
+
+
+def undeclared_analysis_test():
+    func = bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+    try:
+        ReadingPass(False).get_analysis(CountingAnalysis, func)
+    except ValueError:
+        print("PASS: undeclared_analysis_test")
+        return
+    check(False, "undeclared analysis handed out")
+
+
+if __name__ == "__main__":
+    caching_test()
+    pass_manager_test()
+    undeclared_analysis_test()
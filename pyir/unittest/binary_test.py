@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import tempfile
+
+from pyir.interface import binary, bril
+
+SOURCE = """
+@main(n: int, flag: bool) {
+  zero: int = const 0;
+  big: int = const -123456789012345678901;
+  t: bool = const true;
+  f: bool = const false;
+  x: float = const 2.5;
+  c: char = const 'a';
+  br flag .then .empty;
+.then:
+  sum: int = add n zero;
+  print sum;
+  jmp .empty;
+.empty:
+.end:
+  print t;
+}
+@other {
+  one: int = const 1;
+  print one;
+  ret;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def round_trip_test():
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    expected = json.dumps(interface.dump_json(module))
+    via_json = interface.parse_json(expected.encode())
+
+    data = binary.BinaryInterface().dump(module)
+    loaded = binary.BinaryInterface().load_bytes(data)
+    check(json.dumps(interface.dump_json(loaded)) == expected,
+          f"round trip differs: {interface.dump_json(loaded)}")
+    # the same blocks as a load of the JSON
+    check([len(func.get_basic_blocks()) for func in loaded.get_functions()]
+          == [len(func.get_basic_blocks())
+              for func in via_json.get_functions()],
+          "blocks differ from the JSON load")
+    check(len(data) < len(expected) / 3, f"{len(data)} bytes")
+    print("PASS: round_trip_test")
+
+
+def lazy_test():
+    interface = binary.BinaryInterface()
+    module = bril.BrilInterface().parse_text(SOURCE)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "module" + binary.EXTENSION)
+        interface.save(module, path)
+        check(binary.is_binary(path), "magic not written")
+        with interface.open(path) as reader:
+            check(reader.get_function_names() == ["main", "other"],
+                  f"names: {reader.get_function_names()}")
+            func = reader.read_function("other")
+        check(func.get_value() == "other" and
+              len(func.get_instructions()) == 3,
+              f"wrong function: {func.get_instructions()}")
+    print("PASS: lazy_test")
+
+
+def error_test():
+    module = bril.BrilInterface().parse_text(SOURCE)
+    data = binary.BinaryInterface().dump(module)
+    newer = bytearray(data)
+    newer[len(binary.MAGIC)] = binary.FORMAT_VERSION + 1
+    for bad_data, reason in ((b"{}", "magic"),
+                             (bytes(newer), "version"),
+                             (data[:-5], "truncation")):
+        try:
+            binary.BinaryInterface().load_bytes(bad_data)
+        except binary.BinaryFormatError:
+            continue
+        check(False, f"{reason} not detected")
+    print("PASS: error_test")
+
+
+def varint_test():
+    values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 70, 5]
+    data = binary.encode_varints(values)
+    check(binary.decode_varints(data) == values,
+          f"decoded {binary.decode_varints(data)}")
+    check(binary.encode_varints([127, 3]) == bytes([127, 3]),
+          "one-byte values not kept as bytes")
+    print("PASS: varint_test")
+
+
+if __name__ == "__main__":
+    round_trip_test()
+    lazy_test()
+    error_test()
+    varint_test()
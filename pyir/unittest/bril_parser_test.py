@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+import io
+import math
+
+from pyir.interface import bril, bril_parser
+
+SOURCE = """
+# comment line
+@main(cond: bool, n: int) {
+  a: int = const 4;
+  b: bool = const true;
+  sum1: int = add a n;
+  br cond .left .right;
+.left:
+  print sum1;
+  jmp .end;
+.right:
+.end:
+  c: int = id a;
+  print c;
+}
+"""
+
+EXPECTED = {
+    "functions": [{
+        "args": [
+            {"name": "cond", "type": "bool"},
+            {"name": "n", "type": "int"},
+        ],
+        "instrs": [
+            {"op": "const", "dest": "a", "type": "int", "value": 4},
+            {"op": "const", "dest": "b", "type": "bool", "value": True},
+            {"op": "add", "dest": "sum1", "type": "int",
+             "args": ["a", "n"]},
+            {"op": "br", "args": ["cond"], "labels": ["left", "right"]},
+            {"label": "left"},
+            {"op": "print", "args": ["sum1"]},
+            {"op": "jmp", "labels": ["end"]},
+            {"label": "right"},
+            {"label": "end"},
+            {"op": "id", "dest": "c", "type": "int", "args": ["a"]},
+            {"op": "print", "args": ["c"]},
+        ],
+        "name": "main",
+    }]
+}
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def parse_test():
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    module_json = interface.dump_json(module)
+    check(module_json == EXPECTED, f"unexpected module: {module_json}")
+
+    blocks = module.get_functions()[0].get_basic_blocks()
+    labels = [block.get_label() for block in blocks]
+    # ".right" is an empty block, kept as the target of the branch
+    check(labels == [None, "left", "right", "end"],
+          f"unexpected blocks: {labels}")
+    print("PASS: parse_test")
+
+
+def syntax_error_test():
+    interface = bril.BrilInterface()
+    try:
+        interface.parse_text("@main {\n  a: int = const 4\n}\n")
+    except bril_parser.BrilSyntaxError as e:
+        check(e.line == 3, f"wrong line number: {e.line}")
+        print("PASS: syntax_error_test")
+        return
+    check(False, "missing semicolon is not reported")
+
+
+def float_test():
+    interface = bril.BrilInterface()
+    literals = ["1e3", "1.5e-2", "-2.5E+2", "3.", ".5", "1e-05",
+                "inf", "-inf", "nan"]
+    lines = [f"  v{i}: float = const {text};"
+             for i, text in enumerate(literals)]
+    # inf stays a name where a name is expected
+    lines.append("  inf: float = const 1.0;")
+    lines.append("  w: float = id inf;")
+    source = "@main {\n" + "\n".join(lines) + "\n}\n"
+
+    def values(module):
+        return [instr.get_operand(0).get_value()
+                for instr in module.get_functions()[0].get_instructions()]
+
+    def same(a, b):
+        if isinstance(a, float) and math.isnan(a):
+            return isinstance(b, float) and math.isnan(b)
+        return a == b and type(a) is type(b)
+
+    module = interface.parse_text(source)
+    expected = [float(text) for text in literals] + [1.0, "inf"]
+    parsed = values(module)
+    check(all(map(same, parsed, expected)),
+          f"unexpected values: {parsed}")
+
+    # what the writer prints reads back to the same values
+    stream = io.StringIO()
+    interface.write_text(module, stream)
+    reparsed = values(interface.parse_text(stream.getvalue()))
+    check(all(map(same, reparsed, parsed)),
+          f"values changed by a text round trip: {reparsed}")
+    print("PASS: float_test")
+
+
+if __name__ == "__main__":
+    parse_test()
+    syntax_error_test()
+    float_test()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+import io
+import json
+
+from pyir import driver
+from pyir.interface import bril
+
+SOURCE = """
+@main(cond: bool, n: int) {
+  a: int = const -4;
+  b: bool = const true;
+  z: float = const 0.0;
+  m: float = const -0.0;
+  c: char = const 'x';
+  sum1: int = add a n;
+  br cond .left .right;
+.left:
+  print sum1;
+  jmp .end;
+.right:
+.end:
+  print c;
+}
+@other {
+  ret;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def json_test():
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    expected = io.StringIO()
+    json.dump(interface.dump_json(module), expected)
+    stream = io.StringIO()
+    interface.write_json(module, stream)
+    check(stream.getvalue() == expected.getvalue(),
+          f"differs:\n{stream.getvalue()}\n{expected.getvalue()}")
+    print("PASS: json_test")
+
+
+def text_test():
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    stream = io.StringIO()
+    interface.write_text(module, stream)
+    reparsed = interface.parse_text(stream.getvalue())
+    check(interface.dump_json(reparsed) == interface.dump_json(module),
+          f"text does not parse back:\n{stream.getvalue()}")
+    print("PASS: text_test")
+
+
+def record_test():
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    stream = io.StringIO()
+    interface.write_json(module, stream)
+    results = [
+        driver.BatchResult("a.bril", output=stream.getvalue()),
+        driver.BatchResult("b.bril", error='KeyError: "x"'),
+    ]
+    expected = [
+        {"source": "a.bril", "module": interface.dump_json(module)},
+        {"source": "b.bril", "error": 'KeyError: "x"'},
+    ]
+    for result, record in zip(results, expected):
+        line = io.StringIO()
+        result.write_record(line)
+        check(line.getvalue() == json.dumps(record) + "\n",
+              f"record differs: {line.getvalue()}")
+    print("PASS: record_test")
+
+
+if __name__ == "__main__":
+    json_test()
+    text_test()
+    record_test()
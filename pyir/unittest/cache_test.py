@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import concurrent.futures
+import os
+import tempfile
+
+from pyir import cache, ir_pass
+from pyir.interface import bril, bril_parser
+from pyir.redundancy import lvn, tdce
+
+SOURCE = """
+@main {
+  a: int = const 1;
+  b: int = add a a;
+  c: int = add a a;
+  print c;
+}
+@other {
+  a: int = const 1;
+  b: int = add a a;
+  c: int = add a a;
+  print c;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def optimize(function_cache, source=SOURCE):
+    module = bril_parser.BrilParser().parse(source)
+    pass_manager = ir_pass.PassManager()
+    pass_manager.add_pass(lvn.LocalValueNumbering())
+    pass_manager.add_pass(tdce.TrivialDeadCodeElimination())
+    pass_manager.set_cache(function_cache)
+    pass_manager.transform(module)
+    return bril.BrilInterface().dump_json(module)
+
+
+def hit_test():
+    with tempfile.TemporaryDirectory() as directory:
+        function_cache = cache.OptimizationCache(directory)
+        expected = optimize(None)
+        # @other has the body of @main: its key ignores the name
+        check(optimize(function_cache) == expected, "wrong first result")
+        check(function_cache.get_stats()["hits"] == 1, "names in the key")
+        check(optimize(function_cache) == expected, "wrong cached result")
+
+        totals = cache.OptimizationCache(directory).get_totals()
+        check(totals["hits"] == 3 and totals["misses"] == 1 and
+              totals["entries"] == 1, f"wrong totals {totals}")
+        function_cache.close()
+    print("PASS: hit_test")
+
+
+def lru_test():
+    sources = [f"@main {{\n  a: int = const {i};\n  print a;\n}}\n"
+               for i in range(3)]
+    with tempfile.TemporaryDirectory() as directory:
+        function_cache = cache.OptimizationCache(directory)
+        optimize(function_cache, sources[0])
+        entry_size = function_cache.get_totals()["bytes"]
+        # room for two entries
+        function_cache = cache.OptimizationCache(directory, 2 * entry_size)
+        optimize(function_cache, sources[1])
+        optimize(function_cache, sources[0])
+        optimize(function_cache, sources[2])
+        check(function_cache.get_stats()["evictions"] == 1, "no eviction")
+
+        # sources[1] was the least recently used
+        before = function_cache.get_stats()
+        optimize(function_cache, sources[0])
+        optimize(function_cache, sources[1])
+        after = function_cache.get_stats()
+        check(after["hits"] - before["hits"] == 1 and
+              after["misses"] - before["misses"] == 1,
+              f"wrong entry evicted: {before} {after}")
+        function_cache.close()
+    print("PASS: lru_test")
+
+
+def _optimize_in_worker(function_cache, i):
+    source = f"@main {{\n  a: int = const {i % 4};\n  print a;\n}}\n"
+    return optimize(function_cache, source)
+
+
+def concurrent_test():
+    with tempfile.TemporaryDirectory() as directory:
+        function_cache = cache.OptimizationCache(directory)
+        with concurrent.futures.ProcessPoolExecutor(4) as executor:
+            results = list(executor.map(
+                _optimize_in_worker, [function_cache] * 32, range(32)))
+        check(all(result == results[i % 4]
+                  for i, result in enumerate(results)), "results differ")
+        totals = function_cache.get_totals()
+        check(totals["hits"] + totals["misses"] == 32,
+              f"lost counts {totals}")
+        check(totals["entries"] == 4, f"wrong entries {totals}")
+        function_cache.close()
+    print("PASS: concurrent_test")
+
+
+def unusable_test():
+    expected = optimize(None)
+    with tempfile.TemporaryDirectory() as directory:
+        corrupt = os.path.join(directory, "corrupt")
+        os.makedirs(corrupt)
+        with open(os.path.join(corrupt, cache.OptimizationCache.
+                               DATABASE_NAME), "w") as f:
+            f.write("not a database")
+        # a regular file where the directory should be
+        regular_file = os.path.join(directory, "file")
+        open(regular_file, "w").close()
+
+        for cache_dir in (corrupt, regular_file):
+            function_cache = cache.OptimizationCache(cache_dir)
+            check(function_cache.get_totals()["entries"] == 0,
+                  f"totals of an unusable cache in {cache_dir}")
+            check(optimize(function_cache) == expected,
+                  f"wrong result without the cache in {cache_dir}")
+            check(not function_cache.is_enabled(),
+                  f"the cache in {cache_dir} is still on")
+    print("PASS: unusable_test")
+
+
+if __name__ == "__main__":
+    hit_test()
+    lru_test()
+    concurrent_test()
+    unusable_test()
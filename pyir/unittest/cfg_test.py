@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import cfg
+from pyir.interface import bril_parser
+
+SOURCE = """
+@main {
+  i: int = const 8;
+.header:
+  zero: int = const 0;
+  cond: bool = gt i zero;
+  br cond .body .end;
+.body:
+  one: int = const 1;
+  i: int = sub i one;
+  jmp .header;
+  print i;
+.end:
+.b1:
+  print i;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def cfg_test():
+    func = bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+    graph = cfg.ControlFlowGraph(func)
+
+    names = graph.get_names()
+    # the unreachable print after jmp gets a fresh name, b1 is taken
+    check(names == ["b2", "header", "body", "b3", "end", "b1"],
+          f"unexpected names: {names}")
+    successors = [graph.get_successors(i) for i in range(len(names))]
+    check(successors == [(1,), (2, 4), (1,), (4,), (5,), ()],
+          f"unexpected successors: {successors}")
+    predecessors = [graph.get_predecessors(i) for i in range(len(names))]
+    check(predecessors == [(), (0, 2), (1,), (), (1, 3), (4,)],
+          f"unexpected predecessors: {predecessors}")
+
+    check(graph.get_index_of_label("end") == 4, "wrong label index")
+    check(graph.get_reverse_postorder() == (0, 1, 4, 5, 2),
+          f"unexpected order: {graph.get_reverse_postorder()}")
+    check(not graph.is_reachable(3), "dead block is reachable")
+    print("PASS: cfg_test")
+
+
+if __name__ == "__main__":
+    cfg_test()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+from pyir.interface import bril_parser
+from pyir.program import ir_builder
+
+SOURCE = """
+@main {
+  a: int = const 1;
+  b: int = add a a;
+  c: int = add b b;
+  print c;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def rewrite(instr, builder):
+    """Replace instr by a copy of itself, the way LVN does"""
+    new_instr = builder.build(
+        instr.get_operator(),
+        instr.get_destination(),
+        [instr.get_operand(i) for i in range(instr.get_num_operands())],
+        [instr.get_label(i) for i in range(instr.get_num_labels())]
+    )
+    instr.insert_next(new_instr)
+    instr.remove_from_parent()
+
+
+def reclaim_test():
+    module = bril_parser.BrilParser(True).parse(SOURCE)
+    block = module.get_functions()[0].get_basic_blocks()[0]
+    columns = block._children_impl.get_columns()
+    builder = ir_builder.IRBuilder()
+    num_instrs = len(block.get_instructions())
+
+    for _ in range(3):
+        add_b = block.get_instructions()[1]
+        for instr in block.iter_instructions():
+            rewrite(instr, builder)
+        # removed rows stay readable until the pass is over
+        check(add_b.get_operand(0).get_value() == "a",
+              "a removed row was reused before reclaim")
+        block.reclaim_storage()
+    check(len(columns.opcodes) == 2 * num_instrs,
+          f"{len(columns.opcodes)} rows for {num_instrs} instructions")
+    check(columns.count == num_instrs, "wrong number of live rows")
+
+    for instr in block.get_instructions()[:3]:
+        instr.remove_from_parent()
+    block.reclaim_storage()
+    check(len(columns._symbols) == 1,
+          f"unreferenced symbols kept: {len(columns._symbols)}")
+    print_c, = block.get_instructions()
+    check(print_c.get_operand(0).get_value() == "c",
+          "pruning the symbols changed a live row")
+    print("PASS: reclaim_test")
+
+
+if __name__ == "__main__":
+    reclaim_test()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import cfg, dataflow, manager
+from pyir.interface import bril_parser
+
+SOURCE = """
+@main(n: int) {
+  i: int = const 0;
+  one: int = const 1;
+.header:
+  cond: bool = lt i n;
+  br cond .body .end;
+.body:
+  i: int = add i one;
+  two: int = const 2;
+  jmp .header;
+.end:
+  print i;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def parse():
+    return bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+
+
+def liveness_test():
+    func = parse()
+    result = manager.AnalysisManager().get(
+        dataflow.LiveVariablesAnalysis, func)
+    problem = result.get_problem()
+    live_in = [sorted(problem.get_names(result.get_in(i))) for i in range(4)]
+    check(live_in == [["n"], ["i", "n", "one"], ["i", "n", "one"], ["i"]],
+          f"wrong live-in: {live_in}")
+    check(problem.format(result.get_out(3)) == "∅", "live after the exit")
+    print("PASS: liveness_test")
+
+
+def constant_propagation_test():
+    func = parse()
+    problem = dataflow.ConstantPropagation(cfg.ControlFlowGraph(func))
+    result = dataflow.solve(problem)
+    # i differs around the loop, one does not; two only reaches the
+    # header along the back edge
+    check(result.get_in(1) == {"i": "?", "one": 1, "cond": "?", "two": 2},
+          f"wrong header: {result.get_in(1)}")
+    check(problem.meet([{"b": True}, {"b": 1}]) == {"b": "?"},
+          "true and 1 merged")
+    print("PASS: constant_propagation_test")
+
+
+if __name__ == "__main__":
+    liveness_test()
+    constant_propagation_test()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+from pyir.interface import bril_parser
+from pyir.program import ir, ir_type, use
+
+SOURCE = """
+@main(n: int) {
+  a: int = const 4;
+  b: int = add a n;
+  c: int = add b b;
+  print c;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def operator_names(instrs):
+    return [instr.get_operator().get_name() for instr in instrs]
+
+
+def chains_test(columnar_storage):
+    module = bril_parser.BrilParser(columnar_storage).parse(SOURCE)
+    func = module.get_functions()[0]
+    block = func.get_basic_blocks()[0]
+    chains = func.get_def_use()
+    const_a, add_b, add_c, print_c = block.get_instructions()
+
+    check(chains.get_definition("a") == const_a, "wrong definition of a")
+    check(chains.get_definition("n") is None, "arguments have no definition")
+    check(chains.get_uses("b") == (add_c,), "wrong uses of b")
+    check(chains.get_num_uses("b") == 2, "b is read twice")
+
+    # removal and insertion keep the chains up to date
+    print_c.remove_from_parent()
+    check(not chains.is_used("c"), "c is still used")
+    int_type = ir_type.get_type("int")
+    add_c.insert_next(ir.PrintInstruction(
+        use.get_operator("print"),
+        operand0=use.Identifier("a", int_type)
+    ))
+    check(operator_names(chains.get_uses("a")) == ["add", "print"],
+          f"wrong uses of a: {operator_names(chains.get_uses('a'))}")
+    print(f"PASS: chains_test (columnar={columnar_storage})")
+
+
+def rename_test(columnar_storage):
+    module = bril_parser.BrilParser(columnar_storage).parse(SOURCE)
+    func = module.get_functions()[0]
+    chains = func.get_def_use()
+    const_a, add_b, add_c, _ = func.get_basic_blocks()[0].get_instructions()
+
+    add_b.get_destination().rename_as(
+        use.Identifier("d", ir_type.get_type("int")))
+    check(chains.get_definition("b") is None, "b is still defined")
+    check(chains.get_definition("d") == add_b, "d is not defined")
+    check(add_c.get_operand(1).get_value() == "b",
+          "renaming a destination renamed its uses too")
+    add_b.get_operand(0).rename_as(
+        use.Identifier("n", ir_type.get_type("int")))
+    check(not chains.is_used("a"), "a is still used")
+    check(chains.get_num_uses("n") == 2, "n is read twice")
+    check(const_a.get_destination().get_value() == "a",
+          "renaming an operand renamed its definition too")
+    print(f"PASS: rename_test (columnar={columnar_storage})")
+
+
+if __name__ == "__main__":
+    chains_test(False)
+    chains_test(True)
+    rename_test(False)
+    rename_test(True)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import cfg, dominance
+from pyir.interface import bril_parser
+
+# the entry is a loop header
+SOURCE = """
+@main(a: int) {
+.while.cond:
+  zero: int = const 0;
+  is_term: bool = eq a zero;
+  br is_term .while.finish .while.body;
+.while.body:
+  one: int = const 1;
+  a: int = sub a one;
+  jmp .while.cond;
+.while.finish:
+  print a;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def loop_entry_test():
+    func = bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+    tree = dominance.DominatorTree(cfg.ControlFlowGraph(func))
+
+    check(tree.get_children(0) == [1, 2], "wrong tree")
+    check(tree.get_immediate_dominator(0) is None, "entry has a dominator")
+    check(tree.dominates(0, 2) and not tree.dominates(1, 2),
+          "wrong dominance")
+    check(tree.get_dominators(1) == [1, 0], "wrong dominators")
+    # the back edge makes the entry a join with the outside
+    check(tree.get_frontier(0) == {0}, f"wrong frontier {tree.get_frontier(0)}")
+    check(tree.get_frontier(1) == {0}, f"wrong frontier {tree.get_frontier(1)}")
+    print("PASS: loop_entry_test")
+
+
+def add_entry_block_test():
+    func = bril_parser.BrilParser().parse(SOURCE).get_functions()[0]
+    check(cfg.add_entry_block(func), "no entry block added")
+    check(not cfg.add_entry_block(func), "entry block added twice")
+    graph = cfg.ControlFlowGraph(func)
+    check(graph.get_names()[0] == "entry1", "wrong entry name")
+
+    tree = dominance.DominatorTree(graph)
+    check(tree.get_frontier(0) == set(), "entry in its own frontier")
+    check(tree.get_frontier(1) == {1}, "loop header not in its frontier")
+    print("PASS: add_entry_block_test")
+
+
+if __name__ == "__main__":
+    loop_entry_test()
+    add_entry_block_test()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import io
+import json
+import os
+
+from pyir import driver
+
+BRIL_TEST = os.path.join(os.path.dirname(__file__), "..", "..", "bril_test")
+PASS_PATHS = [
+    "pyir.redundancy.lvn.LocalValueNumbering",
+    "pyir.redundancy.tdce.TrivialDeadCodeElimination",
+]
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def collect_named_inputs_test():
+    lvn_dir = os.path.join(BRIL_TEST, "lvn")
+    single = os.path.join(BRIL_TEST, "to_ssa", "if.bril")
+    stdin = io.StringIO(f"{single}\n\n")
+    named = driver.collect_named_inputs([BRIL_TEST, single, "-"], stdin)
+
+    names = [name for _, name in named]
+    # same base name in two directories, kept apart by the directory
+    check(os.path.join("to_ssa", "if.bril") in names and
+          os.path.join("ssa_roundtrip", "if.bril") in names,
+          f"names lost their directory: {names}")
+    check(names[-2:] == ["if.bril", "if.bril"],
+          f"single files go by their base name: {names[-2:]}")
+    lvn_names = [name for _, name in named
+                 if name.startswith("lvn" + os.sep)]
+    check(lvn_names == sorted(lvn_names) and len(lvn_names) ==
+          len([f for f in os.listdir(lvn_dir) if f.endswith(".bril")]),
+          f"wrong files under lvn: {lvn_names}")
+    check(driver.collect_inputs([BRIL_TEST]) ==
+          [path for path, _ in named[:-2]], "collect_inputs differs")
+    print("PASS: collect_named_inputs_test")
+
+
+def run(sources, jobs):
+    batch_driver = driver.make_batch_driver(PASS_PATHS, jobs)
+    stream = io.StringIO()
+    results = []
+    for result in batch_driver.run(sources):
+        result.write_record(stream)
+        results.append(result)
+    return stream.getvalue(), results
+
+
+def parallel_test():
+    missing = os.path.join(BRIL_TEST, "no-such-file.bril")
+    sources = driver.collect_inputs([BRIL_TEST])
+    # a failing file in the middle of the batch
+    sources.insert(len(sources) // 2, missing)
+
+    serial, results = run(sources, 1)
+    parallel, _ = run(sources, 2)
+    check(parallel == serial, "-j 2 output differs from the serial run")
+
+    check(len(results) == len(sources), "the batch stopped early")
+    failed = [result.source for result in results if not result.succeeded()]
+    check(missing in failed and
+          f'{{"source": {json.dumps(missing)}, "error": ' in serial,
+          f"no error record for {missing}")
+    check(len(failed) < len(sources) // 2,
+          f"too many failures: {failed}")
+    print("PASS: parallel_test")
+
+
+if __name__ == "__main__":
+    collect_named_inputs_test()
+    parallel_test()
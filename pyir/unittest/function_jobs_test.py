@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import io
+
+from pyir import driver
+from pyir.interface import bril
+
+SOURCE = """
+@main(n: int) {
+  one: int = const 1;
+  i: int = const 0;
+  sum: int = const 0;
+.loop:
+  cond: bool = lt i n;
+  br cond .body .exit;
+.body:
+  a: int = add i one;
+  b: int = add i one;
+  sum: int = add sum b;
+  i: int = id a;
+  jmp .loop;
+.exit:
+  print sum;
+}
+@fold {
+  x: int = const 4;
+  y: int = const 2;
+  z: int = mul x y;
+  dead: int = add z z;
+  print z;
+}
+@branch(c: bool) {
+  v: int = const 1;
+  br c .then .else;
+.then:
+  w: int = add v v;
+  print w;
+  jmp .end;
+.else:
+  u: int = add v v;
+  print u;
+.end:
+  ret;
+}
+"""
+
+# function-local pipelines that read cached analyses: dominators for
+#  gvn, the CFG for SSA, def-use chains for tdce
+PIPELINES = [
+    ["pyir.redundancy.lvn.LocalValueNumbering",
+     "pyir.redundancy.tdce.TrivialDeadCodeElimination"],
+    ["pyir.redundancy.gvn.GlobalValueNumbering",
+     "pyir.redundancy.tdce.TrivialDeadCodeElimination"],
+    ["pyir.ssa.construction.SSAConstruction",
+     "pyir.redundancy.sccp.SparseConditionalConstantPropagation",
+     "pyir.ssa.destruction.SSADestruction",
+     "pyir.redundancy.tdce.TrivialDeadCodeElimination"],
+]
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def optimize(pass_paths, function_jobs):
+    interface = bril.BrilInterface()
+    module = interface.parse_text(SOURCE)
+    pass_manager = driver.build_pass_manager(pass_paths, function_jobs)
+    try:
+        pass_manager.transform(module)
+    finally:
+        pass_manager.shutdown()
+    stream = io.StringIO()
+    interface.write_json(module, stream)
+    return stream.getvalue()
+
+
+def same_output_test():
+    for pass_paths in PIPELINES:
+        serial = optimize(pass_paths, 1)
+        parallel = optimize(pass_paths, 3)
+        check(parallel == serial,
+              f"--function-jobs 3 differs for {pass_paths}:\n"
+              f"{parallel}\n{serial}")
+    print("PASS: same_output_test")
+
+
+def shutdown_test():
+    module = bril.BrilInterface().parse_text(SOURCE)
+    pass_manager = driver.build_pass_manager(PIPELINES[0], 3)
+    pass_manager.transform(module)
+    executor = pass_manager.get_executor()
+    check(executor._pool is not None, "no worker pool was started")
+    # a new pipeline on the singleton stops the workers of the old one
+    driver.build_pass_manager(PIPELINES[0], 1)
+    check(executor._pool is None, "the old worker pool is still running")
+    print("PASS: shutdown_test")
+
+
+if __name__ == "__main__":
+    same_output_test()
+    shutdown_test()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+from pyir import trace
+from pyir.interface import bril_parser
+from pyir.redundancy import gvn, tdce
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def optimize(source, *pass_classes):
+    module = bril_parser.BrilParser().parse(source)
+    for pass_class in pass_classes:
+        pass_class().transform(module)
+    func = module.get_functions()[0]
+    return [trace.format_instruction(instr)
+            for instr in func.iter_instructions()]
+
+
+def dominating_test():
+    # the sum in .then is the one computed in the dominating entry
+    instrs = optimize("""
+@main(a: int, b: int, c: bool) {
+  x: int = add a b;
+  br c .then .else;
+.then:
+  y: int = add b a;
+  print y;
+.else:
+  print x;
+}
+""", gvn.GlobalValueNumbering, tdce.TrivialDeadCodeElimination)
+    check(not any("y" in instr for instr in instrs), f"y kept: {instrs}")
+    check(sum("add" in instr for instr in instrs) == 1,
+          f"sum computed twice: {instrs}")
+    print("PASS: dominating_test")
+
+
+def sibling_test():
+    # neither branch dominates the other
+    instrs = optimize("""
+@main(a: int, b: int, c: bool) {
+  br c .left .right;
+.left:
+  x: int = add a b;
+  print x;
+  jmp .end;
+.right:
+  y: int = add a b;
+  print y;
+.end:
+}
+""", gvn.GlobalValueNumbering)
+    check(sum("add" in instr for instr in instrs) == 2,
+          f"sum shared by siblings: {instrs}")
+    print("PASS: sibling_test")
+
+
+def reassigned_test():
+    # x holds another value in .then, outside SSA form
+    instrs = optimize("""
+@main(a: int, b: int, c: bool) {
+  x: int = add a b;
+  br c .then .else;
+.then:
+  x: int = const 1;
+  y: int = add a b;
+  print x y;
+.else:
+  print x;
+}
+""", gvn.GlobalValueNumbering)
+    check(sum("add" in instr for instr in instrs) == 2,
+          f"reassigned name reused: {instrs}")
+    print("PASS: reassigned_test")
+
+
+def print_test():
+    instrs = optimize("""
+@main {
+  a: int = const 1;
+  print a;
+  print a;
+}
+""", gvn.GlobalValueNumbering)
+    check(sum("print" in instr for instr in instrs) == 2,
+          f"prints merged: {instrs}")
+    print("PASS: print_test")
+
+
+def fold_test():
+    instrs = optimize("""
+@main(c: bool) {
+  a: int = const 2;
+  br c .then .else;
+.then:
+  b: int = mul a a;
+  print b;
+.else:
+}
+""", gvn.GlobalValueNumberingConstantFold,
+        tdce.TrivialDeadCodeElimination)
+    check(not any("mul" in instr for instr in instrs),
+          f"not folded: {instrs}")
+    check(any("const 4" in instr for instr in instrs), f"wrong fold {instrs}")
+    print("PASS: fold_test")
+
+
+if __name__ == "__main__":
+    dominating_test()
+    sibling_test()
+    reassigned_test()
+    print_test()
+    fold_test()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import io
+
+from pyir import instrumentation, ir_pass
+from pyir.interface import bril_parser
+from pyir.redundancy import tdce
+
+SOURCE = """
+@main {
+  a: int = const 1;
+  b: int = id a;
+  c: int = const 2;
+  print c;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def pass_manager_test():
+    module = bril_parser.BrilParser().parse(SOURCE)
+    pass_manager = ir_pass.PassManager()
+    pass_manager.add_pass(tdce.TrivialDeadCodeElimination())
+
+    collector = instrumentation.enable()
+    pass_manager.transform(module)
+    instrumentation.disable()
+
+    report = collector.to_json()
+    counters = report["counters"]["TrivialDeadCodeElimination"]
+    check(counters["instructions removed (net)"] == 2,
+          f"unexpected counters: {counters}")
+    check(report["passes"]["TrivialDeadCodeElimination"]["runs"] == 1,
+          f"unexpected timers: {report['passes']}")
+    check("main" in report["functions"]["TrivialDeadCodeElimination"],
+          "no per-function timer")
+
+    # reports of workers add up
+    collector.merge(report)
+    counters = collector.to_json()["counters"]["TrivialDeadCodeElimination"]
+    check(counters["instructions removed (net)"] == 4,
+          f"unexpected merged counters: {counters}")
+
+    stream = io.StringIO()
+    collector.report(stream)
+    check("TrivialDeadCodeElimination - iterations" in stream.getvalue(),
+          f"unexpected report: {stream.getvalue()}")
+    print("PASS: pass_manager_test")
+
+
+def disabled_test():
+    instrumentation.disable()
+    # counting without a collector is a no-op
+    instrumentation.count("anything")
+    check(instrumentation.get_active() is None, "collector installed")
+    print("PASS: disabled_test")
+
+
+if __name__ == "__main__":
+    pass_manager_test()
+    disabled_test()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+from pyir.utils import map_list
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def snapshot_test():
+    items = map_list.MapList()
+    for i in range(3):
+        items.append(i)
+    first = items.get_list()
+    check(first == (0, 1, 2), f"unexpected snapshot: {first}")
+    check(items.get_list() is first, "snapshot is rebuilt without change")
+
+    items.remove(1)
+    second = items.get_list()
+    check(second == (0, 2), f"unexpected snapshot: {second}")
+    check(first == (0, 1, 2), "old snapshot changed")
+    print("PASS: snapshot_test")
+
+
+def mutation_during_iteration_test():
+    items = map_list.MapList()
+    for i in range(5):
+        items.append(i)
+
+    visited = []
+    for element in items:
+        visited.append(element)
+        if element == 0:
+            # removing a later element: it is skipped
+            items.remove(1)
+        if element == 2:
+            # replacing the current element: the new one is not visited
+            items.insert_next(20, element)
+            items.remove(element)
+        if element == 3:
+            # removing the next and the current elements
+            items.remove(4)
+            items.remove(3)
+
+    check(visited == [0, 2, 3], f"unexpected visit order: {visited}")
+    check(items.get_list() == (0, 20), f"unexpected list: {items.get_list()}")
+    print("PASS: mutation_during_iteration_test")
+
+
+if __name__ == "__main__":
+    snapshot_test()
+    mutation_during_iteration_test()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+from pyir import instrumentation, ir_pass, memo, trace
+from pyir.interface import bril_parser
+from pyir.redundancy import lvn
+
+# @g is @f with every name renamed, in the same order
+RENAMED = """
+@f(a: int, b: int) {
+  x: int = add a b;
+  y: int = add b a;
+  x: int = mul x y;
+  print x;
+}
+@g(p: int, q: int) {
+  s: int = add p q;
+  t: int = add q p;
+  s: int = mul s t;
+  print s;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def optimize(source, block_memo):
+    module = bril_parser.BrilParser().parse(source)
+    pass_manager = ir_pass.PassManager()
+    pass_manager.add_pass(lvn.LocalValueNumbering())
+    pass_manager.set_block_memo(block_memo)
+    pass_manager.transform(module)
+    return {func.get_value(): [trace.format_instruction(instr)
+                               for instr in func.iter_instructions()]
+            for func in module.get_functions()}
+
+
+def renamed_test():
+    block_memo = memo.BlockMemo()
+    functions = optimize(RENAMED, block_memo)
+    stats = block_memo.get_stats()
+    check(stats["misses"] == 1 and stats["hits"] == 1,
+          f"unexpected stats: {stats}")
+    check(functions == optimize(RENAMED, None),
+          f"replay differs from the pass: {functions}")
+    check(not any("y" in instr for instr in functions["g"]),
+          f"names of @f leaked into @g: {functions['g']}")
+    print("PASS: renamed_test")
+
+
+def order_test():
+    blocks = []
+    for source in ("@f(a: int, b: int) { c: int = add a b; print c; }",
+                   "@f(b: int, a: int) { c: int = add b a; print c; }",
+                   "@f(m: int, n: int) { o: int = add m n; print o; }"):
+        func = bril_parser.BrilParser().parse(source).get_functions()[0]
+        blocks.append(func.get_basic_blocks()[0])
+    keys = [memo.get_shape(block).key for block in blocks]
+    # commutativity orders operands by name, so the order is in the shape
+    check(keys[0] != keys[1], "operand order lost")
+    check(keys[0] == keys[2], "renaming in order changed the shape")
+    print("PASS: order_test")
+
+
+def collision_test():
+    # @g is @f with a renamed lvn.0, the name lvn makes up for the first x
+    source = """
+@f(a: int) {
+  x: int = add a a;
+  x: int = mul x x;
+  print x;
+}
+@g(lvn.0: int) {
+  x: int = add lvn.0 lvn.0;
+  x: int = mul x x;
+  print x;
+}
+"""
+    block_memo = memo.BlockMemo()
+    functions = optimize(source, block_memo)
+    check(block_memo.get_stats()["bypassed"] == 1,
+          f"unexpected stats: {block_memo.get_stats()}")
+    check(functions == optimize(source, None),
+          f"made-up name reused: {functions}")
+    print("PASS: collision_test")
+
+
+def lru_test():
+    sources = [f"@f{i}(a: int) {{ {'x: int = add a a; ' * (i + 1)}}}"
+               for i in range(3)]
+    block_memo = memo.BlockMemo(2)
+    for source in sources:
+        optimize(source, block_memo)
+    check(block_memo.get_num_entries() == 2,
+          f"{block_memo.get_num_entries()} entries kept")
+    check(block_memo.get_stats()["evictions"] == 1,
+          f"unexpected stats: {block_memo.get_stats()}")
+    # the oldest shape went first
+    optimize(sources[0], block_memo)
+    check(block_memo.get_stats()["hits"] == 0,
+          f"evicted shape hit: {block_memo.get_stats()}")
+    print("PASS: lru_test")
+
+
+def counters_test():
+    collector = instrumentation.enable()
+    optimize(RENAMED, memo.BlockMemo())
+    instrumentation.disable()
+    counters = collector.to_json()["counters"]["LocalValueNumbering"]
+    check(counters.get("block memo hits") == 1,
+          f"unexpected counters: {counters}")
+    print("PASS: counters_test")
+
+
+if __name__ == "__main__":
+    renamed_test()
+    order_test()
+    collision_test()
+    lru_test()
+    counters_test()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+from pyir.analysis import cfg
+from pyir.interface import bril_parser
+from pyir.program import use
+from pyir.ssa import construction, destruction
+
+LOOP = """
+@main {
+.entry:
+  i: int = const 1;
+  jmp .loop;
+.loop:
+  max: int = const 10;
+  cond: bool = lt i max;
+  br cond .body .exit;
+.body:
+  i: int = add i i;
+  jmp .loop;
+.exit:
+  print i;
+}
+"""
+
+# a and b trade places around the loop, as after copy propagation
+SWAP = """
+@main {
+.entry:
+  a.0: int = const 1;
+  b.0: int = const 2;
+  jmp .loop;
+.loop:
+  a.1: int = phi a.0 b.1 .entry .loop;
+  b.1: int = phi b.0 a.1 .entry .loop;
+  print a.1;
+  jmp .loop;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def parse(source):
+    return bril_parser.BrilParser().parse(source).get_functions()[0]
+
+
+def phis_of(func):
+    return {
+        instr.get_destination().get_value():
+            [instr.get_operand(i).get_value()
+             for i in range(instr.get_num_operands())]
+        for instr in func.iter_instructions()
+        if instr.get_operator() is construction.PHI
+    }
+
+
+def pruned_test():
+    func = parse(LOOP)
+    construction.SSAConstruction().global_optimize(func)
+    check(construction.is_ssa(func), "not in SSA form")
+    # max and cond are dead at the loop header
+    check(phis_of(func) == {"i.1": ["i.0", "i.2"]},
+          f"unexpected phis: {phis_of(func)}")
+
+    func = parse(LOOP)
+    construction.MinimalSSAConstruction().global_optimize(func)
+    check(sorted(phis_of(func)) == ["cond.0", "i.1", "max.0"],
+          f"unexpected phis: {phis_of(func)}")
+    check(phis_of(func)["max.0"] == [construction.UNDEFINED, "max.1"],
+          "undefined value on the entry edge")
+    print("PASS: pruned_test")
+
+
+def swap_test():
+    func = parse(SWAP)
+    destruction.SSADestruction().global_optimize(func)
+    check(not phis_of(func), "phis left")
+
+    loop = cfg.ControlFlowGraph(func).get_block(1)
+    copies = [(instr.get_destination().get_value(),
+               instr.get_operand(0).get_value())
+              for instr in loop.get_instructions()
+              if instr.get_operator() is use.get_operator("id")]
+    check(copies == [("b.1.0", "b.1"), ("b.1", "a.1"), ("a.1", "b.1.0")],
+          f"unexpected copies: {copies}")
+    print("PASS: swap_test")
+
+
+def critical_edge_test():
+    func = parse("""
+@main(c: bool) {
+.top:
+  x: int = const 1;
+  br c .join .other;
+.other:
+  x: int = const 2;
+.join:
+  print x;
+}
+""")
+    construction.SSAConstruction().global_optimize(func)
+    destruction.SSADestruction().global_optimize(func)
+    names = cfg.ControlFlowGraph(func).get_names()
+    check(names == ["top", "top.join.0", "other", "join"],
+          f"edge not split: {names}")
+    print("PASS: critical_edge_test")
+
+
+def columnar_phi_test():
+    # three incoming values do not fit the two operand columns
+    source = """
+@main {
+.a:
+  x.0: int = const 0;
+  jmp .d;
+.b:
+  x.1: int = const 1;
+  jmp .d;
+.c:
+  x.2: int = const 2;
+.d:
+  x.3: int = phi x.0 x.1 x.2 .a .b .c;
+  print x.3;
+}
+"""
+    func = bril_parser.BrilParser(columnar_storage=True).parse(
+        source).get_functions()[0]
+    phi = cfg.ControlFlowGraph(func).get_block(3).get_instructions()[0]
+    check(phi.get_num_operands() == 3, "operands lost")
+    check(phi.get_operand(2).get_value() == "x.2" and
+          phi.get_label(2).get_value() == "c", "wrong third value")
+    used = func.get_basic_blocks()[3].get_used_names()
+    check(used == {"x.0", "x.1", "x.2", "x.3"}, f"wrong used names {used}")
+    print("PASS: columnar_phi_test")
+
+
+if __name__ == "__main__":
+    pruned_test()
+    swap_test()
+    critical_edge_test()
+    columnar_phi_test()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+
+from pyir import trace
+from pyir.interface import bril_parser
+from pyir.redundancy import lvn, tdce
+
+SOURCE = """
+@main {
+  a: int = const 1;
+  b: int = id a;
+  c: int = add a a;
+  print c;
+}
+"""
+
+
+def check(condition, message):
+    if not condition:
+        print(message)
+        quit()
+
+
+def channels_test():
+    module = bril_parser.BrilParser().parse(SOURCE)
+    check(not trace.is_enabled(trace.LVN_TABLE), "tracing is on by default")
+
+    sink = trace.enable(trace.LVN_TABLE, trace.MemorySink())
+    trace.enable(trace.REMOVED_INSTRUCTIONS, sink)
+    lvn.LocalValueNumbering().transform(module)
+    tdce.TrivialDeadCodeElimination().transform(module)
+    trace.disable(trace.LVN_TABLE)
+    trace.disable(trace.REMOVED_INSTRUCTIONS)
+
+    table = sink.getvalue(trace.LVN_TABLE)
+    check("add,#0,#0" in table, f"unexpected table: {table}")
+    removed = sink.getvalue(trace.REMOVED_INSTRUCTIONS)
+    check(removed == "@main: b: int = id a;\n",
+          f"unexpected removals: {removed!r}")
+    print("PASS: channels_test")
+
+
+def parse_spec_test():
+    check(trace.parse_spec("lvn-table") == ("lvn-table", "-"),
+          "stderr is the default sink")
+    check(trace.parse_spec("lvn-table=t.txt") == ("lvn-table", "t.txt"),
+          "path is ignored")
+    try:
+        trace.parse_spec("no-such-channel")
+    except ValueError:
+        print("PASS: parse_spec_test")
+        return
+    check(False, "unknown channel accepted")
+
+
+def file_sink_test():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.txt")
+        # two runs of opt.py with the same --trace file
+        for _ in range(2):
+            trace.configure({trace.LVN_TABLE: path})
+            lvn.LocalValueNumbering().transform(
+                bril_parser.BrilParser().parse(SOURCE))
+            trace.disable(trace.LVN_TABLE)
+            with open(path) as f:
+                text = f.read()
+            check(text.count("add,#0,#0") == 1,
+                  f"the trace file holds more than one run: {text!r}")
+
+        # a worker adds to the file of its parent
+        trace.configure({trace.LVN_TABLE: path}, append=True)
+        trace.emit(trace.LVN_TABLE, "worker\n")
+        trace.disable(trace.LVN_TABLE)
+        with open(path) as f:
+            text = f.read()
+        check(text.count("add,#0,#0") == 1 and text.endswith("worker\n"),
+              f"append mode lost records: {text!r}")
+    print("PASS: file_sink_test")
+
+
+if __name__ == "__main__":
+    channels_test()
+    parse_spec_test()
+    file_sink_test()
@@ -1,14 +1,13 @@
 #!/usr/bin/env python3
 
-import typeguard
 from typing import Optional
 
-from pyir import component
+from pyir import component, typecheck
 from pyir.utils import array_impl
 
 class Array(component.PYIRComponent):
 
-    @typeguard.typechecked
+    @typecheck.typechecked
     def __init__(
         self,
         element_type: type,
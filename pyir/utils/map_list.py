@@ -2,6 +2,8 @@
 
 
 class ListNode:
+    __slots__ = ("data", "next", "prev")
+
     def __init__(self, data=None):
         self.data = data
         self.next = None
@@ -11,6 +13,7 @@ class ListNode:
 class MapList:
     """A dictionary referring to a linked-list
     """
+    __slots__ = ("_start_node", "_end_node", "_map", "_version", "_snapshot")
 
     def __init__(self, child_type=None):
         self._start_node = ListNode()
@@ -18,6 +21,9 @@ class MapList:
         self._start_node.next = self._end_node
         self._end_node.prev = self._start_node
         self._map = {}
+        # bumped by every mutation, validates the cached snapshot
+        self._version = 0
+        self._snapshot = None
 
     def append(self, element):
         new_node = ListNode(element)
@@ -31,15 +37,19 @@ class MapList:
         # element as key
         key = element
         self._map[key] = new_node
+        self._version += 1
         return key
 
     def remove(self, key):
         node = self._map[key]
         node.prev.next = node.next
         node.next.prev = node.prev
-        node.next = None
+        # keep node.next: a running iterator may still step through it.
+        #  prev is None marks the node as removed
         node.prev = None
         del self._map[key]
+        self._version += 1
+        return True
 
     def insert_next(self, element, key):
         new_node = ListNode(element)
@@ -55,14 +65,57 @@ class MapList:
         # element as key
         key = element
         self._map[key] = new_node
+        self._version += 1
         return key
 
-    def get_list(self):
-        result = []
+    def insert_first(self, element):
+        new_node = ListNode(element)
 
-        curr = self._start_node.next
-        while curr != self._end_node:
-            result.append(curr.data)
-            curr = curr.next
+        first = self._start_node.next
+        self._start_node.next = new_node
+        first.prev = new_node
+
+        new_node.next = first
+        new_node.prev = self._start_node
+
+        # element as key
+        key = element
+        self._map[key] = new_node
+        self._version += 1
+        return key
 
-        return result
+    def __getstate__(self):
+        # pickle the elements only: recursing through the nodes would
+        #  overflow the stack on long lists
+        return list(self)
+
+    def __setstate__(self, elements):
+        self.__init__()
+        for element in elements:
+            self.append(element)
+
+    def __iter__(self):
+        """Walk the list lazily. The list may be mutated meanwhile:
+            removed elements are skipped, and an element inserted right
+            after the current one is not visited
+        """
+        curr = self._start_node.next
+        end_node = self._end_node
+        while curr is not end_node:
+            next_node = curr.next
+            if curr.prev is not None:
+                yield curr.data
+            curr = next_node
+
+    def __len__(self):
+        return len(self._map)
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get_list(self) -> tuple:
+        """An immutable snapshot, shared until the next mutation"""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot[0] != self._version:
+            snapshot = self._snapshot = (self._version, tuple(self))
+        return snapshot[1]
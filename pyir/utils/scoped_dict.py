@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+
+class ScopedDict(dict):
+    """A dict with nested scopes: pop_scope() undoes every assignment and
+        deletion made since the matching push_scope(). Only item
+        assignment and del are logged, not update() or setdefault()
+    """
+    _MISSING = object()
+
+    def __init__(self):
+        super().__init__()
+        # per open scope: (key, previous value or _MISSING)
+        self._logs = []
+
+    def push_scope(self):
+        self._logs.append([])
+
+    def pop_scope(self):
+        for key, previous in reversed(self._logs.pop()):
+            if previous is self._MISSING:
+                dict.pop(self, key, None)
+            else:
+                dict.__setitem__(self, key, previous)
+
+    def get_scope_keys(self) -> list:
+        """Keys changed in the innermost scope, oldest first"""
+        return [key for key, _ in self._logs[-1]]
+
+    def __setitem__(self, key, value):
+        if self._logs:
+            self._logs[-1].append((key, self.get(key, self._MISSING)))
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._logs:
+            self._logs[-1].append((key, self[key]))
+        dict.__delitem__(self, key)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Trivial dead code elimination from stdin to stdout, Bril JSON (or
+    text) in and Bril JSON out:
+
+    bril2json < prog.bril | python3 tdce.py | bril2txt
+"""
+
+import sys
+
+from pyir.interface import bril
+from pyir.redundancy import tdce
+
+
+def main():
+    interface = bril.BrilInterface()
+    module = interface.read(sys.stdin.buffer)
+    tdce.TrivialDeadCodeElimination().transform(module)
+    interface.write_json(module, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
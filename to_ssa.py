@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Bril JSON (or text) on stdin to SSA form as Bril JSON on stdout. The
+    phis are those of Bril's reference examples/to_ssa.py, live or not,
+    unless --pruned:
+
+    bril2json < prog.bril | python3 to_ssa.py [--pruned] | bril2txt
+"""
+
+import argparse
+import sys
+
+from pyir.interface import bril
+from pyir.ssa import construction
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pruned", action="store_true",
+                        help="only place phis where the variable is live")
+    args = parser.parse_args()
+
+    interface = bril.BrilInterface()
+    module = interface.read(sys.stdin.buffer)
+    if args.pruned:
+        construction.SSAConstruction().transform(module)
+    else:
+        construction.MinimalSSAConstruction().transform(module)
+    interface.write_json(module, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()